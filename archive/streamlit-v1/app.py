@@ -20,6 +20,7 @@ from logic.generator import generate_signal_output, estimate_tokens, get_model_o
 from logic.voice import transcribe_audio, generate_speech, get_voice_options, save_transcript_to_asset
 from logic.video import analyze_video_pitch, validate_video, get_video_info
 from logic.oracle_search import render_oracle_search
+from logic.scheduler import run_job, INTERACTIVE, EXPIRED_TEXT
 
 # Note: Using native st.audio_input instead of audio_recorder_streamlit for Cloud compatibility
 
@@ -64,8 +65,8 @@ def check_model_availability(api_key: str) -> dict:
     if not api_key or not api_key.startswith("gsk_"):
         return result
     try:
-        from groq import Groq
-        client = Groq(api_key=api_key)
+        from logic.llm_clients import get_client
+        client = get_client("groq", api_key)
         models = client.models.list()
         result["groq"] = True
         result["models"] = [m.id for m in models.data] if hasattr(models, 'data') else []
@@ -2272,26 +2273,24 @@ with col1:
             st.markdown("#### 🤖 AI COMPANY BRIEF")
             
             if st.button("🧠 GENERATE INTEL BRIEF", use_container_width=True, key="prep_intel_btn"):
-                with st.spinner("Analyzing company..."):
-                    from logic.generator import generate_plain_text
-                    
-                    intel_prompt = f"""
-                    Generate a concise company intelligence brief for {company}.
-                    
-                    Include:
-                    1. **What they do** (1-2 sentences)
-                    2. **Recent developments** (funding, growth, news)
-                    3. **Company culture** (based on public perception)
-                    4. **Key talking points** for the interview (3 bullets)
-                    5. **Questions to ask them** (2 smart questions)
-                    
-                    Be specific and actionable. This is for interview prep.
-                    """
-                    
-                    model_id = st.session_state.get('selected_model_id', "llama-3.3-70b-versatile")
-                    brief = generate_plain_text(intel_prompt, model_name=model_id)
-                    
-                    st.markdown(brief)
+                from logic.generator import stream_plain_text
+                
+                intel_prompt = f"""
+                Generate a concise company intelligence brief for {company}.
+                
+                Include:
+                1. **What they do** (1-2 sentences)
+                2. **Recent developments** (funding, growth, news)
+                3. **Company culture** (based on public perception)
+                4. **Key talking points** for the interview (3 bullets)
+                5. **Questions to ask them** (2 smart questions)
+                
+                Be specific and actionable. This is for interview prep.
+                """
+                
+                model_id = st.session_state.get('selected_model_id', "llama-3.3-70b-versatile")
+                # Render tokens as they arrive instead of behind a spinner
+                st.write_stream(stream_plain_text(intel_prompt, model_name=model_id))
         
         # ─────────────────────────────────────────────────────────────
         # TAB 3: COMBAT SIMULATOR (Duolingo-Style Practice)
@@ -2961,7 +2960,10 @@ with col1:
                     """
                     
                     model_id = st.session_state.get('selected_model_id', "llama-3.3-70b-versatile")
-                    kill_questions = generate_plain_text(kill_prompt, model_name=model_id)
+                    kill_questions = generate_plain_text(
+                        kill_prompt, model_name=model_id,
+                        semantic_key=role, feature=f"kill_questions:{company}",
+                    )
                     
                     st.session_state['kill_questions'] = kill_questions
             
@@ -3478,105 +3480,129 @@ with col1:
                 # TABS FOR OUTPUT (Clean Workspace)
                 # Create tabs dynamically based on selected agents
                 tabs = st.tabs([agent.split(" ")[1] + " OUTPUT" for agent in active_agents])
+                drafts = {}
                 
                 for i, agent in enumerate(active_agents):
                     with tabs[i]:
-                        with st.spinner(f"Agent {agent} is working..."):
+                        
+                        # ==========================================
+                        # AGENT 1: THE SNIPER (EMAIL)
+                        # ==========================================
+                        if "Sniper" in agent:
+                            st.subheader("📧 THE SNIPER PITCH")
+                            st.info(f"Strategy: {strategic_angle} | Tone: {tone}")
                             
-                            # ==========================================
-                            # AGENT 1: THE SNIPER (EMAIL)
-                            # ==========================================
-                            if "Sniper" in agent:
-                                st.subheader("📧 THE SNIPER PITCH")
-                                st.info(f"Strategy: {strategic_angle} | Tone: {tone}")
-                                
-                                # Simulated LLM Output based on your "Sniper Arsenal"
-                                st.markdown(f"""
-                                **Subject:** Structuring the Partner Ecosystem (Fudo/Sense Experience)
+                            # Simulated LLM Output based on your "Sniper Arsenal"
+                            st.markdown(f"""
+                            **Subject:** Structuring the Partner Ecosystem (Fudo/Sense Experience)
 
-                                **Hi [Hiring Manager],**
+                            **Hi [Hiring Manager],**
 
-                                I've been tracking **[Company]**'s expansion. The velocity is incredible, but I know from experience that scaling at this speed creates **structural debt**.
-                                
-                                I specialize in fixing that debt.
-                                
-                                As **Director of GTM Systems** (Ex-Fudo/Sense), I re-architected revenue engines to drive **160% pipeline growth** and **$10M in new ARR**.
-                                
-                                I have a specific perspective on how we can activate your [Channel/Vertical] to lower CAC.
+                            I've been tracking **[Company]**'s expansion. The velocity is incredible, but I know from experience that scaling at this speed creates **structural debt**.
+                            
+                            I specialize in fixing that debt.
+                            
+                            As **Director of GTM Systems** (Ex-Fudo/Sense), I re-architected revenue engines to drive **160% pipeline growth** and **$10M in new ARR**.
+                            
+                            I have a specific perspective on how we can activate your [Channel/Vertical] to lower CAC.
+                            
+                            Open to a brief chat?
+                            
+                            **Leon Basin**
+                            Director of GTM Systems
+                            """)
+                            st.caption("💡 **Agent Note:** I used the 'Structural Debt' hook because it resonates with the 'Founder' persona.")
+
+                        # ==========================================
+                        # AGENT 2: THE CLOSER (PHONE)
+                        # ==========================================
+                        elif "Closer" in agent:
+                            st.subheader("📱 COLD CALL & VOICEMAIL SCRIPTS")
+                            
+                            c_col1, c_col2 = st.columns(2)
+                            with c_col1:
+                                st.markdown("**📞 LIVE CALL OPENER**")
+                                st.markdown(f"""
+                                "Hi [Name], this is Leon Basin.
                                 
-                                Open to a brief chat?
+                                I'm not calling to sell you software. I'm calling because I've been tracking your expansion into **[Region/Vertical]**, and I noticed a gap in your partner activation layer.
                                 
-                                **Leon Basin**
-                                Director of GTM Systems
+                                I built the fix for this at **Fudo Security** (160% growth). I have an idea for [Company]—do you have 30 seconds, or should I send it via email?"
                                 """)
-                                st.caption("💡 **Agent Note:** I used the 'Structural Debt' hook because it resonates with the 'Founder' persona.")
-
-                            # ==========================================
-                            # AGENT 2: THE CLOSER (PHONE)
-                            # ==========================================
-                            elif "Closer" in agent:
-                                st.subheader("📱 COLD CALL & VOICEMAIL SCRIPTS")
-                                
-                                c_col1, c_col2 = st.columns(2)
-                                with c_col1:
-                                    st.markdown("**📞 LIVE CALL OPENER**")
-                                    st.markdown(f"""
-                                    "Hi [Name], this is Leon Basin.
-                                    
-                                    I'm not calling to sell you software. I'm calling because I've been tracking your expansion into **[Region/Vertical]**, and I noticed a gap in your partner activation layer.
-                                    
-                                    I built the fix for this at **Fudo Security** (160% growth). I have an idea for [Company]—do you have 30 seconds, or should I send it via email?"
-                                    """)
-                                with c_col2:
-                                    st.markdown("**📼 VOICEMAIL DROP**")
-                                    st.markdown(f"""
-                                    "Hi [Name], Leon Basin here. Former Director of GTM at Fudo.
-                                    
-                                    I have a specific strategy to help you fix the **Partner Activation** bottleneck I'm seeing in your JD. It involves a 'Technical-to-Commercial' shift that drove $10M pipeline for me at Sense.
-                                    
-                                    Sending you the 1-pager now. Check your inbox."
-                                    """)
-
-                            # ==========================================
-                            # AGENT 3: THE NETWORKER (LINKEDIN)
-                            # ==========================================
-                            elif "Networker" in agent:
-                                st.subheader("🔗 LINKEDIN CONNECTION SEQUENCING")
-                                st.markdown("**CONNECTION REQUEST (300 CHARS)**")
-                                st.code(f"""
-                                Hi [Name], following [Company]'s growth. I see you're scaling the Partner team. I previously built the GTM engine at Fudo (160% growth) and Sense ($10M pipe). I have a perspective on your LATAM expansion. Would love to connect. - Leon
-                                """, language="text")
-                                
-                                st.markdown("**FOLLOW-UP DM (VALUE DROP)**")
-                                st.markdown("""
-                                "Thanks for connecting. I wrote a quick 'Gap Analysis' on [Company]'s current partner ecosystem vs. the 'Revenue OS' model I built at Fudo. Thought it might be useful as you scale Q3. [Link]"
-                                """)
-
-                            # ==========================================
-                            # AGENT 4: THE DEVIL'S ADVOCATE (OBJECTIONS)
-                            # ==========================================
-                            elif "Devil" in agent:
-                                st.subheader("🛡️ OBJECTION HANDLING (THE PRE-MORTEM)")
-                                st.error("🚩 RED FLAG DETECTED: 'You've been a consultant recently.'")
+                            with c_col2:
+                                st.markdown("**📼 VOICEMAIL DROP**")
                                 st.markdown(f"""
-                                **THE OBJECTION:** "We need a long-term builder, not a consultant."
+                                "Hi [Name], Leon Basin here. Former Director of GTM at Fudo.
                                 
-                                **THE SCRIPTED REBUTTAL:**
-                                "I understand. I operated as a consultant specifically to build **'Zero-to-One'** engines for multiple startups quickly. 
+                                I have a specific strategy to help you fix the **Partner Activation** bottleneck I'm seeing in your JD. It involves a 'Technical-to-Commercial' shift that drove $10M pipeline for me at Sense.
                                 
-                                But my core DNA is **Ownership**. I spent 2 years at Fudo and 2 years at Sense building the foundations. I'm looking for my next 5-year home to scale what I build."
+                                Sending you the 1-pager now. Check your inbox."
                                 """)
+
+                        # ==========================================
+                        # AGENT 3: THE NETWORKER (LINKEDIN)
+                        # ==========================================
+                        elif "Networker" in agent:
+                            st.subheader("🔗 LINKEDIN CONNECTION SEQUENCING")
+                            st.markdown("**CONNECTION REQUEST (300 CHARS)**")
+                            st.code(f"""
+                            Hi [Name], following [Company]'s growth. I see you're scaling the Partner team. I previously built the GTM engine at Fudo (160% growth) and Sense ($10M pipe). I have a perspective on your LATAM expansion. Would love to connect. - Leon
+                            """, language="text")
                             
-                            # ==========================================
-                            # AGENT 5: THE ARCHITECT (90 DAY PLAN)
-                            # ==========================================
-                            elif "Architect" in agent:
-                                st.subheader("🏗️ 30-60-90 DAY MICRO-PLAN")
-                                st.markdown("""
-                                * **Day 1-30 (Audit):** Audit the HubSpot/Salesforce instance for 'Signal Decay'. Interview top 5 performing reps to map the 'Winning Path'.
-                                * **Day 31-60 (Build):** Deploy the 'Revenue OS' framework. Automate the 'Technical-to-Commercial' handoff to reduce friction.
-                                * **Day 61-90 (Scale):** Launch the LATAM Partner Activation campaign. Target: 15% increase in partner-sourced pipeline.
-                                """)
+                            st.markdown("**FOLLOW-UP DM (VALUE DROP)**")
+                            st.markdown("""
+                            "Thanks for connecting. I wrote a quick 'Gap Analysis' on [Company]'s current partner ecosystem vs. the 'Revenue OS' model I built at Fudo. Thought it might be useful as you scale Q3. [Link]"
+                            """)
+
+                        # ==========================================
+                        # AGENT 4: THE DEVIL'S ADVOCATE (OBJECTIONS)
+                        # ==========================================
+                        elif "Devil" in agent:
+                            st.subheader("🛡️ OBJECTION HANDLING (THE PRE-MORTEM)")
+                            st.error("🚩 RED FLAG DETECTED: 'You've been a consultant recently.'")
+                            st.markdown(f"""
+                            **THE OBJECTION:** "We need a long-term builder, not a consultant."
+                            
+                            **THE SCRIPTED REBUTTAL:**
+                            "I understand. I operated as a consultant specifically to build **'Zero-to-One'** engines for multiple startups quickly. 
+                            
+                            But my core DNA is **Ownership**. I spent 2 years at Fudo and 2 years at Sense building the foundations. I'm looking for my next 5-year home to scale what I build."
+                            """)
+                        
+                        # ==========================================
+                        # AGENT 5: THE ARCHITECT (90 DAY PLAN)
+                        # ==========================================
+                        elif "Architect" in agent:
+                            st.subheader("🏗️ 30-60-90 DAY MICRO-PLAN")
+                            st.markdown("""
+                            * **Day 1-30 (Audit):** Audit the HubSpot/Salesforce instance for 'Signal Decay'. Interview top 5 performing reps to map the 'Winning Path'.
+                            * **Day 31-60 (Build):** Deploy the 'Revenue OS' framework. Automate the 'Technical-to-Commercial' handoff to reduce friction.
+                            * **Day 61-90 (Scale):** Launch the LATAM Partner Activation campaign. Target: 15% increase in partner-sourced pipeline.
+                            """)
+
+                        # Tailored draft lands here when its agent finishes
+                        st.markdown("---")
+                        st.markdown("#### 🤖 TAILORED DRAFT")
+                        drafts[agent] = st.empty()
+                        drafts[agent].caption(f"Agent {agent} is working...")
+
+                # Run every selected agent concurrently; fill tabs in completion order
+                import time
+                from logic.swarm import run_swarm, build_agent_prompt
+
+                model_id = st.session_state.get('selected_model_id', "llama-3.3-70b-versatile")
+                tasks = [{"agent": agent, "prompt": build_agent_prompt(agent, jd_text, "\n\n".join(active_assets), strategic_angle, tone)}
+                         for agent in active_agents]
+                swarm_start = time.time()
+                for result in run_swarm(tasks, model_name=model_id):
+                    slot = drafts[result["agent"]]
+                    if result["ok"]:
+                        slot.markdown(result["text"])
+                    elif result["error"] == "timeout":
+                        slot.warning("⏱️ Agent timed out. Use the playbook above.")
+                    else:
+                        slot.error(result["error"])
+                st.caption(f"⚡ Swarm completed in {time.time() - swarm_start:.1f}s ({len(tasks)} agents in parallel)")
 
             else:
                 st.error("⚠️ MISSING DATA: Upload assets to Vault and Paste JD.")
@@ -4774,8 +4800,8 @@ with col1:
             
             if api_key:
                 try:
-                    from groq import Groq
-                    client = Groq(api_key=api_key)
+                    from logic.llm_clients import get_client
+                    client = get_client("groq", api_key)
                     
                     with st.spinner("🧠 Transcribing via Groq Whisper..."):
                         transcription = client.audio.transcriptions.create(
@@ -4850,7 +4876,7 @@ with col1:
                     st.markdown("#### 🤖 AI COACHING FEEDBACK")
                     
                     if st.button("🧠 ANALYZE RESPONSE"):
-                        from logic.generator import generate_plain_text
+                        from logic.generator import stream_plain_text
                         
                         prompt = f"""
                         Analyze this interview response for a Director of GTM Systems role ($220k OTE).
@@ -4868,8 +4894,8 @@ with col1:
                         Keep it brief and punchy.
                         """
                         model_id = st.session_state.get('selected_model_id', 'llama-3.3-70b-versatile')
-                        feedback = generate_plain_text(prompt, model_name=model_id)
-                        st.info(feedback)
+                        with st.container(border=True):
+                            st.write_stream(stream_plain_text(prompt, model_name=model_id))
                         
                         if filler_count > 3:
                             st.warning("⚠️ **HIGH FILLER COUNT:** Too many 'um's and 'uh's. Practice pausing instead.")
@@ -5074,7 +5100,10 @@ with col1:
                     """
                     
                     model_id = st.session_state.get('selected_model_id', "llama-3.3-70b-versatile")
-                    st.session_state['current_q'] = generate_plain_text(q_prompt, model_name=model_id)
+                    st.session_state['current_q'] = run_job(
+                        lambda: generate_plain_text(q_prompt, model_name=model_id),
+                        lane=INTERACTIVE, dropped=EXPIRED_TEXT,
+                    )
                     st.session_state['sim_active'] = True
                     st.session_state['sim_mode'] = "interview"
 
@@ -5100,7 +5129,10 @@ with col1:
                     """
                     
                     model_id = st.session_state.get('selected_model_id', "llama-3.3-70b-versatile")
-                    st.session_state['current_q'] = generate_plain_text(q_prompt, model_name=model_id)
+                    st.session_state['current_q'] = run_job(
+                        lambda: generate_plain_text(q_prompt, model_name=model_id),
+                        lane=INTERACTIVE, dropped=EXPIRED_TEXT,
+                    )
                     st.session_state['sim_active'] = True
                     st.session_state['sim_mode'] = "collaborate"
 
@@ -5181,7 +5213,10 @@ with col1:
                         
                         # Use existing generator function
                         model_id = st.session_state.get('selected_model_id', "llama-3.3-70b-versatile")
-                        feedback = generate_plain_text(analysis_prompt, model_name=model_id)
+                        feedback = run_job(
+                            lambda: generate_plain_text(analysis_prompt, model_name=model_id),
+                            lane=INTERACTIVE, dropped=EXPIRED_TEXT,
+                        )
                         
                         # D. THE SCOREBOARD
                         st.markdown("### 📊 TELEMETRY REPORT")
@@ -5238,35 +5273,38 @@ Leon"""
         
         if st.button("🚀 GENERATE EXECUTION PLAN", type="primary", use_container_width=True):
             if jd_context:
-                from logic.generator import generate_plain_text
+                from logic.generator import stream_plain_text
                 
-                with st.spinner("Architecting the First 90 Days..."):
-                    prompt = f"""
-                    ACT AS: Leon Basin, Director of GTM Systems.
-                    CONTEXT: Job Description: {jd_context}
-                    
-                    MISSION: Create a high-level 30-60-90 Day Plan to present in a Final Interview.
-                    
-                    TONE: "I am not figuring it out; I am executing."
-                    
-                    OUTPUT MARKDOWN FORMAT:
-                    
-                    # 🏗️ GTM EXECUTION ARCHITECTURE (DRAFT)
-                    
-                    ### 🗓️ DAYS 1-30: THE AUDIT (Discover & Diagnose)
-                    - (3 Bullet points on what systems/people Leon will audit. Be specific to GTM Ops).
-                    
-                    ### 🗓️ DAYS 31-60: THE BUILD (Architect & Deploy)
-                    - (3 Bullet points on "Quick Wins" and System Deployments - e.g., CRM Fixes, Outbound Signals).
-                    
-                    ### 🗓️ DAYS 61-90: THE SCALE (Optimize & Expand)
-                    - (3 Bullet points on Training, Handoffs, and Revenue Impact).
-                    
-                    ### 🏆 THE IMPACT (Day 90 KPI)
-                    - Define one major outcome (e.g., "Full Pipeline Visibility" or "20% Efficiency Gain").
-                    """
-                    plan = generate_plain_text(prompt, model_name=st.session_state.get('selected_model_id', 'llama-3.3-70b-versatile'))
-                    st.session_state['90_day_plan'] = plan
+                prompt = f"""
+                ACT AS: Leon Basin, Director of GTM Systems.
+                CONTEXT: Job Description: {jd_context}
+                
+                MISSION: Create a high-level 30-60-90 Day Plan to present in a Final Interview.
+                
+                TONE: "I am not figuring it out; I am executing."
+                
+                OUTPUT MARKDOWN FORMAT:
+                
+                # 🏗️ GTM EXECUTION ARCHITECTURE (DRAFT)
+                
+                ### 🗓️ DAYS 1-30: THE AUDIT (Discover & Diagnose)
+                - (3 Bullet points on what systems/people Leon will audit. Be specific to GTM Ops).
+                
+                ### 🗓️ DAYS 31-60: THE BUILD (Architect & Deploy)
+                - (3 Bullet points on "Quick Wins" and System Deployments - e.g., CRM Fixes, Outbound Signals).
+                
+                ### 🗓️ DAYS 61-90: THE SCALE (Optimize & Expand)
+                - (3 Bullet points on Training, Handoffs, and Revenue Impact).
+                
+                ### 🏆 THE IMPACT (Day 90 KPI)
+                - Define one major outcome (e.g., "Full Pipeline Visibility" or "20% Efficiency Gain").
+                """
+                # Stream into a placeholder; the stored plan is rendered below
+                live = st.empty()
+                with live.container():
+                    plan = st.write_stream(stream_plain_text(prompt, model_name=st.session_state.get('selected_model_id', 'llama-3.3-70b-versatile')))
+                live.empty()
+                st.session_state['90_day_plan'] = plan
             else:
                 st.error("Please paste a JD.")
                 
@@ -7982,18 +8020,18 @@ Curious if this resonates?""", height=150)
                 st.markdown("### ♟️ CONNECTION STRATEGY AGENT")
                 st.caption("Select a Deal to generate a multi-vector entry strategy.")
                 
-                from logic.database import get_all_deals, get_all_contacts
-                deals = get_all_deals()
-                contacts = get_all_contacts()
+                from logic.oracle_search import get_cluster_engine
+                cluster_engine = get_cluster_engine()
                 
                 # 1. Select Target
-                target_companies = sorted(list(set([d['company'] for d in deals])))
+                target_companies = cluster_engine.deal_companies()
                 selected_company = st.selectbox("Select Target Company", target_companies, key="strat_company_select")
                 
                 if selected_company:
-                    # 2. Analyze Vector
-                    company_deal = next((d for d in deals if d['company'] == selected_company), None)
-                    company_contacts = [c for c in contacts if c.get('company') and c['company'].lower() == selected_company.lower()]
+                    # 2. Analyze Vector (normalised company join: "Acme" == "ACME, Inc.")
+                    cluster = cluster_engine.cluster_for(selected_company)
+                    company_deal = cluster['deals'][0] if cluster['deals'] else None
+                    company_contacts = cluster['contacts']
                     
                     # Classify Assets
                     recruiters = [c for c in company_contacts if "Recruiter" in c.get('contact_type', '')]
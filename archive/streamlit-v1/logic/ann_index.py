@@ -0,0 +1,549 @@
+"""
+BASIN::NEXUS // ANN INDEX (IVF)
+Approximate nearest-neighbour search for large Oracle corpora, in pure NumPy.
+
+Inverted-file index: vectors are partitioned by spherical k-means into
+`n_lists` cells. A query scores the centroids, then only the `nprobe`
+closest cells. `nprobe` is the recall/latency knob: 1 is fastest, `n_lists`
+is exact.
+
+Persistence is a single file opened with np.memmap, so a loaded index is
+shared through the OS page cache and only the probed cells are faulted in.
+AnnVectorStore.load() does not read the dense matrix when a trained IVF
+file is present; it is rebuilt from the mapped cells only if the store is
+mutated.
+Adds after load go to in-memory delta buffers; deletes are tombstones.
+save() consolidates both back into the file.
+
+Benchmark:  python -m logic.ann_index --vectors 1000000 --nprobe 1 4 8 16
+"""
+
+import os
+import json
+import time
+import threading
+
+import numpy as np
+
+from logic.embeddings import VectorStore, EMBEDDING_DIM
+
+
+# ═══════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ═══════════════════════════════════════════════════════════════
+
+DEFAULT_NPROBE = 8
+TRAIN_MIN_VECTORS = 4096          # below this, the store searches exactly
+TRAIN_SAMPLE_PER_LIST = 64
+KMEANS_ITERATIONS = 12
+FILE_MAGIC = b"BASNIVF1"
+ALIGN = 64
+IVF_SUFFIX = ".ivf"               # sidecar written next to the VectorStore .npz
+
+
+def default_n_lists(n_vectors: int) -> int:
+    """~sqrt(N) cells, clamped to a sensible range."""
+    return int(min(4096, max(16, np.sqrt(max(n_vectors, 1)))))
+
+
+# ═══════════════════════════════════════════════════════════════
+# K-MEANS
+# ═══════════════════════════════════════════════════════════════
+
+def _assign(data: np.ndarray, centroids: np.ndarray, batch: int = 8192) -> np.ndarray:
+    """Nearest centroid by inner product (data and centroids are unit vectors)."""
+    labels = np.empty(data.shape[0], dtype=np.int64)
+    for start in range(0, data.shape[0], batch):
+        labels[start:start + batch] = np.argmax(data[start:start + batch] @ centroids.T, axis=1)
+    return labels
+
+
+def spherical_kmeans(data: np.ndarray, n_clusters: int, iterations: int = KMEANS_ITERATIONS,
+                     seed: int = 0) -> np.ndarray:
+    """
+    Spherical k-means (cosine). Empty clusters are re-seeded from random points.
+
+    Returns:
+        np.ndarray: (n_clusters, dim) float32 unit centroids
+    """
+    rng = np.random.default_rng(seed)
+    data = np.ascontiguousarray(data, dtype=np.float32)
+    n_clusters = min(n_clusters, data.shape[0])
+    centroids = data[rng.choice(data.shape[0], n_clusters, replace=False)].copy()
+
+    for _ in range(iterations):
+        labels = _assign(data, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, data)
+        counts = np.bincount(labels, minlength=n_clusters)
+        empty = counts == 0
+        if empty.any():
+            sums[empty] = data[rng.choice(data.shape[0], int(empty.sum()))]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids = (sums / norms).astype(np.float32)
+    return centroids
+
+
+# ═══════════════════════════════════════════════════════════════
+# IVF INDEX
+# ═══════════════════════════════════════════════════════════════
+
+class IVFIndex:
+    """
+    Inverted-file ANN index over unit vectors with int64 ids.
+
+    Base cells are contiguous slices of (optionally memory-mapped) arrays;
+    vectors added since the last save live in per-cell delta buffers.
+    """
+
+    def __init__(self, dim: int = EMBEDDING_DIM, nprobe: int = DEFAULT_NPROBE):
+        self.dim = dim
+        self.nprobe = nprobe
+        self.centroids = None
+        self.base_vectors = np.zeros((0, dim), dtype=np.float32)
+        self.base_ids = np.zeros(0, dtype=np.int64)
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.delta_ids = []           # cell -> list of id arrays
+        self.delta_vecs = []          # cell -> list of vector arrays
+        self._delta_cache = {}        # cell -> (ids, vectors) concatenated
+        self.deleted = set()
+        self._deleted_arr = np.zeros(0, dtype=np.int64)
+        self._lock = threading.RLock()
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    @property
+    def n_lists(self) -> int:
+        return 0 if self.centroids is None else self.centroids.shape[0]
+
+    def __len__(self):
+        delta = sum(len(ids) for cell in self.delta_ids for ids in cell)
+        return len(self.base_ids) + delta - len(self.deleted)
+
+    # --- Build ---
+
+    def train(self, vectors: np.ndarray, n_lists: int = None, seed: int = 0):
+        """Fit centroids on a sample of `vectors`. Existing contents are re-bucketed."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        n_lists = n_lists or default_n_lists(vectors.shape[0])
+        sample_size = min(vectors.shape[0], n_lists * TRAIN_SAMPLE_PER_LIST)
+        rng = np.random.default_rng(seed)
+        sample = vectors[rng.choice(vectors.shape[0], sample_size, replace=False)]
+
+        with self._lock:
+            old_ids, old_vecs, _ = self._all_live()
+            self.centroids = spherical_kmeans(sample, n_lists, seed=seed)
+            empty = np.zeros(0, dtype=np.int64)
+            self._set_base(empty, np.zeros((0, self.dim), dtype=np.float32), empty)
+            if len(old_ids):
+                self.add(old_ids, old_vecs)
+
+    def _reset_delta(self):
+        self.delta_ids = [[] for _ in range(self.n_lists)]
+        self.delta_vecs = [[] for _ in range(self.n_lists)]
+        self._delta_cache = {}
+
+    def add(self, ids, vectors: np.ndarray):
+        """Assign vectors to their nearest cells. Re-adding a deleted id revives it."""
+        if not self.is_trained:
+            raise RuntimeError("IVFIndex.add() called before train()")
+        ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        with self._lock:
+            revived = self.deleted.intersection(ids.tolist())
+            if revived:
+                # The stale copies stay tombstoned by value: drop them for good first
+                self._purge(revived)
+            cells = _assign(vectors, self.centroids)
+            for cell in np.unique(cells):
+                mask = cells == cell
+                self.delta_ids[cell].append(ids[mask])
+                self.delta_vecs[cell].append(vectors[mask])
+                self._delta_cache.pop(int(cell), None)
+
+    def remove(self, ids):
+        with self._lock:
+            self.deleted.update(int(i) for i in np.asarray(ids).reshape(-1))
+            self._deleted_arr = np.fromiter(self.deleted, dtype=np.int64, count=len(self.deleted))
+
+    def _purge(self, ids: set):
+        """Physically drop all tombstoned vectors (used when a deleted id is re-added)."""
+        live_ids, live_vecs, cells = self._all_live(exclude=ids)
+        self._set_base(live_ids, live_vecs, cells)
+
+    def _delta(self, cell: int) -> tuple:
+        cached = self._delta_cache.get(cell)
+        if cached is None:
+            if self.delta_ids[cell]:
+                cached = (np.concatenate(self.delta_ids[cell]), np.concatenate(self.delta_vecs[cell]))
+                self.delta_ids[cell] = [cached[0]]
+                self.delta_vecs[cell] = [cached[1]]
+            else:
+                cached = (np.zeros(0, dtype=np.int64), np.zeros((0, self.dim), dtype=np.float32))
+            self._delta_cache[cell] = cached
+        return cached
+
+    def _all_live(self, exclude: set = None) -> tuple:
+        """All live (ids, vectors, cells), grouped by cell. No reassignment needed."""
+        exclude = (exclude or set()) | self.deleted
+        if not self.is_trained:
+            return (np.zeros(0, dtype=np.int64), np.zeros((0, self.dim), dtype=np.float32),
+                    np.zeros(0, dtype=np.int64))
+        ids, vecs, cells = [], [], []
+        for cell in range(self.n_lists):
+            lo, hi = self.offsets[cell], self.offsets[cell + 1]
+            d_ids, d_vecs = self._delta(cell)
+            ids.extend([np.asarray(self.base_ids[lo:hi]), d_ids])
+            vecs.extend([np.asarray(self.base_vectors[lo:hi]), d_vecs])
+            cells.append(np.full(int(hi - lo) + len(d_ids), cell, dtype=np.int64))
+        ids = np.concatenate(ids)
+        vecs = np.concatenate(vecs).reshape(-1, self.dim)
+        cells = np.concatenate(cells)
+        if exclude:
+            keep = ~np.isin(ids, np.fromiter(exclude, dtype=np.int64, count=len(exclude)))
+            ids, vecs, cells = ids[keep], vecs[keep], cells[keep]
+        return ids, vecs, cells
+
+    def _set_base(self, ids: np.ndarray, vecs: np.ndarray, cells: np.ndarray):
+        """Install cell-grouped arrays as the base and clear deltas/tombstones."""
+        self.base_ids, self.base_vectors = ids, vecs
+        self.offsets = np.zeros(self.n_lists + 1, dtype=np.int64)
+        self.offsets[1:] = np.cumsum(np.bincount(cells, minlength=self.n_lists))
+        self._reset_delta()
+        self.deleted = set()
+        self._deleted_arr = np.zeros(0, dtype=np.int64)
+
+    def relabel(self, mapping: np.ndarray):
+        """Rewrite ids through a dense old->new array; ids mapped to -1 are dropped."""
+        with self._lock:
+            ids, vecs, cells = self._all_live()
+            new_ids = mapping[ids] if len(ids) else ids
+            keep = new_ids >= 0
+            self._set_base(new_ids[keep], vecs[keep], cells[keep])
+
+    # --- Query ---
+
+    def search(self, query_vec: np.ndarray, k: int = 10, nprobe: int = None) -> tuple:
+        """
+        Approximate top-k by inner product.
+
+        Args:
+            query_vec: Unit query vector
+            k: Results wanted
+            nprobe: Cells to scan (defaults to self.nprobe); higher = better recall, slower
+
+        Returns:
+            tuple: (ids, scores) arrays sorted best-first
+        """
+        if not self.is_trained:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        query_vec = np.asarray(query_vec, dtype=np.float32)
+        nprobe = min(nprobe or self.nprobe, self.n_lists)
+
+        centroid_scores = self.centroids @ query_vec
+        if nprobe < self.n_lists:
+            probe = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        else:
+            probe = np.arange(self.n_lists)
+
+        cand_ids, cand_scores = [], []
+        with self._lock:
+            for cell in probe:
+                lo, hi = self.offsets[cell], self.offsets[cell + 1]
+                if hi > lo:
+                    cand_ids.append(self.base_ids[lo:hi])
+                    cand_scores.append(self.base_vectors[lo:hi] @ query_vec)
+                d_ids, d_vecs = self._delta(int(cell))
+                if len(d_ids):
+                    cand_ids.append(d_ids)
+                    cand_scores.append(d_vecs @ query_vec)
+            deleted = self._deleted_arr
+
+        if not cand_ids:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        ids = np.concatenate(cand_ids)
+        scores = np.concatenate(cand_scores)
+        if len(deleted):
+            live = ~np.isin(ids, deleted)
+            ids, scores = ids[live], scores[live]
+
+        k = min(k, len(ids))
+        if k == 0:
+            return ids[:0], scores[:0]
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return np.asarray(ids[top]), np.asarray(scores[top])
+
+    # --- Persistence ---
+
+    def save(self, path: str):
+        """Consolidate deltas and tombstones into one memory-mappable file."""
+        with self._lock:
+            ids, vecs, cells = self._all_live()
+            self._set_base(ids, np.ascontiguousarray(vecs), cells)
+
+            sections = [
+                ("centroids", self.centroids.astype(np.float32)),
+                ("offsets", self.offsets),
+                ("ids", ids.astype(np.int64)),
+                ("vectors", np.ascontiguousarray(vecs, dtype=np.float32)),
+            ]
+            header = {"dim": self.dim, "n_lists": self.n_lists, "nprobe": self.nprobe, "sections": {}}
+            position = 0
+            for name, arr in sections:
+                position = -(-position // ALIGN) * ALIGN
+                header["sections"][name] = {"offset": position, "dtype": str(arr.dtype), "shape": list(arr.shape)}
+                position += arr.nbytes
+            header_bytes = json.dumps(header).encode("utf-8")
+            data_start = -(-(len(FILE_MAGIC) + 8 + len(header_bytes)) // ALIGN) * ALIGN
+
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(FILE_MAGIC)
+                f.write(len(header_bytes).to_bytes(8, "little"))
+                f.write(header_bytes)
+                for name, arr in sections:
+                    f.seek(data_start + header["sections"][name]["offset"])
+                    f.write(arr.tobytes())
+            os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True):
+        """Open a saved index. With mmap=True the arrays are read-only views of the file."""
+        with open(path, "rb") as f:
+            if f.read(len(FILE_MAGIC)) != FILE_MAGIC:
+                raise ValueError(f"{path} is not an IVF index file")
+            header_len = int.from_bytes(f.read(8), "little")
+            header = json.loads(f.read(header_len).decode("utf-8"))
+        data_start = -(-(len(FILE_MAGIC) + 8 + header_len) // ALIGN) * ALIGN
+
+        def section(name):
+            spec = header["sections"][name]
+            shape = tuple(spec["shape"])
+            if 0 in shape:
+                return np.zeros(shape, dtype=spec["dtype"])
+            if mmap:
+                return np.memmap(path, dtype=spec["dtype"], mode="r",
+                                 offset=data_start + spec["offset"], shape=shape)
+            count = int(np.prod(shape))
+            with open(path, "rb") as f:
+                f.seek(data_start + spec["offset"])
+                return np.fromfile(f, dtype=spec["dtype"], count=count).reshape(shape)
+
+        index = cls(header["dim"], header.get("nprobe", DEFAULT_NPROBE))
+        index.centroids = np.array(section("centroids"))     # small: keep in RAM
+        index.offsets = np.array(section("offsets"))
+        index.base_ids = section("ids")
+        index.base_vectors = section("vectors")
+        index._reset_delta()
+        return index
+
+
+# ═══════════════════════════════════════════════════════════════
+# ORACLE ADAPTER
+# ═══════════════════════════════════════════════════════════════
+
+class AnnVectorStore(VectorStore):
+    """
+    VectorStore whose search() goes through an IVFIndex once the corpus is
+    large enough to be worth it. Same interface as VectorStore, so it can be
+    dropped into OracleIndex / search_nexus unchanged.
+    """
+
+    def __init__(self, dim: int = EMBEDDING_DIM, nprobe: int = DEFAULT_NPROBE):
+        self._matrix = None
+        self._mapped_rows = None    # (ids, vectors) of a loaded IVF file, until the matrix is needed
+        super().__init__(dim)
+        self.ivf = IVFIndex(dim, nprobe)
+        self.labels = {}            # (doc key, chunk no) -> int64 label
+        self.label_targets = {}     # int64 label -> (doc key, chunk no)
+        self.next_label = 0
+
+    @property
+    def matrix(self) -> np.ndarray:
+        if self._mapped_rows is not None:
+            # First mutation (or exact search) after load: gather rows from the mapped cells
+            ids, vectors = self._mapped_rows
+            positions = np.empty(self.size, dtype=np.int64)
+            positions[np.asarray(ids)] = np.arange(len(ids))
+            self._matrix = np.ascontiguousarray(vectors[positions], dtype=np.float32)
+            self._mapped_rows = None
+        return self._matrix
+
+    @matrix.setter
+    def matrix(self, value: np.ndarray):
+        self._matrix = value
+        self._mapped_rows = None
+
+    def add(self, key: str, vectors: np.ndarray):
+        super().add(key, vectors)
+        rows = self.doc_rows[key]
+        labels = []
+        for chunk_no in range(len(rows)):
+            label = self.next_label
+            self.next_label += 1
+            self.labels[(key, chunk_no)] = label
+            self.label_targets[label] = (key, chunk_no)
+            labels.append(label)
+        if self.ivf.is_trained:
+            self.ivf.add(labels, self.matrix[rows])
+        elif len(self) >= TRAIN_MIN_VECTORS:
+            self.retrain()
+
+    def remove(self, key: str):
+        rows = self.doc_rows.get(key)
+        if rows:
+            stale = [self.labels.pop((key, n)) for n in range(len(rows))]
+            for label in stale:
+                self.label_targets.pop(label, None)
+            if self.ivf.is_trained:
+                self.ivf.remove(stale)
+        super().remove(key)
+
+    def retrain(self, n_lists: int = None):
+        """(Re)fit the IVF cells on the current live vectors."""
+        live = np.flatnonzero(self.alive[:self.size])
+        labels = np.array([self.labels[(self.row_keys[r], self.row_chunks[r])] for r in live], dtype=np.int64)
+        self.ivf = IVFIndex(self.dim, self.ivf.nprobe)
+        self.ivf.train(self.matrix[live], n_lists=n_lists)
+        self.ivf.add(labels, self.matrix[live])
+
+    def search(self, query_vec: np.ndarray, k: int = 50, keys: list = None, nprobe: int = None) -> list:
+        # A restricted candidate set is scored exactly: it is already small
+        if not self.ivf.is_trained or keys is not None:
+            return super().search(query_vec, k, keys)
+        if not query_vec.any():
+            return []
+        ids, scores = self.ivf.search(query_vec, k, nprobe)
+        return [
+            self.label_targets[int(i)] + (float(s),)
+            for i, s in zip(ids, scores)
+            if s > 0 and int(i) in self.label_targets
+        ]
+
+    def save(self, path: str):
+        super().save(path)          # compacts: rows are renumbered 0..size-1
+        if self.ivf.is_trained:
+            # Relabel IVF ids to row numbers so a later load() can rebuild labels from row order
+            mapping = np.full(self.next_label, -1, dtype=np.int64)
+            for row, target in enumerate(zip(self.row_keys, self.row_chunks)):
+                mapping[self.labels[target]] = row
+            self.ivf.relabel(mapping)
+            self._label_rows()
+            self.ivf.save(path + IVF_SUFFIX)
+
+    def _label_rows(self):
+        self.labels, self.label_targets = {}, {}
+        for row, target in enumerate(zip(self.row_keys, self.row_chunks)):
+            self.labels[target] = row
+            self.label_targets[row] = target
+        self.next_label = self.size
+
+    @classmethod
+    def load(cls, path: str, dim: int = EMBEDDING_DIM):
+        """
+        Open a saved store. With a matching IVF sidecar, cells are memory-mapped
+        and the dense matrix sidecar is not opened.
+        """
+        ivf_path = path + IVF_SUFFIX
+        data = np.load(path)
+        if os.path.exists(ivf_path) and "df" in data.files:
+            ivf = IVFIndex.load(ivf_path)
+            if ivf.dim == dim and len(ivf.base_ids) == len(data["row_keys"]):
+                store = cls(dim, ivf.nprobe)
+                store._load_rows(data)
+                store.ivf = ivf
+                store._mapped_rows = (ivf.base_ids, ivf.base_vectors)
+                # Labels follow compacted row order, which is also how save() wrote the IVF ids
+                store._label_rows()
+                return store
+
+        base = VectorStore.load(path, dim)
+        store = cls(dim)
+        store.__dict__.update({k: v for k, v in base.__dict__.items() if k not in ("ivf", "matrix")})
+        store.matrix = base.matrix
+        store._label_rows()
+        if len(store) >= TRAIN_MIN_VECTORS:
+            store.retrain()
+        return store
+
+
+# ═══════════════════════════════════════════════════════════════
+# RECALL BENCHMARK
+# ═══════════════════════════════════════════════════════════════
+
+def _synthetic_corpus(n: int, dim: int, n_topics: int = 512, seed: int = 0) -> np.ndarray:
+    """Clustered unit vectors, roughly like hashed text embeddings grouped by topic."""
+    rng = np.random.default_rng(seed)
+    topics = rng.standard_normal((n_topics, dim)).astype(np.float32)
+    data = np.empty((n, dim), dtype=np.float32)
+    for start in range(0, n, 65536):
+        stop = min(n, start + 65536)
+        assignment = rng.integers(0, n_topics, stop - start)
+        data[start:stop] = topics[assignment] + 0.75 * rng.standard_normal((stop - start, dim)).astype(np.float32)
+    data /= np.linalg.norm(data, axis=1, keepdims=True)
+    return data
+
+
+def benchmark_recall(n_vectors: int = 100_000, dim: int = EMBEDDING_DIM, n_queries: int = 200,
+                     k: int = 10, nprobes: tuple = (1, 2, 4, 8, 16, 32), seed: int = 0) -> dict:
+    """
+    Compare IVF against exact brute force on a synthetic corpus.
+
+    Returns:
+        dict: Build time, exact latency, and recall@k / mean latency per nprobe
+    """
+    rng = np.random.default_rng(seed + 1)
+    data = _synthetic_corpus(n_vectors, dim, seed=seed)
+    queries = data[rng.choice(n_vectors, n_queries, replace=False)]
+    queries = queries + 0.25 * rng.standard_normal(queries.shape).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    t0 = time.perf_counter()
+    index = IVFIndex(dim)
+    index.train(data)
+    index.add(np.arange(n_vectors), data)
+    build_seconds = time.perf_counter() - t0
+
+    truth = []
+    t0 = time.perf_counter()
+    for q in queries:
+        scores = data @ q
+        top = np.argpartition(-scores, k - 1)[:k]
+        truth.append(set(top.tolist()))
+    exact_ms = (time.perf_counter() - t0) / n_queries * 1000
+
+    report = {
+        "n_vectors": n_vectors, "dim": dim, "k": k, "n_lists": index.n_lists,
+        "build_seconds": round(build_seconds, 2), "exact_ms": round(exact_ms, 3), "ivf": [],
+    }
+    for nprobe in nprobes:
+        hits = 0
+        t0 = time.perf_counter()
+        for q, expected in zip(queries, truth):
+            ids, _ = index.search(q, k, nprobe)
+            hits += len(expected.intersection(ids.tolist()))
+        latency_ms = (time.perf_counter() - t0) / n_queries * 1000
+        report["ivf"].append({
+            "nprobe": nprobe,
+            "recall_at_k": round(hits / (n_queries * k), 4),
+            "latency_ms": round(latency_ms, 3),
+        })
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="IVF vs exact recall benchmark")
+    parser.add_argument("--vectors", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=EMBEDDING_DIM)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    args = parser.parse_args()
+
+    print(json.dumps(benchmark_recall(args.vectors, args.dim, args.queries, args.k, tuple(args.nprobe)), indent=2))
@@ -0,0 +1,185 @@
+"""
+BASIN::NEXUS // COMPRESSED BITMAPS
+Roaring-style bitmap over non-negative integer ids.
+
+Ids are split into a 16-bit high key and a 16-bit low value. Each high key
+owns a container: a sorted list of lows while sparse (<= 4096 entries), or a
+65536-bit Python int once dense. Sparse sets stay small, dense sets get
+word-parallel AND/OR from Python's big-int arithmetic.
+"""
+
+import bisect
+
+
+ARRAY_MAX = 4096
+LOW_MASK = 0xFFFF
+
+
+def _to_bits(values) -> int:
+    bits = 0
+    for v in values:
+        bits |= 1 << v
+    return bits
+
+
+def _from_bits(bits: int) -> list:
+    values = []
+    base = 0
+    while bits:
+        chunk = bits & 0xFFFFFFFFFFFFFFFF
+        while chunk:
+            low = chunk & -chunk
+            values.append(base + low.bit_length() - 1)
+            chunk ^= low
+        bits >>= 64
+        base += 64
+    return values
+
+
+def _normalise(container):
+    """Pick the cheaper representation; None for empty."""
+    if isinstance(container, int):
+        count = container.bit_count()
+        if count == 0:
+            return None
+        return _from_bits(container) if count <= ARRAY_MAX else container
+    if not container:
+        return None
+    return _to_bits(container) if len(container) > ARRAY_MAX else container
+
+
+class Bitmap:
+    """Compressed set of non-negative ints with fast intersection and union."""
+
+    __slots__ = ("containers",)
+
+    def __init__(self, values=None):
+        self.containers = {}
+        if values is not None:
+            groups = {}
+            for v in values:
+                groups.setdefault(v >> 16, []).append(v & LOW_MASK)
+            for high, lows in groups.items():
+                container = _normalise(sorted(set(lows)))
+                if container is not None:
+                    self.containers[high] = container
+
+    # --- Mutation ---
+
+    def add(self, value: int):
+        high, low = value >> 16, value & LOW_MASK
+        container = self.containers.get(high)
+        if container is None:
+            self.containers[high] = [low]
+        elif isinstance(container, int):
+            self.containers[high] = container | (1 << low)
+        else:
+            i = bisect.bisect_left(container, low)
+            if i == len(container) or container[i] != low:
+                container.insert(i, low)
+                if len(container) > ARRAY_MAX:
+                    self.containers[high] = _to_bits(container)
+
+    def discard(self, value: int):
+        high, low = value >> 16, value & LOW_MASK
+        container = self.containers.get(high)
+        if container is None:
+            return
+        if isinstance(container, int):
+            container &= ~(1 << low)
+        else:
+            i = bisect.bisect_left(container, low)
+            if i < len(container) and container[i] == low:
+                container = container[:i] + container[i + 1:]
+        container = _normalise(container)
+        if container is None:
+            del self.containers[high]
+        else:
+            self.containers[high] = container
+
+    # --- Queries ---
+
+    def __contains__(self, value: int) -> bool:
+        container = self.containers.get(value >> 16)
+        if container is None:
+            return False
+        low = value & LOW_MASK
+        if isinstance(container, int):
+            return bool((container >> low) & 1)
+        i = bisect.bisect_left(container, low)
+        return i < len(container) and container[i] == low
+
+    def __len__(self) -> int:
+        return sum(c.bit_count() if isinstance(c, int) else len(c) for c in self.containers.values())
+
+    def __bool__(self) -> bool:
+        return bool(self.containers)
+
+    def __iter__(self):
+        for high in sorted(self.containers):
+            container = self.containers[high]
+            lows = _from_bits(container) if isinstance(container, int) else container
+            base = high << 16
+            for low in lows:
+                yield base + low
+
+    def __and__(self, other: "Bitmap") -> "Bitmap":
+        result = Bitmap()
+        small, large = (self, other) if len(self.containers) <= len(other.containers) else (other, self)
+        for high, a in small.containers.items():
+            b = large.containers.get(high)
+            if b is None:
+                continue
+            if isinstance(a, int) and isinstance(b, int):
+                merged = a & b
+            elif isinstance(a, int):
+                merged = [v for v in b if (a >> v) & 1]
+            elif isinstance(b, int):
+                merged = [v for v in a if (b >> v) & 1]
+            else:
+                merged = sorted(set(a).intersection(b))
+            merged = _normalise(merged)
+            if merged is not None:
+                result.containers[high] = merged
+        return result
+
+    def __or__(self, other: "Bitmap") -> "Bitmap":
+        result = Bitmap()
+        for high in set(self.containers) | set(other.containers):
+            a = self.containers.get(high)
+            b = other.containers.get(high)
+            if a is None or b is None:
+                only = a if b is None else b
+                result.containers[high] = only if isinstance(only, int) else list(only)
+                continue
+            if isinstance(a, int) or isinstance(b, int):
+                merged = (a if isinstance(a, int) else _to_bits(a)) | (b if isinstance(b, int) else _to_bits(b))
+            else:
+                merged = sorted(set(a).union(b))
+            result.containers[high] = _normalise(merged)
+        return result
+
+    def copy(self) -> "Bitmap":
+        result = Bitmap()
+        result.containers = {h: (c if isinstance(c, int) else list(c)) for h, c in self.containers.items()}
+        return result
+
+    @staticmethod
+    def union_all(bitmaps) -> "Bitmap":
+        result = Bitmap()
+        for bitmap in bitmaps:
+            result = result | bitmap
+        return result
+
+    @staticmethod
+    def intersect_all(bitmaps) -> "Bitmap":
+        """Intersect, smallest first so the working set shrinks fastest."""
+        ordered = sorted(bitmaps, key=len)
+        if not ordered:
+            return Bitmap()
+        result = ordered[0]
+        for bitmap in ordered[1:]:
+            if not result:
+                break
+            result = result & bitmap
+        return result
@@ -0,0 +1,186 @@
+"""
+BASIN::NEXUS // PASSAGE CHUNKER
+Splits markdown assets into retrievable passages for the Oracle.
+
+Chunks follow markdown structure: every heading opens a new section, and
+sections are packed paragraph-by-paragraph up to a token budget with a
+small overlap between consecutive chunks. Each chunk is a contiguous
+slice of the source text, described by (start, end) character offsets.
+"""
+
+import re
+
+
+# ═══════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ═══════════════════════════════════════════════════════════════
+
+DEFAULT_MAX_TOKENS = 220
+DEFAULT_OVERLAP_TOKENS = 40
+
+HEADING_RE = re.compile(r"^#{1,6}\s+(.*)$")
+PARAGRAPH_BREAK_RE = re.compile(r"\n[ \t]*\n")
+SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def count_tokens(text: str) -> int:
+    """Rough token count (4 chars per token); cheap enough for index builds. logic.tokenizer counts exactly."""
+    return max(1, len(text) // 4)
+
+
+# ═══════════════════════════════════════════════════════════════
+# BLOCK SPLITTING
+# ═══════════════════════════════════════════════════════════════
+
+def _split_blocks(text: str) -> list:
+    """
+    Split text into paragraph blocks with offsets.
+
+    Returns:
+        list: (start, end, heading_or_None) for each non-empty block.
+              A block whose first line is a markdown heading carries that heading.
+    """
+    segments = []
+    pos = 0
+    for match in list(PARAGRAPH_BREAK_RE.finditer(text)) + [None]:
+        end = match.start() if match else len(text)
+        seg_start = pos
+        line_start = pos
+        # Headings glued to the paragraph above still open a new block
+        for line in text[pos:end].split("\n"):
+            if line_start > seg_start and HEADING_RE.match(line.strip()):
+                segments.append((seg_start, line_start - 1))
+                seg_start = line_start
+            line_start += len(line) + 1
+        segments.append((seg_start, end))
+        pos = match.end() if match else len(text)
+
+    blocks = []
+    for start, end in segments:
+        raw = text[start:end]
+        stripped = raw.strip()
+        if not stripped:
+            continue
+        start += len(raw) - len(raw.lstrip())
+        end = start + len(stripped)
+        heading = HEADING_RE.match(stripped.split("\n", 1)[0].strip())
+        blocks.append((start, end, heading.group(1).strip() if heading else None))
+    return blocks
+
+
+def _split_oversized(text: str, start: int, end: int, max_tokens: int, overlap_tokens: int) -> list:
+    """Split a single block that exceeds the budget on sentence boundaries (hard cut as last resort)."""
+    max_chars = max_tokens * 4
+    overlap_chars = overlap_tokens * 4
+    pieces = []
+    cursor = start
+    while cursor < end:
+        limit = min(end, cursor + max_chars)
+        cut = limit
+        if limit < end:
+            window = text[cursor:limit]
+            boundaries = [m.end() for m in SENTENCE_END_RE.finditer(window)]
+            if boundaries and boundaries[-1] > max_chars // 2:
+                cut = cursor + boundaries[-1]
+        pieces.append((cursor, cut))
+        if cut >= end:
+            break
+        cursor = max(cut - overlap_chars, cursor + 1)
+    return pieces
+
+
+# ═══════════════════════════════════════════════════════════════
+# CHUNKER
+# ═══════════════════════════════════════════════════════════════
+
+def chunk_markdown(text: str, max_tokens: int = DEFAULT_MAX_TOKENS,
+                   overlap_tokens: int = DEFAULT_OVERLAP_TOKENS) -> list:
+    """
+    Chunk markdown text on heading and paragraph boundaries.
+
+    Args:
+        text: Source document
+        max_tokens: Token budget per chunk
+        overlap_tokens: Tokens of trailing context repeated at the start of the next chunk
+
+    Returns:
+        list: Chunk dicts with 'start', 'end' (char offsets into text) and 'heading'
+    """
+    if not text.strip():
+        return []
+
+    chunks = []
+    current = []        # (start, end) blocks in the open chunk
+    current_tokens = 0
+    heading = None
+
+    def flush(keep_overlap: bool):
+        nonlocal current, current_tokens
+        if not current:
+            return
+        chunks.append({"start": current[0][0], "end": current[-1][1], "heading": heading})
+        carried = []
+        if keep_overlap:
+            budget = overlap_tokens
+            for block in reversed(current[1:]):
+                cost = count_tokens(text[block[0]:block[1]])
+                if cost > budget:
+                    break
+                carried.insert(0, block)
+                budget -= cost
+        current = carried
+        current_tokens = sum(count_tokens(text[s:e]) for s, e in carried)
+
+    for start, end, block_heading in _split_blocks(text):
+        if block_heading is not None:
+            flush(keep_overlap=False)
+            heading = block_heading
+
+        cost = count_tokens(text[start:end])
+        if cost > max_tokens:
+            flush(keep_overlap=False)
+            for piece_start, piece_end in _split_oversized(text, start, end, max_tokens, overlap_tokens):
+                chunks.append({"start": piece_start, "end": piece_end, "heading": heading})
+            continue
+
+        if current and current_tokens + cost > max_tokens:
+            flush(keep_overlap=True)
+        current.append((start, end))
+        current_tokens += cost
+
+    flush(keep_overlap=False)
+    return chunks
+
+
+def merge_adjacent(hits: list, gap: int = 4) -> list:
+    """
+    Merge hits from the same document whose character ranges overlap or sit
+    within `gap` characters of each other.
+
+    Args:
+        hits: Dicts with 'key', 'start', 'end' and 'score'
+
+    Returns:
+        list: Merged hits; score is the best member score plus a small bonus
+              per extra member so contiguous evidence ranks above an isolated hit.
+    """
+    by_doc = {}
+    for hit in hits:
+        by_doc.setdefault(hit["key"], []).append(hit)
+
+    merged = []
+    for doc_hits in by_doc.values():
+        doc_hits.sort(key=lambda h: h["start"])
+        group = dict(doc_hits[0], members=1)
+        for hit in doc_hits[1:]:
+            if hit["start"] <= group["end"] + gap:
+                group["end"] = max(group["end"], hit["end"])
+                group["score"] = max(group["score"], hit["score"]) + 1
+                group["members"] += 1
+                if group.get("heading") is None:
+                    group["heading"] = hit.get("heading")
+            else:
+                merged.append(group)
+                group = dict(hit, members=1)
+        merged.append(group)
+    return merged
@@ -0,0 +1,194 @@
+"""
+BASIN::NEXUS // CLUSTER ENGINE
+Deal <-> Contact overlap by company, as a hash join on normalised company names.
+
+"Databricks", "databricks inc." and "Databricks, Inc" all land in the same
+bucket. The engine is built once in linear time and then kept current with
+per-record upserts/removals, so callers never rescan the CRM. A trigram
+index over every company and contact name catches typos the exact key misses.
+"""
+
+import threading
+
+from logic.fuzzy_names import TrigramIndex, normalize_company
+
+
+# Contacts whose company only fuzzily matches a deal company ("Databriks")
+# are joined when trigram Dice similarity reaches this threshold
+FUZZY_JOIN_THRESHOLD = 0.7
+
+
+# ═══════════════════════════════════════════════════════════════
+# ENGINE
+# ═══════════════════════════════════════════════════════════════
+
+class ClusterEngine:
+    """
+    Hash index of deals and contacts by normalised company.
+
+    Every deal per company is kept (not just the last one). Records are
+    keyed by their database id, so an update that changes a record's
+    company moves it between buckets.
+    """
+
+    def __init__(self):
+        self.deals = {}             # company key -> {deal id: deal}
+        self.contacts = {}          # company key -> {contact id: contact}
+        self.display_names = {}     # company key -> name as first seen on a deal
+        self._deal_company = {}     # deal id -> company key
+        self._contact_company = {}  # contact id -> company key
+        self.names = TrigramIndex() # ("company", key) / ("contact", id) -> name
+        self._fuzzy_links = None    # contact-only company key -> deal company key (lazy)
+        self._lock = threading.RLock()
+
+    def build(self, deals: list, contacts: list):
+        """Rebuild from full record lists. O(deals + contacts)."""
+        with self._lock:
+            for index in (self.deals, self.contacts, self.display_names,
+                          self._deal_company, self._contact_company):
+                index.clear()
+            self.names = TrigramIndex()
+            self._fuzzy_links = None
+            for deal in deals:
+                self.upsert_deal(deal)
+            for contact in contacts:
+                self.upsert_contact(contact)
+        return self
+
+    # --- Incremental updates ---
+
+    def upsert_deal(self, deal: dict):
+        key = normalize_company(deal.get("company"))
+        with self._lock:
+            self.remove_deal(deal["id"])
+            if not key:
+                return
+            self.deals.setdefault(key, {})[deal["id"]] = deal
+            self.display_names.setdefault(key, deal["company"])
+            self._deal_company[deal["id"]] = key
+            self.names.add(("company", key), deal["company"], "company")
+            self._fuzzy_links = None
+
+    def remove_deal(self, deal_id):
+        with self._lock:
+            key = self._deal_company.pop(deal_id, None)
+            if key is None:
+                return
+            bucket = self.deals.get(key, {})
+            bucket.pop(deal_id, None)
+            if not bucket:
+                self.deals.pop(key, None)
+                self.display_names.pop(key, None)
+                self._drop_company_name(key)
+            self._fuzzy_links = None
+
+    def upsert_contact(self, contact: dict):
+        key = normalize_company(contact.get("company"))
+        with self._lock:
+            self.remove_contact(contact["id"])
+            if not key:
+                return
+            self.contacts.setdefault(key, {})[contact["id"]] = contact
+            self._contact_company[contact["id"]] = key
+            if ("company", key) not in self.names.entries:
+                self.names.add(("company", key), contact["company"], "company")
+            self._fuzzy_links = None
+        if contact.get("name"):
+            self.names.add(("contact", contact["id"]), contact["name"], "contact")
+
+    def remove_contact(self, contact_id):
+        with self._lock:
+            self.names.remove(("contact", contact_id))
+            key = self._contact_company.pop(contact_id, None)
+            if key is None:
+                return
+            bucket = self.contacts.get(key, {})
+            bucket.pop(contact_id, None)
+            if not bucket:
+                self.contacts.pop(key, None)
+                self._drop_company_name(key)
+            self._fuzzy_links = None
+
+    def _drop_company_name(self, key: str):
+        if key not in self.deals and key not in self.contacts:
+            self.names.remove(("company", key))
+
+    # --- Fuzzy resolution ---
+
+    def resolve_company(self, company: str, threshold: float = FUZZY_JOIN_THRESHOLD) -> str:
+        """Company key for any spelling: exact normalised key, else the closest known company."""
+        key = normalize_company(company)
+        if key in self.deals or key in self.contacts:
+            return key
+        match = self.names.best_match(company, threshold, kind="company")
+        return match[0][1] if match else key
+
+    def _links(self) -> dict:
+        """Map contact company keys with no exact deal bucket onto their closest deal company."""
+        with self._lock:
+            if self._fuzzy_links is None:
+                links = {}
+                for key, contacts in self.contacts.items():
+                    if key in self.deals:
+                        continue
+                    name = next(iter(contacts.values()))["company"]
+                    for (kind, match_key), _, _ in self.names.search(name, 5, FUZZY_JOIN_THRESHOLD, kind="company"):
+                        if match_key != key and match_key in self.deals:
+                            links[key] = match_key
+                            break
+                self._fuzzy_links = links
+            return self._fuzzy_links
+
+    def _contacts_for(self, deal_key: str) -> list:
+        contacts = list(self.contacts.get(deal_key, {}).values())
+        for contact_key, linked in self._links().items():
+            if linked == deal_key:
+                contacts.extend(self.contacts[contact_key].values())
+        return contacts
+
+    # --- Queries ---
+
+    def cluster_for(self, company: str) -> dict:
+        """
+        Deals and contacts for one company (any spelling).
+
+        Returns:
+            dict: 'company', 'deals' and 'contacts' (lists, possibly empty)
+        """
+        with self._lock:
+            key = self.resolve_company(company)
+            return {
+                "company": self.display_names.get(key, company),
+                "deals": list(self.deals.get(key, {}).values()),
+                "contacts": self._contacts_for(key),
+            }
+
+    def has_contacts(self, company: str) -> bool:
+        with self._lock:
+            return bool(self._contacts_for(self.resolve_company(company)))
+
+    def deal_companies(self) -> list:
+        """Display names of every company with at least one deal, sorted."""
+        with self._lock:
+            return sorted(self.display_names.values(), key=str.lower)
+
+    def clusters(self) -> dict:
+        """
+        Companies that have BOTH a deal and at least one contact.
+
+        Returns:
+            dict: display name -> {'deal': first deal, 'deals': [...], 'contacts': [...]}
+        """
+        with self._lock:
+            result = {}
+            for key, deals in self.deals.items():
+                contacts = self._contacts_for(key)
+                if not contacts:
+                    continue
+                deal_list = list(deals.values())
+                result[self.display_names[key]] = {
+                    "deal": deal_list[0],
+                    "deals": deal_list,
+                    "contacts": contacts,
+                }
+            return result
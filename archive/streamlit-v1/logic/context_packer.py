@@ -0,0 +1,173 @@
+"""
+BASIN::NEXUS // ORACLE CONTEXT PACKER
+Turns ranked search passages into an LLM context that fits a token budget.
+
+1. Near-duplicate passages are dropped using MinHash signatures over word
+   shingles (estimated Jaccard >= DUPLICATE_THRESHOLD).
+2. Survivors are ordered by score with a per-source decay, so one long file
+   cannot crowd out every other source.
+3. Passages are packed greedily until the per-model budget is spent.
+
+Everything that was left out is reported with the reason, so the UI can
+show what the model did not see.
+"""
+
+import zlib
+
+import numpy as np
+
+from logic.tokenizer import context_window, count_tokens
+from logic.embeddings import tokenize
+
+
+# ═══════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ═══════════════════════════════════════════════════════════════
+
+# Retrieval context never takes more than this share of the window...
+CONTEXT_FRACTION = 0.5
+# ...nor more than this many tokens: latency and cost track the budget, not the match count
+MAX_CONTEXT_TOKENS = 3000
+# Room kept for the instructions, the query and the answer
+RESERVED_TOKENS = 1024
+
+# MinHash
+NUM_PERMUTATIONS = 64
+SHINGLE_SIZE = 3
+DUPLICATE_THRESHOLD = 0.8
+_MERSENNE_PRIME = (1 << 31) - 1
+
+# Each further passage from an already-used source has its score multiplied by this
+SOURCE_DECAY = 0.7
+
+PASSAGE_SEPARATOR = "\n\n---\n\n"
+
+
+def context_budget(model_name: str, max_tokens: int = MAX_CONTEXT_TOKENS) -> int:
+    """Tokens of retrieved context to send to `model_name`."""
+    window = context_window(model_name)
+    return max(0, min(max_tokens, int(window * CONTEXT_FRACTION), window - RESERVED_TOKENS))
+
+
+# ═══════════════════════════════════════════════════════════════
+# MINHASH
+# ═══════════════════════════════════════════════════════════════
+
+_rng = np.random.default_rng(0x0BA5)
+_PERM_A = _rng.integers(1, _MERSENNE_PRIME, NUM_PERMUTATIONS, dtype=np.uint64)
+_PERM_B = _rng.integers(0, _MERSENNE_PRIME, NUM_PERMUTATIONS, dtype=np.uint64)
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set:
+    """Word n-grams of a passage (the whole token list if it is shorter than `size`)."""
+    words = tokenize(text)
+    if len(words) < size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def minhash(text: str) -> np.ndarray:
+    """
+    MinHash signature: for each of NUM_PERMUTATIONS hash functions
+    (a*x + b) mod p, the minimum over the passage's shingle hashes.
+    """
+    grams = shingles(text)
+    if not grams:
+        return np.full(NUM_PERMUTATIONS, _MERSENNE_PRIME, dtype=np.uint64)
+    hashes = np.fromiter((zlib.crc32(g.encode("utf-8")) & _MERSENNE_PRIME for g in grams),
+                         dtype=np.uint64, count=len(grams))
+    # a < 2^31 and x < 2^31, so a*x + b stays below 2^63
+    permuted = (_PERM_A[:, None] * hashes[None, :] + _PERM_B[:, None]) % _MERSENNE_PRIME
+    return permuted.min(axis=1)
+
+
+def estimated_jaccard(a: np.ndarray, b: np.ndarray) -> float:
+    return float(np.count_nonzero(a == b)) / len(a)
+
+
+# ═══════════════════════════════════════════════════════════════
+# PACKING
+# ═══════════════════════════════════════════════════════════════
+
+def format_passage(result: dict) -> str:
+    return f"Source: {result['source']}\nContent: {result['passage']}"
+
+
+def _diversify(results: list) -> list:
+    """Greedy re-order: highest score first, decaying repeat sources by SOURCE_DECAY."""
+    remaining = list(results)
+    used = {}
+    ordered = []
+    while remaining:
+        best = max(range(len(remaining)),
+                   key=lambda i: remaining[i]["score"] * SOURCE_DECAY ** used.get(remaining[i]["source"], 0))
+        result = remaining.pop(best)
+        used[result["source"]] = used.get(result["source"], 0) + 1
+        ordered.append(result)
+    return ordered
+
+
+def pack_context(results: list, budget: int, max_candidates: int = 50,
+                 duplicate_threshold: float = DUPLICATE_THRESHOLD, model: str = None) -> dict:
+    """
+    Select and format search passages for the LLM prompt.
+
+    Args:
+        results: search_nexus() passages, best first
+        budget: Token budget for the packed context (see context_budget())
+        max_candidates: Only the top results are considered at all
+        duplicate_threshold: Estimated Jaccard above which a passage is a near-duplicate
+        model: Model the context is for; selects the vocabulary tokens are counted with
+
+    Returns:
+        dict: 'text' (joined context), 'passages' (results included, in prompt order),
+              'tokens' (tokens used), 'budget', and 'dropped' (list of
+              {'source', 'score', 'tokens', 'reason'} with reason one of
+              'duplicate', 'budget', 'rank'; tokens is None for 'rank')
+    """
+    candidates = results[:max_candidates]
+    # Passages below the cutoff are never read, so their size is not known
+    dropped = [{"source": r["source"], "score": r["score"], "tokens": None,
+                "reason": "rank"} for r in results[max_candidates:]]
+
+    # 1. Near-duplicate removal (best-scored copy wins)
+    unique, signatures = [], []
+    for result in sorted(candidates, key=lambda r: -r["score"]):
+        signature = minhash(result["passage"])
+        if any(estimated_jaccard(signature, kept) >= duplicate_threshold for kept in signatures):
+            dropped.append({"source": result["source"], "score": result["score"],
+                            "tokens": count_tokens(result["passage"], model), "reason": "duplicate"})
+            continue
+        unique.append(result)
+        signatures.append(signature)
+
+    # 2. Score + source diversity ordering, 3. greedy packing
+    separator_tokens = count_tokens(PASSAGE_SEPARATOR, model)
+    passages, blocks, used = [], [], 0
+    for result in _diversify(unique):
+        block = format_passage(result)
+        cost = count_tokens(block, model) + (separator_tokens if blocks else 0)
+        if used + cost > budget:
+            dropped.append({"source": result["source"], "score": result["score"],
+                            "tokens": cost, "reason": "budget"})
+            continue
+        passages.append(result)
+        blocks.append(block)
+        used += cost
+
+    return {
+        "text": PASSAGE_SEPARATOR.join(blocks),
+        "passages": passages,
+        "tokens": used,
+        "budget": budget,
+        "dropped": dropped,
+    }
+
+
+def summarize_dropped(dropped: list) -> str:
+    """One-line summary like '3 over budget, 2 near-duplicates'."""
+    labels = {"budget": "over budget", "duplicate": "near-duplicates", "rank": "below rank cutoff"}
+    counts = {}
+    for item in dropped:
+        counts[item["reason"]] = counts.get(item["reason"], 0) + 1
+    return ", ".join(f"{n} {labels[reason]}" for reason, n in counts.items())
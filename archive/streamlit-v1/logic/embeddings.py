@@ -0,0 +1,246 @@
+"""
+BASIN::NEXUS // LOCAL EMBEDDINGS
+Offline vector retrieval for the Oracle. No network, no GPU.
+
+Text is embedded with signed feature hashing over sublinear term
+frequencies, so the same text always maps to the same vector. Vectors
+live in one contiguous float32 matrix; a query is a single matrix-vector
+product followed by an argpartition top-k.
+
+A saved store is a .npz of row labels plus the matrix as a raw .npy
+sidecar, which load() memory-maps read-only: processes serving the same
+index share its pages, and the matrix is only copied into the heap when
+the store is mutated.
+"""
+
+import os
+import re
+import zlib
+import math
+
+import numpy as np
+
+
+# ═══════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ═══════════════════════════════════════════════════════════════
+
+EMBEDDING_DIM = 256
+MATRIX_SUFFIX = ".matrix.npy"       # matrix sidecar written next to the .npz
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> list:
+    """Lowercase alphanumeric tokens."""
+    return TOKEN_RE.findall(text.lower())
+
+
+def _bucket(token: str, dim: int) -> tuple:
+    """Hash a token to (bucket, sign). crc32 keeps it deterministic across processes."""
+    h = zlib.crc32(token.encode("utf-8"))
+    return h % dim, (1.0 if (h >> 31) & 1 else -1.0)
+
+
+# ═══════════════════════════════════════════════════════════════
+# EMBEDDER
+# ═══════════════════════════════════════════════════════════════
+
+def embed_text(text: str, dim: int = EMBEDDING_DIM, idf: np.ndarray = None) -> np.ndarray:
+    """
+    Embed text as an L2-normalised hashed TF (optionally TF-IDF) vector.
+
+    Args:
+        text: Input text
+        dim: Vector dimensionality
+        idf: Optional per-bucket IDF weights (used for queries)
+
+    Returns:
+        np.ndarray: float32 vector of shape (dim,); all zeros for empty text
+    """
+    counts = {}
+    for token in tokenize(text):
+        counts[token] = counts.get(token, 0) + 1
+
+    vec = np.zeros(dim, dtype=np.float32)
+    for token, tf in counts.items():
+        bucket, sign = _bucket(token, dim)
+        vec[bucket] += sign * (1.0 + math.log(tf))
+
+    if idf is not None:
+        vec *= idf
+    norm = np.linalg.norm(vec)
+    if norm > 0:
+        vec /= norm
+    return vec
+
+
+# ═══════════════════════════════════════════════════════════════
+# VECTOR STORE
+# ═══════════════════════════════════════════════════════════════
+
+class VectorStore:
+    """
+    Append-only float32 matrix of unit vectors with tombstoned deletes.
+
+    Each row is labelled with (doc key, chunk number). Removing a document
+    marks its rows dead; the matrix is compacted once dead rows dominate.
+    Bucket document frequencies are maintained incrementally so query
+    vectors can be IDF-weighted without re-embedding the corpus.
+    """
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+        self.matrix = np.zeros((0, dim), dtype=np.float32)
+        self.alive = np.zeros(0, dtype=bool)
+        self.size = 0
+        self.row_keys = []          # row -> doc key
+        self.row_chunks = []        # row -> chunk number within the doc
+        self.doc_rows = {}          # doc key -> [rows]
+        self.df = np.zeros(dim, dtype=np.float32)
+
+    def __len__(self):
+        return int(self.alive[:self.size].sum())
+
+    def _reserve(self, extra: int):
+        needed = self.size + extra
+        if needed <= self.matrix.shape[0] and self.matrix.flags.writeable:
+            return
+        capacity = max(needed, 2 * self.matrix.shape[0], 64)
+        matrix = np.zeros((capacity, self.dim), dtype=np.float32)
+        matrix[:self.size] = self.matrix[:self.size]
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:self.size] = self.alive[:self.size]
+        self.matrix, self.alive = matrix, alive
+
+    def add(self, key: str, vectors: np.ndarray):
+        """Add (or replace) all chunk vectors for a document."""
+        self.remove(key)
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        n = vectors.shape[0]
+        self._reserve(n)
+        rows = list(range(self.size, self.size + n))
+        self.matrix[self.size:self.size + n] = vectors
+        self.alive[self.size:self.size + n] = True
+        self.size += n
+        self.row_keys.extend([key] * n)
+        self.row_chunks.extend(range(n))
+        self.doc_rows[key] = rows
+        self.df += (vectors != 0).sum(axis=0)
+
+    def remove(self, key: str):
+        rows = self.doc_rows.pop(key, None)
+        if not rows:
+            return
+        self.df -= (self.matrix[rows] != 0).sum(axis=0)
+        self.alive[rows] = False
+        if self.size > 1024 and len(self) < self.size // 2:
+            self.compact()
+
+    def compact(self):
+        """Drop dead rows and renumber."""
+        if self.matrix.shape[0] == self.size and self.alive[:self.size].all():
+            return                  # nothing to drop (and a mapped matrix stays mapped)
+        keep = np.flatnonzero(self.alive[:self.size])
+        self.matrix = np.ascontiguousarray(self.matrix[keep])
+        self.alive = np.ones(len(keep), dtype=bool)
+        self.row_keys = [self.row_keys[i] for i in keep]
+        self.row_chunks = [self.row_chunks[i] for i in keep]
+        self.size = len(keep)
+        self.doc_rows = {}
+        for row, key in enumerate(self.row_keys):
+            self.doc_rows.setdefault(key, []).append(row)
+
+    def idf(self) -> np.ndarray:
+        n = max(len(self), 1)
+        return np.log((1.0 + n) / (1.0 + self.df)).astype(np.float32) + 1.0
+
+    def embed_query(self, query: str) -> np.ndarray:
+        return embed_text(query, self.dim, idf=self.idf())
+
+    def search(self, query_vec: np.ndarray, k: int = 50, keys: list = None) -> list:
+        """
+        Exact cosine top-k.
+
+        Args:
+            query_vec: Unit query vector
+            k: Results wanted
+            keys: Optional doc keys to restrict scoring to (e.g. facet candidates)
+
+        Returns:
+            list: (doc key, chunk number, similarity) sorted best-first
+        """
+        if self.size == 0 or not query_vec.any():
+            return []
+        if keys is not None:
+            rows = np.array([r for key in keys for r in self.doc_rows.get(key, ())], dtype=np.int64)
+            if len(rows) == 0:
+                return []
+            scores = self.matrix[rows] @ query_vec
+        else:
+            rows = None
+            scores = self.matrix[:self.size] @ query_vec
+            scores[~self.alive[:self.size]] = -np.inf
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        if rows is not None:
+            return [
+                (self.row_keys[rows[i]], self.row_chunks[rows[i]], float(scores[i]))
+                for i in top if scores[i] > 0
+            ]
+        return [
+            (self.row_keys[i], self.row_chunks[i], float(scores[i]))
+            for i in top if scores[i] > 0
+        ]
+
+    # --- Persistence ---
+
+    def save(self, path: str):
+        """Write live rows: labels and frequencies to a .npz, the matrix to path + MATRIX_SUFFIX."""
+        self.compact()
+        # Written aside and renamed: the current matrix may be a mapping of the old file
+        tmp_path = path + MATRIX_SUFFIX + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, np.ascontiguousarray(self.matrix[:self.size], dtype=np.float32))
+        os.replace(tmp_path, path + MATRIX_SUFFIX)
+        np.savez(
+            path,
+            row_keys=np.array(self.row_keys, dtype=str),
+            row_chunks=np.array(self.row_chunks, dtype=np.int32),
+            df=self.df,
+        )
+
+    def _load_rows(self, data):
+        """Row labels and document frequencies from a saved .npz (everything but the matrix)."""
+        self.row_keys = [str(k) for k in data["row_keys"]]
+        self.row_chunks = [int(c) for c in data["row_chunks"]]
+        self.size = len(self.row_keys)
+        self.alive = np.ones(self.size, dtype=bool)
+        self.doc_rows = {}
+        for row, key in enumerate(self.row_keys):
+            self.doc_rows.setdefault(key, []).append(row)
+        if "df" in data.files:
+            self.df = data["df"].astype(np.float32)
+
+    @classmethod
+    def load(cls, path: str, dim: int = EMBEDDING_DIM):
+        """
+        Open a saved store. The matrix sidecar is memory-mapped read-only;
+        files from before the sidecar (matrix inside the .npz) are read into memory.
+        """
+        data = np.load(path)
+        store = cls(dim)
+        if "matrix" in data.files:
+            matrix = np.ascontiguousarray(data["matrix"], dtype=np.float32)
+        else:
+            matrix = np.load(path + MATRIX_SUFFIX, mmap_mode="r")
+            if matrix.dtype != np.float32:
+                raise ValueError("Vector matrix is not float32")
+        if matrix.ndim != 2 or (matrix.shape[0] and matrix.shape[1] != dim) \
+                or matrix.shape[0] != len(data["row_keys"]):
+            raise ValueError("Vector file dimension mismatch")
+        store.matrix = matrix
+        store._load_rows(data)
+        if "df" not in data.files:
+            store.df = (matrix != 0).sum(axis=0).astype(np.float32)
+        return store
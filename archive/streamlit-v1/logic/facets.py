@@ -0,0 +1,167 @@
+"""
+BASIN::NEXUS // ORACLE FACETS
+Faceted filtering for Oracle search, backed by compressed bitmaps.
+
+Every facet value (document type, deal stage, signal, contact type, company,
+month) owns a Bitmap of document ids. Filters are resolved to a candidate
+bitmap *before* scoring, and facet counts are computed by intersecting the
+result set with each value's bitmap.
+"""
+
+import bisect
+import threading
+
+from logic.bitmap import Bitmap
+from logic.fuzzy_names import normalize_company
+
+
+# ═══════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ═══════════════════════════════════════════════════════════════
+
+FACETS = ["type", "stage", "signal", "contact_type", "company", "month"]
+
+
+def doc_date(doc: dict) -> str:
+    """YYYY-MM-DD for a document: record created_at for CRM rows, file mtime for assets."""
+    metadata = doc.get("metadata") or {}
+    stamp = metadata.get("created_at") or doc.get("modified") or ""
+    return str(stamp)[:10]
+
+
+def extract_facets(doc: dict) -> dict:
+    """
+    Facet values for one document.
+
+    Returns:
+        dict: facet -> value (missing facets are omitted). 'company' is
+              normalised so spellings of the same company share one bitmap.
+    """
+    metadata = doc.get("metadata") or {}
+    values = {"type": doc.get("type", "Doc")}
+    if doc.get("type") == "Deal":
+        values["stage"] = metadata.get("stage")
+        values["signal"] = metadata.get("signal")
+    if doc.get("type") == "Contact":
+        values["contact_type"] = metadata.get("contact_type")
+    if metadata.get("company"):
+        values["company"] = normalize_company(metadata["company"])
+    date = doc_date(doc)
+    if date:
+        values["month"] = date[:7]
+    return {k: v for k, v in values.items() if v}
+
+
+# ═══════════════════════════════════════════════════════════════
+# FACET INDEX
+# ═══════════════════════════════════════════════════════════════
+
+class FacetIndex:
+    """facet -> value -> Bitmap of doc ids, plus a sorted date list for ranges."""
+
+    def __init__(self):
+        self.bitmaps = {facet: {} for facet in FACETS}
+        self.labels = {}            # normalised company -> display name
+        self.all_docs = Bitmap()
+        self._doc_values = {}       # doc id -> (facet values, date)
+        self._dates = []            # sorted (YYYY-MM-DD, doc id)
+        self._lock = threading.RLock()
+
+    def add(self, doc: dict):
+        doc_id = doc["id"]
+        values = extract_facets(doc)
+        date = doc_date(doc)
+        with self._lock:
+            self.remove(doc_id)
+            for facet, value in values.items():
+                self.bitmaps[facet].setdefault(value, Bitmap()).add(doc_id)
+            if "company" in values:
+                self.labels.setdefault(values["company"], (doc.get("metadata") or {}).get("company"))
+            if date:
+                bisect.insort(self._dates, (date, doc_id))
+            self.all_docs.add(doc_id)
+            self._doc_values[doc_id] = (values, date)
+
+    def remove(self, doc_id: int):
+        with self._lock:
+            known = self._doc_values.pop(doc_id, None)
+            if known is None:
+                return
+            values, date = known
+            for facet, value in values.items():
+                bitmap = self.bitmaps[facet].get(value)
+                if bitmap is not None:
+                    bitmap.discard(doc_id)
+                    if not bitmap:
+                        del self.bitmaps[facet][value]
+                        if facet == "company":
+                            self.labels.pop(value, None)
+            if date:
+                i = bisect.bisect_left(self._dates, (date, doc_id))
+                if i < len(self._dates) and self._dates[i] == (date, doc_id):
+                    del self._dates[i]
+            self.all_docs.discard(doc_id)
+
+    # --- Filtering ---
+
+    def date_range(self, date_from: str = None, date_to: str = None) -> Bitmap:
+        """Docs dated within [date_from, date_to] (inclusive, YYYY-MM-DD)."""
+        with self._lock:
+            lo = bisect.bisect_left(self._dates, (date_from or "",))
+            hi = bisect.bisect_right(self._dates, ((date_to or "9999-12-31") + "\uffff",))
+            return Bitmap(doc_id for _, doc_id in self._dates[lo:hi])
+
+    def candidates(self, filters: dict) -> Bitmap:
+        """
+        Resolve filters to a bitmap of doc ids, or None when nothing is filtered.
+
+        Args:
+            filters: facet -> list of accepted values (OR within a facet, AND across
+                     facets), plus optional 'date_from' / 'date_to'
+        """
+        if not filters:
+            return None
+        with self._lock:
+            selected = []
+            for facet in FACETS:
+                wanted = filters.get(facet)
+                if not wanted:
+                    continue
+                if facet == "company":
+                    wanted = [normalize_company(v) for v in wanted]
+                selected.append(Bitmap.union_all(
+                    self.bitmaps[facet][v] for v in wanted if v in self.bitmaps[facet]
+                ))
+            if filters.get("date_from") or filters.get("date_to"):
+                selected.append(self.date_range(filters.get("date_from"), filters.get("date_to")))
+            if not selected:
+                return None
+            return Bitmap.intersect_all(selected)
+
+    # --- Counts ---
+
+    def counts(self, doc_ids: Bitmap = None) -> dict:
+        """
+        Facet value counts within `doc_ids` (all documents if None).
+
+        Returns:
+            dict: facet -> {display value: count}, zero counts omitted
+        """
+        with self._lock:
+            result = {}
+            for facet, values in self.bitmaps.items():
+                facet_counts = {}
+                for value, bitmap in values.items():
+                    n = len(bitmap if doc_ids is None else bitmap & doc_ids)
+                    if n:
+                        label = self.labels.get(value, value) if facet == "company" else value
+                        facet_counts[label] = n
+                result[facet] = dict(sorted(facet_counts.items(), key=lambda kv: -kv[1]))
+            return result
+
+    def values(self, facet: str) -> list:
+        with self._lock:
+            values = self.bitmaps.get(facet, {})
+            if facet == "company":
+                return sorted((self.labels.get(v, v) for v in values), key=str.lower)
+            return sorted(values)
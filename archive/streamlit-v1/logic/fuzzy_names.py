@@ -0,0 +1,170 @@
+"""
+BASIN::NEXUS // FUZZY NAME MATCHING
+Trigram index for company and person names.
+
+Names are normalised (case, punctuation, legal suffixes for companies),
+padded, and broken into character trigrams. A lookup walks the postings of
+the query's rarest trigrams to collect candidates, then ranks them by Dice
+(or Jaccard) similarity. "Databricks Inc.", "databricks" and "Databriks"
+all find each other.
+"""
+
+import re
+import math
+import threading
+
+
+# ═══════════════════════════════════════════════════════════════
+# NORMALISATION
+# ═══════════════════════════════════════════════════════════════
+
+DEFAULT_THRESHOLD = 0.5
+
+LEGAL_SUFFIXES = {
+    "inc", "incorporated", "llc", "ltd", "limited", "corp", "corporation",
+    "co", "company", "plc", "gmbh", "ag", "sa", "bv", "pty", "lp", "llp",
+}
+
+_PUNCT_RE = re.compile(r"[^\w\s&]")
+_NON_WORD_RE = re.compile(r"[^\w\s]")
+
+
+def normalize_company(name: str) -> str:
+    """
+    Canonical join key for a company name.
+
+    Lowercases, strips punctuation, and drops trailing legal suffixes
+    (Inc, LLC, Ltd, Corp, ...). Returns "" for empty input.
+    """
+    if not name:
+        return ""
+    words = _PUNCT_RE.sub(" ", name.lower()).split()
+    while len(words) > 1 and words[-1] in LEGAL_SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+
+def normalize_name(name: str, kind: str = "company") -> str:
+    """Company names drop legal suffixes; person names are just case/punctuation-folded."""
+    if kind == "company":
+        return normalize_company(name)
+    return " ".join(_NON_WORD_RE.sub(" ", (name or "").lower()).split())
+
+
+def trigrams(text: str) -> set:
+    """Character trigrams of an already-normalised string, padded so short names still match."""
+    if not text:
+        return set()
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(a: set, b: set, metric: str = "dice") -> float:
+    shared = len(a & b)
+    if metric == "jaccard":
+        union = len(a) + len(b) - shared
+        return shared / union if union else 0.0
+    total = len(a) + len(b)
+    return 2.0 * shared / total if total else 0.0
+
+
+# ═══════════════════════════════════════════════════════════════
+# TRIGRAM INDEX
+# ═══════════════════════════════════════════════════════════════
+
+class TrigramIndex:
+    """
+    Inverted index trigram -> entry keys.
+
+    Entries are (key, display name, kind). Keys are caller-chosen and unique
+    (e.g. ("company", "databricks") or ("contact", 42)); adding an existing
+    key replaces it.
+    """
+
+    def __init__(self):
+        self.postings = {}          # trigram -> set of keys
+        self.entries = {}           # key -> (display, kind, normalised, grams)
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, key, name: str, kind: str = "company"):
+        normalised = normalize_name(name, kind)
+        grams = trigrams(normalised)
+        with self._lock:
+            self.remove(key)
+            if not grams:
+                return
+            self.entries[key] = (name, kind, normalised, grams)
+            for gram in grams:
+                self.postings.setdefault(gram, set()).add(key)
+
+    def remove(self, key):
+        with self._lock:
+            entry = self.entries.pop(key, None)
+            if entry is None:
+                return
+            for gram in entry[3]:
+                keys = self.postings.get(gram)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self.postings[gram]
+
+    def search(self, name: str, k: int = 5, threshold: float = DEFAULT_THRESHOLD,
+               kind: str = None, metric: str = "dice") -> list:
+        """
+        Most similar names.
+
+        Args:
+            name: Query name (any spelling)
+            k: Max results
+            threshold: Minimum similarity (0-1)
+            kind: Restrict to entries of this kind ("company", "contact", ...)
+            metric: "dice" or "jaccard"
+
+        Returns:
+            list: (key, display name, similarity) sorted best-first
+        """
+        query_grams = trigrams(normalize_name(name, kind or "company"))
+        if not query_grams:
+            return []
+        n_query = len(query_grams)
+
+        # Any match needs at least this many shared grams (entries have >= 1 gram)
+        if metric == "jaccard":
+            min_overlap = threshold * n_query
+        else:
+            min_overlap = threshold * (n_query + 1) / 2.0
+
+        with self._lock:
+            # Prefix filtering: a candidate sharing >= min_overlap grams must appear in
+            # at least one of the (n_query - min_overlap + 1) rarest query grams, so
+            # the common grams' long postings are never walked.
+            ordered = sorted(query_grams, key=lambda g: len(self.postings.get(g, ())))
+            probe = n_query - max(1, math.ceil(min_overlap)) + 1
+            candidates = set()
+            for gram in ordered[:max(1, probe)]:
+                candidates.update(self.postings.get(gram, ()))
+
+            results = []
+            for key in candidates:
+                display, entry_kind, _, grams = self.entries[key]
+                if kind is not None and entry_kind != kind:
+                    continue
+                overlap = len(query_grams & grams)
+                if metric == "jaccard":
+                    score = overlap / (n_query + len(grams) - overlap)
+                else:
+                    score = 2.0 * overlap / (n_query + len(grams))
+                if score >= threshold:
+                    results.append((key, display, score))
+
+        results.sort(key=lambda r: -r[2])
+        return results[:k]
+
+    def best_match(self, name: str, threshold: float = DEFAULT_THRESHOLD, kind: str = None):
+        """Single best (key, display, similarity) or None."""
+        matches = self.search(name, 1, threshold, kind)
+        return matches[0] if matches else None
@@ -3,24 +3,41 @@ Basin Signal Engine - The Engine Room (Generator)
 Handles LLM API calls and output formatting.
 Supports: OpenAI (GPT-4o) and Google Gemini
 
-Includes MOCK_MODE for testing UI without burning API credits.
+Includes MOCK_MODE for testing UI without burning API credits. For latency
+and load testing, run logic.llm_standin and set BASIN_LLM_STANDIN instead.
 """
 
 import os
+import copy
 import json
-import time
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+from logic.llm_clients import get_client, get_gemini_model
+from logic.response_cache import get_response_cache, is_cacheable, make_key
+from logic.rate_limiter import limited_call
+from logic.llm_router import RoutedStream, collect, fallback_chain, route
+from logic.tokenizer import count_messages
+from logic.prompt_assembly import record_provider_cache
+from logic.semantic_cache import get_semantic_cache, SEMANTIC_MARKER
 
 
 # ═══════════════════════════════════════════════════════════════
 # CONFIGURATION
 # ═══════════════════════════════════════════════════════════════
 
-# Set to True to test UI without API key
+# Set to True to test UI layout without an API key (instant canned output)
 MOCK_MODE = False
 
 # Default settings
 DEFAULT_TEMPERATURE = 0.7
 
+# Temperature generate_plain_text sends per provider (None = provider default)
+PLAIN_TEXT_TEMPERATURE = {"groq": 0.7, "openai": 0.7}
+
+# Seconds a caller waits on an identical in-flight request before giving up
+SINGLE_FLIGHT_TIMEOUT = 120
+
 
 # ═══════════════════════════════════════════════════════════════
 # MODEL OPTIONS
@@ -153,28 +170,139 @@ def get_provider(model: str) -> str:
     return "openai"
 
 
+# ═══════════════════════════════════════════════════════════════
+# SINGLE-FLIGHT
+# ═══════════════════════════════════════════════════════════════
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls: the first caller for a key runs
+    the work, callers arriving while it is in flight wait on its future and
+    get the same result (or exception). Nothing is kept once the call ends;
+    caching is the response cache's job.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.metrics = {"leaders": 0, "coalesced": 0, "timeouts": 0}
+
+    def do(self, key: str, fn, timeout: float = SINGLE_FLIGHT_TIMEOUT):
+        """
+        Run fn() once per in-flight key.
+
+        Args:
+            key: Request identity (make_key() output)
+            fn: Zero-argument function doing the work
+            timeout: Max seconds a waiting caller blocks (the leader is not limited)
+
+        Returns:
+            fn()'s result; waiting callers get a deep copy so shared dicts
+            cannot be mutated across sessions.
+
+        Raises:
+            Whatever fn() raised, in the leader and every waiter;
+            concurrent.futures.TimeoutError for a waiter past its timeout.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+                self.metrics["leaders"] += 1
+            else:
+                self.metrics["coalesced"] += 1
+
+        if not leader:
+            try:
+                return copy.deepcopy(future.result(timeout=timeout))
+            except FutureTimeout:
+                with self._lock:
+                    self.metrics["timeouts"] += 1
+                raise
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self.metrics, in_flight=len(self._calls))
+
+
+_SINGLE_FLIGHT = SingleFlight()
+
+
+def single_flight_stats() -> dict:
+    """Leader / coalesced / timed-out call counts for generator requests."""
+    return _SINGLE_FLIGHT.stats()
+
+
 # ═══════════════════════════════════════════════════════════════
 # MAIN GENERATOR
 # ═══════════════════════════════════════════════════════════════
 
-def generate_signal_output(messages: list, model: str = None) -> dict:
+def _complete(provider: str, model: str, fn, prompt: str = ""):
+    """Rate-limited SDK call whose prompt-cache usage (if reported) is recorded."""
+    response = limited_call(provider, model, fn, prompt)
+    record_provider_cache(provider, response)
+    return response
+
+
+def generate_signal_output(messages: list, model: str = None, use_cache: bool = True,
+                           cache_nondeterministic: bool = True) -> dict:
     """
     Calls the LLM (or returns mock data) to generate the architectural output.
     Automatically routes to the correct provider based on model name.
     
+    The dossier is cached even though it is sampled at DEFAULT_TEMPERATURE:
+    re-rendering the same resume, JD and persona returns the stored answer
+    instantly. Pass use_cache=False to regenerate.
+    
     Args:
         messages: The messages array from prompt_engine.py
         model: Model ID (determines provider automatically)
+        use_cache: False bypasses the response cache
+        cache_nondeterministic: Cache even though DEFAULT_TEMPERATURE > 0
+                                (True by default for the dossier; None defers to
+                                BASIN_CACHE_NONDETERMINISTIC, False never stores)
         
     Returns:
         dict: Parsed response with 'summary', 'email_blurb', 'gap_analysis', 'key_bullets'
     """
     if MOCK_MODE:
-        return _get_mock_data()
+        return get_mock_data()
     
     model = model or "llama-3.3-70b-versatile"
     provider = get_provider(model)
-    
+    key = make_key(provider, model, messages, DEFAULT_TEMPERATURE, "json_object")
+
+    def compute():
+        try:
+            return _SINGLE_FLIGHT.do(key, lambda: _generate_signal_output(messages, model, provider))
+        except FutureTimeout:
+            return _error_response(f"Timed out waiting on an identical in-flight request ({SINGLE_FLIGHT_TIMEOUT}s)")
+
+    return get_response_cache().cached_call(
+        key,
+        compute,
+        model=model,
+        bypass=not use_cache,
+        cacheable=is_cacheable(DEFAULT_TEMPERATURE, cache_nondeterministic),
+        store_if=lambda result: not str(result.get("summary", "")).startswith("Error Generating Signal"),
+    )
+
+
+def _generate_signal_output(messages: list, model: str, provider: str) -> dict:
     if provider == "groq":
         return _generate_with_groq(messages, model)
     elif provider == "ollama":
@@ -185,67 +313,129 @@ def generate_signal_output(messages: list, model: str = None) -> dict:
         return _generate_with_openai(messages, model)
 
 
-def generate_plain_text(prompt: str, model_name: str = "llama-3.3-70b-versatile") -> str:
+def generate_plain_text(prompt: str, model_name: str = "llama-3.3-70b-versatile", use_cache: bool = True,
+                        cache_nondeterministic: bool = None, hedge: bool = False,
+                        semantic_key: str = None, feature: str = None) -> str:
     """
     Generates plain text (non-JSON) output for conversational features like War Room.
     Mainly supports Groq for speed.
+    
+    Responses go through the disk cache: pass use_cache=False to force a fresh
+    completion, or cache_nondeterministic=True to cache a sampled one.
+    
+    Passing semantic_key (free text that may be phrased differently, e.g. the
+    role) and feature opts into the semantic cache: an earlier answer for a
+    near-identical key, same feature and model, is returned with SEMANTIC_MARKER
+    prepended instead of calling the model. Put anything that must match
+    exactly (e.g. the company) in feature.
+    
+    If the model's provider fails (or its circuit is open) the request fails
+    over along the router's fallback chain. hedge=True streams the answer
+    instead, and opens a backup stream at the next provider (a second paid
+    request) if the first token is later than the provider's p95; the
+    loser's stream is closed. Answers from a fallback model are returned but
+    not cached under the requested model's key.
+    
+    Identical requests already in flight (same cache key) are coalesced:
+    the caller waits on the running call instead of issuing its own.
     """
+    semantic = bool(use_cache and semantic_key and feature)
+    if semantic:
+        hit = get_semantic_cache().lookup(feature, model_name, semantic_key)
+        if hit is not None:
+            answer, _, matched = hit
+            return SEMANTIC_MARKER.format(key=matched) + answer
+
     messages = [{"role": "user", "content": prompt}]
     provider = get_provider(model_name)
-    
+    temperature = PLAIN_TEXT_TEMPERATURE.get(provider)
+    key = make_key(provider, model_name, messages, temperature, "text")
+    served = {}
+
+    def routed():
+        chain = fallback_chain(model_name, get_provider)
+        if hedge:
+            text, served["model"] = collect(RoutedStream(
+                lambda model, backend: _stream_deltas(messages, model, backend), chain, hedge=True))
+        else:
+            text, served["model"] = route(
+                lambda model, backend: _generate_plain_text(messages, model, backend), chain)
+        return text
+
+    def compute():
+        # Only the leader's `served` is set, so waiters never store the shared answer again
+        try:
+            return _SINGLE_FLIGHT.do(key, routed)
+        except FutureTimeout:
+            return f"Error: Timed out waiting on an identical in-flight request ({SINGLE_FLIGHT_TIMEOUT}s)"
+
+    def servable(text) -> bool:
+        return isinstance(text, str) and not text.startswith("Error") and served.get("model") == model_name
+
+    text = get_response_cache().cached_call(
+        key,
+        compute,
+        model=model_name,
+        bypass=not use_cache,
+        cacheable=is_cacheable(temperature, cache_nondeterministic),
+        store_if=servable,
+    )
+    if semantic and servable(text):
+        get_semantic_cache().put(feature, model_name, semantic_key, text)
+    return text
+
+
+def _generate_plain_text(messages: list, model_name: str, provider: str) -> str:
+    prompt = messages[0]["content"]
     try:
         if provider == "groq":
-            from groq import Groq
             api_key = os.environ.get("GROQ_API_KEY")
             if not api_key: return "Error: Missing GROQ_API_KEY"
             
-            client = Groq(api_key=api_key)
-            response = client.chat.completions.create(
-                model=model_name.replace("groq:", ""),
+            client = get_client("groq", api_key)
+            model_id = model_name.replace("groq:", "")
+            response = _complete("groq", model_id, lambda: client.chat.completions.create(
+                model=model_id,
                 messages=messages,
-                temperature=0.7
-            )
+                temperature=PLAIN_TEXT_TEMPERATURE["groq"]
+            ), prompt)
             return response.choices[0].message.content
             
         elif provider == "openai":
-            from openai import OpenAI
-            client = OpenAI()
-            response = client.chat.completions.create(
+            client = get_client("openai")
+            response = _complete("openai", model_name, lambda: client.chat.completions.create(
                 model=model_name,
                 messages=messages,
-                temperature=0.7
-            )
+                temperature=PLAIN_TEXT_TEMPERATURE["openai"]
+            ), prompt)
             return response.choices[0].message.content
             
         elif provider == "ollama":
-            import ollama
-            response = ollama.chat(
-                model=model_name.replace("ollama:", ""),
+            model_id = model_name.replace("ollama:", "")
+            response = _complete("ollama", model_id, lambda: get_client("ollama").chat(
+                model=model_id,
                 messages=messages,
-            )
+            ), prompt)
             return response['message']['content']
             
         elif provider == "google":
-            import google.generativeai as genai
             api_key = os.environ.get("GOOGLE_API_KEY") or os.environ.get("GEMINI_API_KEY")
             if not api_key: return "Error: Missing GOOGLE_API_KEY or GEMINI_API_KEY"
             
-            genai.configure(api_key=api_key)
-            gemini_model = genai.GenerativeModel(model_name)
-            response = gemini_model.generate_content(prompt)
+            gemini_model = get_gemini_model(model_name, api_key)
+            response = _complete("google", model_name, lambda: gemini_model.generate_content(prompt), prompt)
             return response.text
             
         elif provider == "anthropic":
-            import anthropic
             api_key = os.environ.get("ANTHROPIC_API_KEY")
             if not api_key: return "Error: Missing ANTHROPIC_API_KEY"
             
-            client = anthropic.Anthropic(api_key=api_key)
-            response = client.messages.create(
+            client = get_client("anthropic", api_key)
+            response = _complete("anthropic", model_name, lambda: client.messages.create(
                 model=model_name,
                 max_tokens=2048,
                 messages=[{"role": "user", "content": prompt}]
-            )
+            ), prompt)
             return response.content[0].text
             
         return "Error: Provider not supported for plain text yet."
@@ -254,14 +444,141 @@ def generate_plain_text(prompt: str, model_name: str = "llama-3.3-70b-versatile"
         return f"Error generating text: {str(e)}"
 
 
+# ═══════════════════════════════════════════════════════════════
+# STREAMING
+# ═══════════════════════════════════════════════════════════════
+
+def stream_plain_text(prompt: str, model_name: str = "llama-3.3-70b-versatile", use_cache: bool = True,
+                      cache_nondeterministic: bool = None, hedge: bool = False):
+    """
+    Streaming counterpart of generate_plain_text(): yields text deltas as the
+    provider produces them (Groq, OpenAI, Ollama, Gemini, Anthropic).
+
+    Works with st.write_stream(). A cached response is yielded in one piece;
+    a completed stream is stored in the cache under the same rules as
+    generate_plain_text(). Closing the generator early (rerun, navigation)
+    closes the provider stream and stores nothing.
+
+    Failover works as in generate_plain_text(); hedge=True also races a
+    backup provider (a second paid request) when the first token is later
+    than the provider's p95 time-to-first-token.
+
+    Yields:
+        str: Text deltas (an "Error..." string if the call fails)
+    """
+    messages = [{"role": "user", "content": prompt}]
+    provider = get_provider(model_name)
+    temperature = PLAIN_TEXT_TEMPERATURE.get(provider)
+    key = make_key(provider, model_name, messages, temperature, "text")
+    cacheable = is_cacheable(temperature, cache_nondeterministic)
+
+    cache = get_response_cache()
+    cached = cache.lookup(key, bypass=not use_cache, cacheable=cacheable)
+    if cached is not None:
+        yield cached
+        return
+
+    parts = []
+    deltas = RoutedStream(
+        lambda model, backend: _stream_deltas(messages, model, backend),
+        fallback_chain(model_name, get_provider),
+        hedge,
+    )
+    try:
+        for delta in deltas:
+            if delta:
+                parts.append(delta)
+                yield delta
+    except Exception as e:
+        yield f"Error generating text: {str(e)}"
+        return
+    finally:
+        deltas.close()
+
+    text = "".join(parts)
+    if use_cache and cacheable and text and not deltas.failed and deltas.model == model_name:
+        cache.put(key, text, model_name)
+
+
+def _stream_deltas(messages: list, model_name: str, provider: str):
+    """Provider-specific delta iterator. Provider streams are closed when this generator is."""
+    prompt = messages[0]["content"]
+
+    if provider in ("groq", "openai"):
+        api_key = os.environ.get("GROQ_API_KEY" if provider == "groq" else "OPENAI_API_KEY")
+        if not api_key:
+            yield f"Error: Missing {'GROQ_API_KEY' if provider == 'groq' else 'OPENAI_API_KEY'}"
+            return
+        client = get_client(provider, api_key)
+        model_id = model_name.replace("groq:", "")
+        # Rate limits and retries apply to opening the stream, before any text is yielded
+        stream = limited_call(provider, model_id, lambda: client.chat.completions.create(
+            model=model_id,
+            messages=messages,
+            temperature=PLAIN_TEXT_TEMPERATURE[provider],
+            stream=True,
+        ), prompt)
+        try:
+            for chunk in stream:
+                if chunk.choices:
+                    yield chunk.choices[0].delta.content or ""
+        finally:
+            stream.close()
+
+    elif provider == "ollama":
+        model_id = model_name.replace("ollama:", "")
+        stream = limited_call("ollama", model_id, lambda: get_client("ollama").chat(
+            model=model_id,
+            messages=messages,
+            stream=True,
+        ), prompt)
+        try:
+            for chunk in stream:
+                yield chunk["message"]["content"]
+        finally:
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+
+    elif provider == "google":
+        api_key = os.environ.get("GOOGLE_API_KEY") or os.environ.get("GEMINI_API_KEY")
+        if not api_key:
+            yield "Error: Missing GOOGLE_API_KEY or GEMINI_API_KEY"
+            return
+        gemini_model = get_gemini_model(model_name, api_key)
+        response = limited_call("google", model_name, lambda: gemini_model.generate_content(prompt, stream=True), prompt)
+        for chunk in response:
+            yield chunk.text
+
+    elif provider == "anthropic":
+        api_key = os.environ.get("ANTHROPIC_API_KEY")
+        if not api_key:
+            yield "Error: Missing ANTHROPIC_API_KEY"
+            return
+        client = get_client("anthropic", api_key)
+        stream = limited_call("anthropic", model_name, lambda: client.messages.create(
+            model=model_name,
+            max_tokens=2048,
+            messages=[{"role": "user", "content": prompt}],
+            stream=True,
+        ), prompt)
+        try:
+            for event in stream:
+                if event.type == "content_block_delta" and getattr(event.delta, "text", None):
+                    yield event.delta.text
+        finally:
+            stream.close()
+
+    else:
+        yield "Error: Provider not supported for plain text yet."
+
+
 # ═══════════════════════════════════════════════════════════════
 # GROQ GENERATOR (FREE CLOUD - SUPER FAST!)
 # ═══════════════════════════════════════════════════════════════
 
 def _generate_with_groq(messages: list, model: str) -> dict:
     """Generate using Groq API. Free tier available, extremely fast!"""
-    from groq import Groq
-    
     api_key = os.environ.get("GROQ_API_KEY")
     if not api_key:
         raise ValueError("Groq API Key missing. Get free key at console.groq.com")
@@ -269,7 +586,7 @@ def _generate_with_groq(messages: list, model: str) -> dict:
     # Extract model name (remove 'groq:' prefix)
     model_name = model.replace("groq:", "")
     
-    client = Groq(api_key=api_key)
+    client = get_client("groq", api_key)
     
     try:
         # Add JSON instruction to system prompt
@@ -283,12 +600,12 @@ def _generate_with_groq(messages: list, model: str) -> dict:
             else:
                 modified_messages.append(msg)
         
-        response = client.chat.completions.create(
+        response = _complete("groq", model_name, lambda: client.chat.completions.create(
             model=model_name,
             messages=modified_messages,
             temperature=DEFAULT_TEMPERATURE,
             response_format={"type": "json_object"}
-        )
+        ), "".join(m["content"] for m in modified_messages))
         
         raw_content = response.choices[0].message.content
         return _parse_response(raw_content)
@@ -303,8 +620,6 @@ def _generate_with_groq(messages: list, model: str) -> dict:
 
 def _generate_with_ollama(messages: list, model: str) -> dict:
     """Generate using local Ollama model. No API key required!"""
-    import ollama
-    
     # Extract model name (remove 'ollama:' prefix)
     model_name = model.replace("ollama:", "")
     
@@ -328,11 +643,11 @@ The key_bullets should be an array of strings.
 """
     
     try:
-        response = ollama.chat(
+        response = _complete("ollama", model_name, lambda: get_client("ollama").chat(
             model=model_name,
             messages=[{"role": "user", "content": full_prompt}],
             options={"temperature": DEFAULT_TEMPERATURE}
-        )
+        ), full_prompt)
         
         raw_content = response['message']['content']
         return _parse_response(raw_content)
@@ -347,21 +662,19 @@ The key_bullets should be an array of strings.
 
 def _generate_with_openai(messages: list, model: str) -> dict:
     """Generate using OpenAI API."""
-    from openai import OpenAI
-    
     api_key = os.environ.get("OPENAI_API_KEY")
     if not api_key:
         raise ValueError("OpenAI API Key missing. Please enter it in the Sidebar.")
     
-    client = OpenAI(api_key=api_key)
+    client = get_client("openai", api_key)
     
     try:
-        response = client.chat.completions.create(
+        response = _complete("openai", model, lambda: client.chat.completions.create(
             model=model,
             messages=messages,
             response_format={"type": "json_object"},
             temperature=DEFAULT_TEMPERATURE
-        )
+        ), "".join(m["content"] for m in messages))
         
         raw_content = response.choices[0].message.content
         return _parse_response(raw_content)
@@ -382,8 +695,6 @@ def _generate_with_gemini(messages: list, model: str) -> dict:
     if not api_key:
         raise ValueError("Google API Key missing. Set GOOGLE_API_KEY in the Sidebar.")
     
-    genai.configure(api_key=api_key)
-    
     # Convert messages format for Gemini
     # Gemini uses a different message structure
     system_prompt = ""
@@ -405,14 +716,14 @@ IMPORTANT: Return ONLY valid JSON with these exact keys: "summary", "email_blurb
 """
     
     try:
-        gemini_model = genai.GenerativeModel(model)
-        response = gemini_model.generate_content(
+        gemini_model = get_gemini_model(model, api_key)
+        response = _complete("google", model, lambda: gemini_model.generate_content(
             full_prompt,
             generation_config=genai.GenerationConfig(
                 temperature=DEFAULT_TEMPERATURE,
                 response_mime_type="application/json"
             )
-        )
+        ), full_prompt)
         
         raw_content = response.text
         return _parse_response(raw_content)
@@ -500,13 +811,11 @@ def _error_response(error_msg: str) -> dict:
 # MOCK DATA
 # ═══════════════════════════════════════════════════════════════
 
-def _get_mock_data() -> dict:
+def get_mock_data() -> dict:
     """
     Returns mock data to test the Streamlit UI layout without API calls.
-    Simulates processing delay for realistic UX.
+    Also the JSON-mode answer of logic.llm_standin, which simulates latency.
     """
-    time.sleep(2)  # Simulate LLM thinking time
-    
     return {
         "gap_analysis": """## Pain Points Detected
 
@@ -554,16 +863,15 @@ Worth a brief exchange?
 # UTILITIES
 # ═══════════════════════════════════════════════════════════════
 
-def estimate_tokens(messages: list) -> int:
+def estimate_tokens(messages: list, model: str = None) -> int:
     """
-    Rough estimation of token count for cost awareness.
+    Token count of a messages array for cost awareness and truncation checks.
     
     Args:
         messages: The messages array
+        model: Model id (selects the BPE vocabulary; default family if None)
         
     Returns:
-        int: Estimated token count
+        int: Prompt token count (an estimate only if no vocabulary is installed)
     """
-    total_chars = sum(len(m.get("content", "")) for m in messages)
-    # Rough estimate: 4 chars per token
-    return total_chars // 4
+    return count_messages(messages, model)
@@ -0,0 +1,366 @@
+"""
+BASIN::NEXUS // ORACLE INDEX SEGMENT (BINARY, MEMORY-MAPPED)
+Compact on-disk format for the Oracle's documents and postings.
+
+Layout (after magic + JSON header, sections 64-byte aligned):
+- doc_ids          int64[n]        document ids, ascending
+- key_offsets      uint64[n + 1]   into key_blob (UTF-8 document key per doc)
+- meta_offsets     uint64[n + 1]   into meta_blob (JSON per doc: everything but content)
+- content_offsets  uint64[n + 1]   into content_blob (UTF-8 document text)
+- term_offsets     uint64[t + 1]   into term_blob (sorted UTF-8 terms)
+- post_offsets     uint64[t + 1]   into post_blob
+- post_blob        per term: varint(doc count), then per doc varint(doc id delta),
+                   varint(position count), varint(position deltas)
+
+The file is opened with mmap, so every process serving the Oracle shares
+the same page-cache pages and a lookup only faults in the bytes it reads.
+Opening costs a header parse; nothing is deserialised up front.
+SegmentDocuments maps keys to documents and parses a document's metadata
+only when it is first asked for.
+"""
+
+import os
+import json
+import mmap
+import threading
+from collections import OrderedDict
+from collections.abc import MutableMapping
+
+import numpy as np
+
+
+SEGMENT_MAGIC = b"BASNSEG1"
+ALIGN = 64
+POSTINGS_CACHE_SIZE = 256
+
+
+# ═══════════════════════════════════════════════════════════════
+# VARINTS
+# ═══════════════════════════════════════════════════════════════
+
+def encode_varint(value: int, out: bytearray):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def decode_varint(buf, pos: int) -> tuple:
+    """Returns (value, next position)."""
+    result = shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def encode_postings(docs: dict) -> bytes:
+    """{doc id: sorted offsets} -> delta/varint bytes."""
+    out = bytearray()
+    encode_varint(len(docs), out)
+    previous_doc = 0
+    for doc_id in sorted(docs):
+        encode_varint(doc_id - previous_doc, out)
+        previous_doc = doc_id
+        offsets = docs[doc_id]
+        encode_varint(len(offsets), out)
+        previous = 0
+        for offset in offsets:
+            encode_varint(offset - previous, out)
+            previous = offset
+    return bytes(out)
+
+
+def decode_postings(buf, pos: int = 0) -> dict:
+    n_docs, pos = decode_varint(buf, pos)
+    docs = {}
+    doc_id = 0
+    for _ in range(n_docs):
+        delta, pos = decode_varint(buf, pos)
+        doc_id += delta
+        count, pos = decode_varint(buf, pos)
+        offsets = []
+        offset = 0
+        for _ in range(count):
+            delta, pos = decode_varint(buf, pos)
+            offset += delta
+            offsets.append(offset)
+        docs[doc_id] = offsets
+    return docs
+
+
+# ═══════════════════════════════════════════════════════════════
+# WRITER
+# ═══════════════════════════════════════════════════════════════
+
+def _blob(items: list) -> tuple:
+    offsets = np.zeros(len(items) + 1, dtype=np.uint64)
+    if items:
+        offsets[1:] = np.cumsum([len(b) for b in items], dtype=np.uint64)
+    return offsets, b"".join(items)
+
+
+def write_segment(path: str, docs: list, postings, generation: int = 0):
+    """
+    Write documents and postings to `path` atomically.
+
+    Args:
+        docs: Document dicts with an integer 'id', a string 'key' and 'content'
+        postings: Object with terms() and encoded(term) (a PostingsIndex)
+        generation: Index generation, checked against the JSON state on load
+    """
+    docs = sorted(docs, key=lambda d: d["id"])
+    keys = [d["key"].encode("utf-8") for d in docs]
+    metas = [json.dumps({k: v for k, v in d.items() if k != "content"}).encode("utf-8") for d in docs]
+    contents = [d["content"].encode("utf-8") for d in docs]
+    terms = postings.terms()
+    term_bytes = [t.encode("utf-8") for t in terms]
+    post_bytes = [postings.encoded(t) for t in terms]
+
+    key_offsets, key_blob = _blob(keys)
+    meta_offsets, meta_blob = _blob(metas)
+    content_offsets, content_blob = _blob(contents)
+    term_offsets, term_blob = _blob(term_bytes)
+    post_offsets, post_blob = _blob(post_bytes)
+    sections = [
+        ("doc_ids", np.array([d["id"] for d in docs], dtype=np.int64).tobytes(), "int64"),
+        ("key_offsets", key_offsets.tobytes(), "uint64"),
+        ("meta_offsets", meta_offsets.tobytes(), "uint64"),
+        ("content_offsets", content_offsets.tobytes(), "uint64"),
+        ("term_offsets", term_offsets.tobytes(), "uint64"),
+        ("post_offsets", post_offsets.tobytes(), "uint64"),
+        ("key_blob", key_blob, "bytes"),
+        ("meta_blob", meta_blob, "bytes"),
+        ("content_blob", content_blob, "bytes"),
+        ("term_blob", term_blob, "bytes"),
+        ("post_blob", post_blob, "bytes"),
+    ]
+
+    header = {"generation": generation, "n_docs": len(docs), "n_terms": len(terms), "sections": {}}
+    position = 0
+    for name, data, dtype in sections:
+        position = -(-position // ALIGN) * ALIGN
+        header["sections"][name] = {"offset": position, "length": len(data), "dtype": dtype}
+        position += len(data)
+    header_bytes = json.dumps(header).encode("utf-8")
+    data_start = -(-(len(SEGMENT_MAGIC) + 8 + len(header_bytes)) // ALIGN) * ALIGN
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(SEGMENT_MAGIC)
+        f.write(len(header_bytes).to_bytes(8, "little"))
+        f.write(header_bytes)
+        for name, data, _ in sections:
+            f.seek(data_start + header["sections"][name]["offset"])
+            f.write(data)
+        f.truncate(data_start + position)
+    os.replace(tmp_path, path)
+
+
+# ═══════════════════════════════════════════════════════════════
+# READER
+# ═══════════════════════════════════════════════════════════════
+
+class IndexSegment:
+    """Read-only, memory-mapped view of a segment file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(SEGMENT_MAGIC)) != SEGMENT_MAGIC:
+                raise ValueError(f"{path} is not an Oracle index segment")
+            header_len = int.from_bytes(f.read(8), "little")
+            self.header = json.loads(f.read(header_len).decode("utf-8"))
+            data_start = -(-(len(SEGMENT_MAGIC) + 8 + header_len) // ALIGN) * ALIGN
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self.generation = self.header["generation"]
+        self.n_docs = self.header["n_docs"]
+        self.n_terms = self.header["n_terms"]
+        self._bounds = {}
+        for name, spec in self.header["sections"].items():
+            start = data_start + spec["offset"]
+            self._bounds[name] = (start, start + spec["length"])
+
+        self.doc_ids = self._array("doc_ids", np.int64)
+        self.key_offsets = self._array("key_offsets", np.uint64)
+        self.meta_offsets = self._array("meta_offsets", np.uint64)
+        self.content_offsets = self._array("content_offsets", np.uint64)
+        self.term_offsets = self._array("term_offsets", np.uint64)
+        self.post_offsets = self._array("post_offsets", np.uint64)
+        self._postings_cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _array(self, name: str, dtype) -> np.ndarray:
+        start, end = self._bounds[name]
+        count = (end - start) // np.dtype(dtype).itemsize
+        if count == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.frombuffer(self._mm, dtype=dtype, count=count, offset=start)
+
+    def _slice(self, blob: str, offsets: np.ndarray, i: int) -> bytes:
+        base = self._bounds[blob][0]
+        return self._mm[base + int(offsets[i]):base + int(offsets[i + 1])]
+
+    # --- Documents ---
+
+    def key(self, i: int) -> str:
+        return self._slice("key_blob", self.key_offsets, i).decode("utf-8")
+
+    def keys(self) -> list:
+        """Document keys in id order, without touching the metadata."""
+        return [self.key(i) for i in range(self.n_docs)]
+
+    def meta(self, i: int) -> dict:
+        """Document fields except content, for the i-th document (id order)."""
+        return json.loads(self._slice("meta_blob", self.meta_offsets, i))
+
+    def content(self, i: int) -> str:
+        return self._slice("content_blob", self.content_offsets, i).decode("utf-8")
+
+    def position_of(self, doc_id: int) -> int:
+        """Row of a document id, or -1."""
+        i = int(np.searchsorted(self.doc_ids, doc_id))
+        return i if i < self.n_docs and self.doc_ids[i] == doc_id else -1
+
+    # --- Terms ---
+
+    def term(self, i: int) -> str:
+        return self._slice("term_blob", self.term_offsets, i).decode("utf-8")
+
+    def _lower_bound(self, target: bytes) -> int:
+        """First term number whose bytes are >= target."""
+        lo, hi = 0, self.n_terms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._slice("term_blob", self.term_offsets, mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def find_term(self, term: str) -> int:
+        """Binary search of the sorted term dictionary. Returns the term number or -1."""
+        target = term.encode("utf-8")
+        i = self._lower_bound(target)
+        if i < self.n_terms and self._slice("term_blob", self.term_offsets, i) == target:
+            return i
+        return -1
+
+    def terms(self) -> list:
+        return [self.term(i) for i in range(self.n_terms)]
+
+    def postings(self, term: str) -> dict:
+        """doc id -> character offsets for a term ({} if absent). Recently used terms are cached."""
+        with self._lock:
+            cached = self._postings_cache.get(term)
+            if cached is not None:
+                self._postings_cache.move_to_end(term)
+                return cached
+        i = self.find_term(term)
+        docs = decode_postings(self._slice("post_blob", self.post_offsets, i)) if i >= 0 else {}
+        with self._lock:
+            self._postings_cache[term] = docs
+            while len(self._postings_cache) > POSTINGS_CACHE_SIZE:
+                self._postings_cache.popitem(last=False)
+        return docs
+
+    def raw_postings(self, term: str):
+        """Encoded postings bytes for a term, or None if absent."""
+        i = self.find_term(term)
+        return self._slice("post_blob", self.post_offsets, i) if i >= 0 else None
+
+    def terms_with_prefix(self, prefix: str) -> list:
+        """Terms starting with `prefix` (bisect into the sorted dictionary)."""
+        target = prefix.encode("utf-8")
+        lo = self._lower_bound(target)
+        result = []
+        while lo < self.n_terms:
+            term = self._slice("term_blob", self.term_offsets, lo)
+            if not term.startswith(target):
+                break
+            result.append(term.decode("utf-8"))
+            lo += 1
+        return result
+
+
+class SegmentDocument(dict):
+    """
+    Document dict whose 'content' lives in the segment and is read on access.
+
+    Everything else (id, key, source, type, metadata, chunks) is held in the
+    dict as usual; the text is decoded from the mapped file each time it is
+    asked for, so it never accumulates in the process heap.
+    """
+
+    __slots__ = ("_segment", "_position")
+
+    def __init__(self, fields: dict, segment: IndexSegment, position: int):
+        super().__init__(fields)
+        self._segment = segment
+        self._position = position
+
+    def __missing__(self, key):
+        if key == "content":
+            return self._segment.content(self._position)
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return key == "content" or dict.__contains__(self, key)
+
+    def get(self, key, default=None):
+        if key == "content" and not dict.__contains__(self, key):
+            return self._segment.content(self._position)
+        return dict.get(self, key, default)
+
+
+class SegmentDocuments(MutableMapping):
+    """
+    key -> document over a segment, with an in-memory overlay for changes.
+
+    Segment documents become SegmentDocument dicts (metadata parsed from the
+    mapped file) the first time they are looked up; documents that are never
+    touched cost one key string each.
+    """
+
+    def __init__(self, segment: IndexSegment):
+        self.segment = segment
+        self._positions = {key: i for i, key in enumerate(segment.keys())}   # live segment docs
+        self._docs = {}             # parsed segment docs and overlay docs
+
+    def __getitem__(self, key):
+        doc = self._docs.get(key)
+        if doc is None:
+            position = self._positions[key]
+            doc = self._docs[key] = SegmentDocument(self.segment.meta(position), self.segment, position)
+        return doc
+
+    def __setitem__(self, key, doc):
+        self._docs[key] = doc
+        self._positions.pop(key, None)
+
+    def __delitem__(self, key):
+        found = self._docs.pop(key, None) is not None
+        if self._positions.pop(key, None) is not None:
+            found = True
+        if not found:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self._positions or key in self._docs
+
+    def __iter__(self):
+        yield from self._positions
+        yield from (key for key in list(self._docs) if key not in self._positions)
+
+    def __len__(self):
+        return len(self._positions) + sum(1 for key in self._docs if key not in self._positions)
+
+    def ids(self) -> dict:
+        """doc id -> key for every document, read from the id and key sections."""
+        ids = {int(self.segment.doc_ids[i]): key for key, i in self._positions.items()}
+        ids.update((doc["id"], key) for key, doc in self._docs.items() if key not in self._positions)
+        return ids
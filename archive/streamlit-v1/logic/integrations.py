@@ -246,6 +246,11 @@ def get_stock_price(symbol: str) -> Dict[str, Any]:
         return {'symbol': symbol, 'error': str(e)}
 
 
+# Trigram index over COMPANY_DATABASE keys, built on first lookup
+_COMPANY_NAME_INDEX = None
+COMPANY_FUZZY_THRESHOLD = 0.7
+
+
 def get_company_stock_symbol(company_name: str) -> Optional[Dict[str, Any]]:
     """
     Try to find stock symbol and metadata for a company name
@@ -566,6 +571,19 @@ def get_company_stock_symbol(company_name: str) -> Optional[Dict[str, Any]]:
         data['company_name'] = company_name
         return data
     
+    # Fuzzy match ("Databriks", "Snowflake Inc.")
+    global _COMPANY_NAME_INDEX
+    if _COMPANY_NAME_INDEX is None:
+        from logic.fuzzy_names import TrigramIndex
+        _COMPANY_NAME_INDEX = TrigramIndex()
+        for company_key in COMPANY_DATABASE:
+            _COMPANY_NAME_INDEX.add(company_key, company_key)
+    match = _COMPANY_NAME_INDEX.best_match(company_name, COMPANY_FUZZY_THRESHOLD)
+    if match:
+        result = COMPANY_DATABASE[match[0]].copy()
+        result['company_name'] = company_name
+        return result
+
     # Partial match
     for company_key, data in COMPANY_DATABASE.items():
         if company_key in company_lower or company_lower in company_key:
@@ -1337,7 +1355,8 @@ def generate_leon_posts(topic: str, model_name: str = "llama-3.3-70b-versatile")
 
 TOPIC: {topic}
 """
-        return generate_plain_text(prompt, model_name=model_name)
+        from logic.scheduler import run_job, BACKGROUND
+        return run_job(lambda: generate_plain_text(prompt, model_name=model_name), lane=BACKGROUND)
     except Exception as e:
         return f"Error forging posts: {str(e)}"
 
@@ -1370,7 +1389,9 @@ Output format: Markdown. Use horizontal rules (---) to separate sections.
         
         full_prompt = f"{system_prompt}\n\n{user_prompt}"
         
-        return generate_plain_text(full_prompt, model_name="llama-3.3-70b-versatile")
+        from logic.scheduler import run_job, BACKGROUND
+        return run_job(lambda: generate_plain_text(full_prompt, model_name="llama-3.3-70b-versatile"),
+                       lane=BACKGROUND)
         
     except Exception as e:
         return f"Error inscribing scroll: {str(e)}"
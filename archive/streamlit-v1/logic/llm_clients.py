@@ -0,0 +1,150 @@
+"""
+BASIN::NEXUS // LLM CLIENT POOL
+One long-lived SDK client per (provider, API key).
+
+Provider SDKs (Groq, OpenAI, Anthropic, Ollama) wrap an HTTP connection
+pool. Building a fresh client per call throws away keep-alive and the TLS
+session, so every request pays a new TCP + TLS handshake. Clients here are
+created once, shared across Streamlit sessions and threads (the underlying
+httpx clients are thread-safe), and closed at interpreter exit.
+"""
+
+import os
+import atexit
+import hashlib
+import threading
+
+
+# ═══════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ═══════════════════════════════════════════════════════════════
+
+# Environment variables checked (in order) for each provider's key
+API_KEY_ENV = {
+    "groq": ["GROQ_API_KEY"],
+    "openai": ["OPENAI_API_KEY"],
+    "anthropic": ["ANTHROPIC_API_KEY"],
+    "google": ["GOOGLE_API_KEY", "GEMINI_API_KEY"],
+    "ollama": [],
+}
+
+OLLAMA_HOST = os.environ.get("OLLAMA_HOST")
+
+# Base URL of a logic.llm_standin server; when set, Groq and OpenAI clients talk to it
+STANDIN_ENV = "BASIN_LLM_STANDIN"
+
+# SDK-internal retries are off: logic.rate_limiter owns retries, backoff and
+# Retry-After, so every attempt is charged to its buckets and failover
+# (logic.llm_router) is not held up behind hidden 429/5xx retries
+SDK_MAX_RETRIES = 0
+
+
+def get_api_key(provider: str) -> str:
+    """The provider's API key from the environment, or None."""
+    for name in API_KEY_ENV.get(provider, []):
+        value = os.environ.get(name)
+        if value:
+            return value
+    return None
+
+
+def _fingerprint(api_key: str) -> str:
+    """Registry key component; avoids keeping raw keys as dict keys."""
+    return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+
+
+# ═══════════════════════════════════════════════════════════════
+# REGISTRY
+# ═══════════════════════════════════════════════════════════════
+
+_CLIENTS = {}               # (provider, key fingerprint) -> client
+_GEMINI_MODELS = {}         # (key fingerprint, model) -> GenerativeModel
+_GEMINI_STATE = {"key": None}
+_LOCK = threading.Lock()
+
+
+def _build_client(provider: str, api_key: str):
+    standin = os.environ.get(STANDIN_ENV, "").rstrip("/")
+    if provider == "groq":
+        from groq import Groq
+        return Groq(api_key=api_key, max_retries=SDK_MAX_RETRIES, **({"base_url": standin} if standin else {}))
+    if provider == "openai":
+        from openai import OpenAI
+        return OpenAI(api_key=api_key, max_retries=SDK_MAX_RETRIES,
+                      **({"base_url": f"{standin}/v1"} if standin else {}))
+    if provider == "anthropic":
+        import anthropic
+        return anthropic.Anthropic(api_key=api_key, max_retries=SDK_MAX_RETRIES)
+    if provider == "ollama":
+        import ollama
+        return ollama.Client(host=OLLAMA_HOST) if OLLAMA_HOST else ollama.Client()
+    raise ValueError(f"No pooled client for provider '{provider}'")
+
+
+def get_client(provider: str, api_key: str = None):
+    """
+    Shared client for a provider and key.
+
+    Args:
+        provider: 'groq', 'openai', 'anthropic' or 'ollama'
+        api_key: Explicit key (defaults to the provider's environment variable)
+
+    Returns:
+        The provider SDK client, created on first use and reused afterwards
+    """
+    api_key = api_key or get_api_key(provider)
+    key = (provider, _fingerprint(api_key))
+    client = _CLIENTS.get(key)
+    if client is not None:
+        return client
+    with _LOCK:
+        client = _CLIENTS.get(key)
+        if client is None:
+            client = _build_client(provider, api_key)
+            _CLIENTS[key] = client
+        return client
+
+
+def configure_gemini(api_key: str = None):
+    """
+    The google.generativeai module, configured for `api_key`.
+
+    genai.configure() is process-global, so it is only re-run (under the
+    lock) when a different key is requested.
+    """
+    import google.generativeai as genai
+
+    api_key = api_key or get_api_key("google")
+    fingerprint = _fingerprint(api_key)
+    with _LOCK:
+        if _GEMINI_STATE["key"] != fingerprint:
+            genai.configure(api_key=api_key)
+            _GEMINI_STATE["key"] = fingerprint
+    return genai
+
+
+def get_gemini_model(model: str, api_key: str = None):
+    """Cached GenerativeModel for `model` under `api_key`."""
+    genai = configure_gemini(api_key)
+    key = (_fingerprint(api_key or get_api_key("google")), model)
+    with _LOCK:
+        cached = _GEMINI_MODELS.get(key)
+        if cached is None:
+            cached = genai.GenerativeModel(model)
+            _GEMINI_MODELS[key] = cached
+        return cached
+
+
+@atexit.register
+def close_clients():
+    """Close pooled HTTP connections (called automatically at exit)."""
+    with _LOCK:
+        for client in _CLIENTS.values():
+            close = getattr(client, "close", None)
+            if close is not None:
+                try:
+                    close()
+                except Exception:
+                    pass
+        _CLIENTS.clear()
+        _GEMINI_MODELS.clear()
@@ -0,0 +1,200 @@
+"""
+BASIN::NEXUS // LLM LOAD TEST
+Drives the generator layer at a target concurrency and reports throughput
+and latency percentiles.
+
+Requests go through the real generate_signal_output / generate_plain_text
+path (rate limiter, router, single-flight, caches bypassed) against a
+logic.llm_standin server, started in-process unless BASIN_LLM_STANDIN
+already points at one. Every request has a distinct prompt so nothing is
+served from the response cache or coalesced.
+
+    python -m logic.llm_loadtest --concurrency 16 --requests 200 --ttft-ms 400 --rate-limit-rate 0.05
+    python -m logic.llm_loadtest --target plain --unlimited --out load.json
+"""
+
+import os
+import json
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from logic.llm_clients import STANDIN_ENV
+from logic.llm_standin import StandinConfig, start_standin
+
+
+# ═══════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ═══════════════════════════════════════════════════════════════
+
+DEFAULT_MODEL = "llama-3.3-70b-versatile"
+DEFAULT_CONCURRENCY = 8
+DEFAULT_REQUESTS = 100
+TARGETS = ("signal", "plain")
+
+_RESUME = "GTM systems architect. Built automated outbound pipelines that cut CAC 40% and scaled Seed to Series A."
+_COMPANIES = ["Databricks", "Snowflake", "Ramp", "Rippling", "Vercel", "Figma", "Notion", "Stripe"]
+
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def use_standin(base_url: str, unlimited: bool = False):
+    """
+    Route Groq/OpenAI clients to the stand-in. Must run before the first
+    client or rate limiter is built (both are process-wide singletons).
+
+    Args:
+        unlimited: Lift the local rate limits so the run measures the
+                   generator and stand-in rather than the token buckets
+    """
+    from logic.rate_limiter import RATE_LIMITS, RATE_LIMITS_ENV
+
+    os.environ[STANDIN_ENV] = base_url
+    os.environ.setdefault("GROQ_API_KEY", "standin")
+    os.environ.setdefault("OPENAI_API_KEY", "standin")
+    if unlimited:
+        os.environ[RATE_LIMITS_ENV] = json.dumps(
+            {provider: {model: None for model in models} for provider, models in RATE_LIMITS.items()}
+        )
+
+
+# ═══════════════════════════════════════════════════════════════
+# REQUESTS
+# ═══════════════════════════════════════════════════════════════
+
+def _signal_request(i: int, model: str) -> bool:
+    from logic.generator import generate_signal_output
+    from logic.prompt_engine import construct_basin_prompt, get_persona_options
+
+    company = _COMPANIES[i % len(_COMPANIES)]
+    messages = construct_basin_prompt(_RESUME, f"[load {i}] Director of GTM Systems at {company}.",
+                                      get_persona_options()[0])
+    result = generate_signal_output(messages, model=model, use_cache=False)
+    return not str(result.get("summary", "")).startswith("Error Generating Signal")
+
+
+def _plain_request(i: int, model: str) -> bool:
+    from logic.generator import generate_plain_text
+
+    company = _COMPANIES[i % len(_COMPANIES)]
+    text = generate_plain_text(f"[load {i}] Give me 5 kill questions for a GTM role at {company}.",
+                               model_name=model, use_cache=False)
+    return isinstance(text, str) and not text.startswith("Error")
+
+
+REQUESTS = {"signal": _signal_request, "plain": _plain_request}
+
+
+def run_load(target: str, concurrency: int = DEFAULT_CONCURRENCY, requests: int = DEFAULT_REQUESTS,
+             model: str = DEFAULT_MODEL) -> dict:
+    """
+    Fire `requests` calls of one target with `concurrency` in flight.
+
+    Returns:
+        dict: throughput, success counts and latency percentiles (seconds)
+    """
+    send = REQUESTS[target]
+    latencies = []
+    failures = 0
+
+    def one(i: int):
+        t0 = time.perf_counter()
+        try:
+            ok = send(i, model)
+        except Exception:
+            ok = False
+        return ok, time.perf_counter() - t0
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=f"load-{target}") as pool:
+        for ok, elapsed in pool.map(one, range(requests)):
+            latencies.append(elapsed)
+            failures += 0 if ok else 1
+    wall = time.perf_counter() - start
+
+    return {
+        "target": target,
+        "model": model,
+        "concurrency": concurrency,
+        "requests": requests,
+        "ok": requests - failures,
+        "failed": failures,
+        "wall_s": round(wall, 3),
+        "throughput_rps": round(requests / wall, 2) if wall else 0.0,
+        "latency_s": {
+            "mean": round(sum(latencies) / len(latencies), 4) if latencies else 0.0,
+            "p50": round(percentile(latencies, 50), 4),
+            "p90": round(percentile(latencies, 90), 4),
+            "p95": round(percentile(latencies, 95), 4),
+            "p99": round(percentile(latencies, 99), 4),
+            "max": round(max(latencies), 4) if latencies else 0.0,
+        },
+    }
+
+
+def run_benchmark(targets: tuple = TARGETS, concurrency: int = DEFAULT_CONCURRENCY,
+                  requests: int = DEFAULT_REQUESTS, model: str = DEFAULT_MODEL,
+                  config: StandinConfig = None, unlimited: bool = False) -> dict:
+    """
+    Run each target in turn against the stand-in and collect generator-side stats.
+
+    A stand-in is started in-process (with `config`) unless BASIN_LLM_STANDIN is set.
+    """
+    server = None
+    base_url = os.environ.get(STANDIN_ENV)
+    if not base_url:
+        server = start_standin(config)
+        base_url = server.base_url
+    use_standin(base_url, unlimited)
+
+    from logic.rate_limiter import get_rate_limiter
+    from logic.llm_router import router_status
+    from logic.generator import single_flight_stats
+
+    try:
+        report = {
+            "standin": base_url,
+            "standin_config": config.to_dict() if server and config else None,
+            "runs": [run_load(target, concurrency, requests, model) for target in targets],
+            "rate_limiter": get_rate_limiter().stats(),
+            "router": router_status(),
+            "single_flight": single_flight_stats(),
+        }
+        if server:
+            report["standin_stats"] = server.stats()
+        return report
+    finally:
+        if server:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    import argparse
+    from logic.llm_standin import add_standin_arguments, config_from_args
+
+    parser = argparse.ArgumentParser(description="Load test the generator layer against the LLM stand-in")
+    parser.add_argument("--target", choices=TARGETS + ("both",), default="both")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--requests", type=int, default=DEFAULT_REQUESTS)
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--unlimited", action="store_true", help="Disable the local rate limits")
+    parser.add_argument("--out", help="Write the JSON report here")
+    add_standin_arguments(parser)
+    args = parser.parse_args()
+
+    targets = TARGETS if args.target == "both" else (args.target,)
+    report = run_benchmark(targets, args.concurrency, args.requests, args.model,
+                           config_from_args(args), args.unlimited)
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
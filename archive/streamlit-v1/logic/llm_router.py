@@ -0,0 +1,398 @@
+"""
+BASIN::NEXUS // LLM ROUTER
+Failover, circuit breaking and hedged requests across providers.
+
+A request for one model is tried against an ordered fallback chain (the
+requested model, then Groq 70B -> OpenAI -> local Ollama by default), with
+providers whose circuit is open skipped outright. A provider's circuit
+opens after consecutive failures and lets a single probe through once it
+has cooled down.
+
+Hedging is done on streams (RoutedStream): a backup stream is opened at the
+next provider in the chain if the first has not produced its first token
+within that provider's observed p95 time-to-first-token. The first to
+produce text wins and the loser's stream is closed, which is what makes
+the backup affordable: a blocking SDK call cannot be cancelled once sent.
+Tail latency stays bounded by roughly p95 + the backup's latency even when
+one provider is degraded. route() (blocking) only fails over.
+
+Stream pumps run on their own threads in the caller's scheduler lane, so a
+background job's streams are still held back by the rate limiter.
+"""
+
+import os
+import time
+import queue
+import threading
+from collections import deque
+
+from logic.llm_clients import get_api_key
+from logic.scheduler import current_lane, in_lane
+
+
+# ═══════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ═══════════════════════════════════════════════════════════════
+
+# Backup model per provider, in failover order
+FALLBACK_MODELS = [
+    ("groq", "llama-3.3-70b-versatile"),
+    ("openai", "gpt-4o-mini"),
+    ("ollama", "ollama:llama3.2"),
+]
+
+# Comma-separated model ids replacing the default chain after the requested model
+FALLBACK_ENV = "BASIN_FALLBACK_CHAIN"
+
+FAILURE_THRESHOLD = 3          # consecutive failures that open a circuit
+OPEN_SECONDS = 30.0            # how long an open circuit rejects calls
+
+LATENCY_WINDOW = 100           # successful calls remembered per provider
+HEDGE_MIN_SAMPLES = 10         # below this, HEDGE_DEFAULT_SECONDS is used
+HEDGE_DEFAULT_SECONDS = 4.0
+HEDGE_MIN_SECONDS = 0.5
+
+
+def _is_error(text) -> bool:
+    return not isinstance(text, str) or not text or text.startswith("Error")
+
+
+# ═══════════════════════════════════════════════════════════════
+# CIRCUIT BREAKER + LATENCY
+# ═══════════════════════════════════════════════════════════════
+
+class CircuitBreaker:
+    """Closed -> open after FAILURE_THRESHOLD failures -> half-open probe after OPEN_SECONDS."""
+
+    def __init__(self, threshold: int = FAILURE_THRESHOLD, open_seconds: float = OPEN_SECONDS):
+        self.threshold = threshold
+        self.open_seconds = open_seconds
+        self.failures = 0
+        self.opened_at = None
+        self.probe_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.open_seconds:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Whether a call may go through (one probe per OPEN_SECONDS while half-open)."""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            now = time.monotonic()
+            if state == "half-open" and (self.probe_at is None or now - self.probe_at >= self.open_seconds):
+                self.probe_at = now
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probe_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.probe_at = None
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+
+class LatencyTracker:
+    """Rolling window of successful time-to-first-token latencies for one provider."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self.samples.append(seconds)
+
+    def hedge_deadline(self) -> float:
+        """Seconds to wait before hedging: the p95 once enough samples exist."""
+        with self._lock:
+            samples = sorted(self.samples)
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT_SECONDS
+        return max(HEDGE_MIN_SECONDS, samples[min(len(samples) - 1, int(0.95 * len(samples)))])
+
+
+_BREAKERS = {}
+_FIRST_TOKEN = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def _registry_get(registry: dict, provider: str, factory):
+    with _REGISTRY_LOCK:
+        if provider not in registry:
+            registry[provider] = factory()
+        return registry[provider]
+
+
+def get_breaker(provider: str) -> CircuitBreaker:
+    return _registry_get(_BREAKERS, provider, CircuitBreaker)
+
+
+def get_latency(provider: str) -> LatencyTracker:
+    """Time-to-first-token tracker for a provider (sets its stream hedge deadline)."""
+    return _registry_get(_FIRST_TOKEN, provider, LatencyTracker)
+
+
+def router_status() -> dict:
+    """provider -> circuit state, consecutive failures and current hedge deadline."""
+    with _REGISTRY_LOCK:
+        providers = set(_BREAKERS) | set(_FIRST_TOKEN)
+    return {
+        provider: {
+            "circuit": get_breaker(provider).state,
+            "failures": get_breaker(provider).failures,
+            "hedge_after_first_token_s": round(get_latency(provider).hedge_deadline(), 3),
+        }
+        for provider in sorted(providers)
+    }
+
+
+# ═══════════════════════════════════════════════════════════════
+# CHAIN
+# ═══════════════════════════════════════════════════════════════
+
+def _configured(provider: str) -> bool:
+    return provider == "ollama" or get_api_key(provider) is not None
+
+
+def fallback_chain(model_name: str, provider_of) -> list:
+    """
+    Ordered (provider, model) candidates for a request: the requested model
+    first, then one backup per other configured provider.
+
+    Args:
+        model_name: Requested model id
+        provider_of: get_provider() (model id -> provider)
+    """
+    override = os.environ.get(FALLBACK_ENV)
+    backups = ([(provider_of(m), m) for m in (m.strip() for m in override.split(",")) if m]
+               if override else FALLBACK_MODELS)
+    chain = [(provider_of(model_name), model_name)]
+    for provider, model in backups:
+        if all(provider != p for p, _ in chain) and _configured(provider):
+            chain.append((provider, model))
+    return chain
+
+
+def _candidates(chain: list):
+    """
+    Yield the candidates whose circuit lets a call through, in chain order.
+
+    A circuit is only asked when the caller pulls the next candidate, i.e.
+    right before attempting it, so a half-open backup keeps its single probe
+    for a call that actually needs it. If no circuit allowed anything, the
+    requested model is yielded as a last resort.
+    """
+    tried = False
+    for provider, model in chain:
+        if get_breaker(provider).allow():
+            tried = True
+            yield provider, model
+    if not tried:
+        yield chain[0]
+
+
+# ═══════════════════════════════════════════════════════════════
+# ROUTING
+# ═══════════════════════════════════════════════════════════════
+
+def _attempt(call, provider: str, model: str):
+    try:
+        text = call(model, provider)
+    except Exception as e:
+        text = f"Error generating text: {str(e)}"
+    if _is_error(text):
+        get_breaker(provider).record_failure()
+    else:
+        get_breaker(provider).record_success()
+    return text
+
+
+def route(call, chain: list) -> tuple:
+    """
+    Run a blocking completion with failover.
+
+    Args:
+        call: (model, provider) -> text; error strings start with "Error"
+        chain: fallback_chain() output
+
+    Returns:
+        tuple: (text, model that produced it); the last error if all failed
+    """
+    text, model = None, chain[0][1]
+    for provider, model in _candidates(chain):
+        text = _attempt(call, provider, model)
+        if not _is_error(text):
+            return text, model
+    return text, model
+
+
+def collect(stream: "RoutedStream") -> tuple:
+    """
+    Drain a RoutedStream into a blocking answer (how blocking calls hedge).
+
+    Returns:
+        tuple: (text, model that produced it); an error string if it failed
+    """
+    parts = []
+    try:
+        for delta in stream:
+            parts.append(delta)
+    finally:
+        stream.close()
+    if stream.failed:
+        return (parts[-1] if parts else "Error: Empty response"), stream.model
+    return "".join(parts), stream.model
+
+
+class _StreamPump(threading.Thread):
+    """Drains one provider stream into a shared queue until told to stop."""
+
+    def __init__(self, index: int, deltas, out: queue.Queue, lane: str):
+        super().__init__(daemon=True, name=f"stream-pump-{index}")
+        self.index = index
+        self.deltas = deltas
+        self.out = out
+        self.lane = lane
+        self.stop = threading.Event()
+
+    def run(self):
+        # The provider call happens here, on first iteration: charge it to the caller's lane
+        with in_lane(self.lane):
+            try:
+                for delta in self.deltas:
+                    if self.stop.is_set():
+                        break
+                    if delta:
+                        self.out.put((self.index, "delta", delta))
+                self.out.put((self.index, "end", None))
+            except Exception as e:
+                self.out.put((self.index, "error", f"Error generating text: {str(e)}"))
+            finally:
+                self.deltas.close()
+
+
+class RoutedStream:
+    """
+    Streaming failover: iterates text deltas from the first candidate to
+    produce a token. A candidate that errors before its first token fails
+    over to the next; with hedging, the next candidate is also started once
+    the current one passes its first-token p95, and the loser's stream is
+    closed. Once a candidate has produced text it is committed to (a
+    mid-stream failure is reported, not retried).
+
+    After iteration, `.model` is the model that answered and `.failed` is
+    True if the text ended in an error.
+
+    Args:
+        open_stream: (model, provider) -> generator of text deltas
+        chain: fallback_chain() output
+        hedge: Start a backup stream past the first-token deadline
+    """
+
+    def __init__(self, open_stream, chain: list, hedge: bool):
+        self.open_stream = open_stream
+        self.chain = chain
+        self.candidates = []        # launched (provider, model), indexed by pump
+        self.hedge = hedge
+        self.model = None
+        self.failed = False
+        self._gen = self._run()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._gen)
+
+    def close(self):
+        self._gen.close()
+
+    def _run(self):
+        out = queue.Queue()
+        pumps = {}
+        started = {}
+        upcoming = _candidates(self.chain)
+        more = True
+        finished = set()        # candidates that already failed; their later events are ignored
+        winner = None
+        last_error = None
+
+        def launch() -> bool:
+            candidate = next(upcoming, None)
+            if candidate is None:
+                return False
+            index = len(self.candidates)
+            self.candidates.append(candidate)
+            provider, model = candidate
+            pump = _StreamPump(index, self.open_stream(model, provider), out, current_lane())
+            pumps[index] = pump
+            started[index] = time.perf_counter()
+            pump.start()
+            return True
+
+        try:
+            launch()
+            while True:
+                timeout = None
+                if winner is None and more and self.hedge:
+                    newest = max(started, key=started.get)
+                    provider = self.candidates[newest][0]
+                    elapsed = time.perf_counter() - started[newest]
+                    timeout = max(0.0, get_latency(provider).hedge_deadline() - elapsed)
+                try:
+                    index, kind, value = out.get(timeout=timeout)
+                except queue.Empty:
+                    more = launch()
+                    continue
+                provider, model = self.candidates[index]
+                if index in finished or (winner is not None and index != winner):
+                    continue
+                if kind == "delta":
+                    if winner is None:
+                        if value.startswith("Error"):
+                            kind = "error"
+                        else:
+                            winner, self.model = index, model
+                            get_latency(provider).record(time.perf_counter() - started[index])
+                            for other, pump in pumps.items():
+                                if other != index:
+                                    pump.stop.set()
+                    if kind == "delta":
+                        yield value
+                        continue
+                if kind == "end" and winner is not None:
+                    get_breaker(provider).record_success()
+                    return
+                # Error (or an empty stream) before this candidate produced text; charged once per attempt
+                finished.add(index)
+                get_breaker(provider).record_failure()
+                if winner is not None:
+                    self.failed = True
+                    yield value or ""
+                    return
+                last_error = value or "Error: Empty response"
+                pumps.pop(index).stop.set()
+                if not pumps:
+                    if not (more and launch()):
+                        self.failed = True
+                        self.model = model
+                        yield last_error
+                        return
+        finally:
+            for pump in pumps.values():
+                pump.stop.set()
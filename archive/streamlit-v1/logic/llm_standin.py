@@ -0,0 +1,286 @@
+"""
+BASIN::NEXUS // LOCAL LLM STAND-IN
+An OpenAI-compatible chat completions server for offline latency and load testing.
+
+Speaks enough of POST /v1/chat/completions (and Groq's /openai/v1/...)
+for the OpenAI and Groq SDKs:
+- plain and streaming (SSE) responses, with usage
+- JSON mode (response_format json_object), answered with the mock signal payload
+- time to first token drawn from a fixed / uniform / exponential / lognormal
+  distribution, then output at a configurable tokens-per-second rate
+- injected 500s and 429s (with retry-after headers) at configurable rates
+
+Point the generator at it with BASIN_LLM_STANDIN (see logic.llm_clients):
+
+    python -m logic.llm_standin --port 8765 --ttft-ms 300 --rate-limit-rate 0.05
+    BASIN_LLM_STANDIN=http://127.0.0.1:8765 streamlit run app.py
+"""
+
+import json
+import math
+import time
+import random
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# ═══════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ═══════════════════════════════════════════════════════════════
+
+DEFAULT_PORT = 8765
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+_WORDS = (
+    "signal pipeline revenue architecture runway quota territory outbound playbook "
+    "forecast cohort conversion enablement velocity churn expansion motion segment "
+    "narrative leverage system build ship measure iterate"
+).split()
+
+
+class StandinConfig:
+    """Latency, throughput and fault-injection settings for the stand-in."""
+
+    def __init__(self, ttft_ms: float = 300.0, latency_dist: str = "lognormal", latency_sigma: float = 0.5,
+                 tokens_per_s: float = 200.0, output_tokens: int = 120, error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, retry_after_s: float = 1.0, seed: int = None):
+        if latency_dist not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"latency_dist must be one of {LATENCY_DISTRIBUTIONS}")
+        self.ttft_ms = ttft_ms
+        self.latency_dist = latency_dist
+        self.latency_sigma = latency_sigma
+        self.tokens_per_s = tokens_per_s
+        self.output_tokens = output_tokens
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after_s = retry_after_s
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def sample_ttft(self) -> float:
+        """Seconds before the first token; the mean is ttft_ms for every distribution."""
+        mean = self.ttft_ms / 1000.0
+        with self.lock:
+            if self.latency_dist == "fixed":
+                return mean
+            if self.latency_dist == "uniform":
+                return self.rng.uniform(0.0, 2 * mean)
+            if self.latency_dist == "exponential":
+                return self.rng.expovariate(1.0 / mean) if mean > 0 else 0.0
+            # lognormal with mu chosen so E[X] = mean
+            return self.rng.lognormvariate(math.log(mean) - self.latency_sigma ** 2 / 2, self.latency_sigma) if mean > 0 else 0.0
+
+    def roll_fault(self):
+        """'rate_limit', 'error' or None for one request."""
+        with self.lock:
+            roll = self.rng.random()
+        if roll < self.rate_limit_rate:
+            return "rate_limit"
+        if roll < self.rate_limit_rate + self.error_rate:
+            return "error"
+        return None
+
+    def to_dict(self) -> dict:
+        return {k: v for k, v in vars(self).items() if k not in ("rng", "lock")}
+
+
+def completion_text(messages: list, json_mode: bool, output_tokens: int) -> list:
+    """
+    Response content as a list of token strings: the mock signal payload in
+    JSON mode, otherwise prompt-seeded filler words.
+    """
+    if json_mode:
+        from logic.generator import get_mock_data
+        text = json.dumps(get_mock_data())
+        return [text[i:i + 4] for i in range(0, len(text), 4)]
+    seed = hashlib.sha1(json.dumps(messages, sort_keys=True).encode("utf-8")).digest()
+    rng = random.Random(seed)
+    return [rng.choice(_WORDS) + " " for _ in range(max(1, output_tokens))]
+
+
+def _prompt_tokens(messages: list) -> int:
+    return sum(len(str(m.get("content", ""))) for m in messages) // 4 + 3 * len(messages)
+
+
+# ═══════════════════════════════════════════════════════════════
+# SERVER
+# ═══════════════════════════════════════════════════════════════
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "BasinStandin/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _json(self, status: int, payload: dict, headers: dict = None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._json(200, {"object": "list", "data": [{"id": "standin", "object": "model"}]})
+        elif self.path == "/stats":
+            self._json(200, self.server.stats())
+        else:
+            self._json(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._json(400, {"error": {"message": "Invalid JSON body", "type": "invalid_request_error"}})
+            return
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._json(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+            return
+
+        request_no = self.server.count("requests")
+        config = self.server.config
+        fault = config.roll_fault()
+        if fault == "rate_limit":
+            self.server.count("rate_limited")
+            self._json(429, {"error": {"message": "Rate limit reached (stand-in)", "type": "rate_limit_exceeded",
+                                       "code": "rate_limit_exceeded"}},
+                       {"retry-after": f"{config.retry_after_s:g}",
+                        "retry-after-ms": str(int(config.retry_after_s * 1000))})
+            return
+        if fault == "error":
+            self.server.count("errors")
+            self._json(500, {"error": {"message": "Injected server error (stand-in)", "type": "server_error"}})
+            return
+
+        messages = request.get("messages") or []
+        json_mode = (request.get("response_format") or {}).get("type") == "json_object"
+        tokens = completion_text(messages, json_mode, request.get("max_tokens") or config.output_tokens)
+        usage = {"prompt_tokens": _prompt_tokens(messages), "completion_tokens": len(tokens),
+                 "total_tokens": _prompt_tokens(messages) + len(tokens)}
+        meta = {"id": f"chatcmpl-standin-{request_no}", "created": int(time.time()),
+                "model": request.get("model", "standin")}
+
+        time.sleep(config.sample_ttft())
+        if request.get("stream"):
+            self.server.count("streamed")
+            self._stream(tokens, usage, meta, (request.get("stream_options") or {}).get("include_usage"))
+        else:
+            time.sleep(len(tokens) / config.tokens_per_s if config.tokens_per_s else 0)
+            self._json(200, dict(meta, object="chat.completion", usage=usage, choices=[{
+                "index": 0, "finish_reason": "stop",
+                "message": {"role": "assistant", "content": "".join(tokens)},
+            }]))
+        self.server.count("completed")
+
+    def _stream(self, tokens: list, usage: dict, meta: dict, include_usage: bool):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        interval = 1.0 / self.server.config.tokens_per_s if self.server.config.tokens_per_s else 0
+
+        def event(delta: dict, finish=None, **extra):
+            chunk = dict(meta, object="chat.completion.chunk",
+                         choices=[{"index": 0, "delta": delta, "finish_reason": finish}], **extra)
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        try:
+            event({"role": "assistant", "content": ""})
+            for token in tokens:
+                event({"content": token})
+                time.sleep(interval)
+            event({}, "stop")
+            if include_usage:
+                chunk = dict(meta, object="chat.completion.chunk", choices=[], usage=usage)
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # Client closed the stream early (e.g. a hedged loser)
+            self.server.count("aborted")
+
+
+class StandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple, config: StandinConfig):
+        super().__init__(address, _Handler)
+        self.config = config
+        self._counts = {"requests": 0, "completed": 0, "streamed": 0, "errors": 0, "rate_limited": 0, "aborted": 0}
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, name: str) -> int:
+        with self._lock:
+            self._counts[name] += 1
+            return self._counts[name]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._counts)
+
+
+def start_standin(config: StandinConfig = None, host: str = "127.0.0.1", port: int = 0) -> StandinServer:
+    """
+    Start the stand-in on a daemon thread.
+
+    Args:
+        port: 0 picks a free port (read it back from .base_url)
+
+    Returns:
+        StandinServer: call .shutdown() to stop it
+    """
+    server = StandinServer((host, port), config or StandinConfig())
+    threading.Thread(target=server.serve_forever, daemon=True, name="llm-standin").start()
+    return server
+
+
+def add_standin_arguments(parser):
+    """StandinConfig options for argparse (shared with logic.llm_loadtest)."""
+    parser.add_argument("--ttft-ms", type=float, default=300.0, help="Mean time to first token")
+    parser.add_argument("--latency-dist", choices=LATENCY_DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Lognormal shape")
+    parser.add_argument("--tokens-per-s", type=float, default=200.0)
+    parser.add_argument("--output-tokens", type=int, default=120)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests answered 429")
+    parser.add_argument("--retry-after-s", type=float, default=1.0)
+    parser.add_argument("--seed", type=int)
+
+
+def config_from_args(args) -> StandinConfig:
+    return StandinConfig(args.ttft_ms, args.latency_dist, args.latency_sigma, args.tokens_per_s,
+                         args.output_tokens, args.error_rate, args.rate_limit_rate, args.retry_after_s, args.seed)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="OpenAI-compatible stand-in LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    add_standin_arguments(parser)
+    args = parser.parse_args()
+
+    server = StandinServer((args.host, args.port), config_from_args(args))
+    print(f"Stand-in listening on {server.base_url}  (export BASIN_LLM_STANDIN={server.base_url})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,200 @@
+"""
+BASIN::NEXUS // ORACLE QUERY CACHE & AUTOCOMPLETE
+- QueryCache: LRU of search results keyed by (normalised query, index generation).
+- PrefixIndex: sorted term dictionary over index vocabulary and entity names,
+  answering type-ahead lookups with a binary search.
+
+Both are tied to OracleIndex.generation: when the index changes, cached
+results and suggestions are dropped automatically.
+"""
+
+import bisect
+import os
+import threading
+from collections import OrderedDict
+
+from logic.embeddings import tokenize
+
+
+# ═══════════════════════════════════════════════════════════════
+# QUERY NORMALISATION
+# ═══════════════════════════════════════════════════════════════
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive cache key."""
+    return " ".join(query.lower().split())
+
+
+# ═══════════════════════════════════════════════════════════════
+# RESULT CACHE
+# ═══════════════════════════════════════════════════════════════
+
+class QueryCache:
+    """Thread-safe LRU cache of search results for one index generation."""
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self.generation = None
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _sync(self, generation):
+        if generation != self.generation:
+            self._entries.clear()
+            self.generation = generation
+
+    def get(self, query: str, generation):
+        """Cached results or None. A generation change empties the cache."""
+        key = normalize_query(query)
+        with self._lock:
+            self._sync(generation)
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, query: str, generation, results):
+        key = normalize_query(query)
+        with self._lock:
+            self._sync(generation)
+            self._entries[key] = results
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries),
+                    "generation": self.generation}
+
+
+# ═══════════════════════════════════════════════════════════════
+# PREFIX INDEX (TYPE-AHEAD)
+# ═══════════════════════════════════════════════════════════════
+
+# Entities rank above plain vocabulary terms with the same frequency
+KIND_WEIGHT = {"company": 1000, "contact": 500, "asset": 300, "term": 0}
+SHORT_PREFIX_LEN = 2
+
+
+class PrefixIndex:
+    """
+    Sorted term dictionary for autocomplete.
+
+    Lookup is a bisect into a sorted key array followed by a bounded scan.
+    Top suggestions for 1-2 character prefixes (the only ranges large enough
+    to make a scan expensive) are precomputed at build time.
+    """
+
+    def __init__(self, entries: list, limit: int = 8):
+        """
+        Args:
+            entries: (display text, kind, weight) tuples
+            limit: Max suggestions per lookup
+        """
+        self.limit = limit
+        best = {}
+        for display, kind, weight in entries:
+            key = display.lower()
+            score = weight + KIND_WEIGHT.get(kind, 0)
+            if key not in best or score > best[key][2]:
+                best[key] = (display, kind, score)
+        items = sorted(best.items())
+        self.keys = [k for k, _ in items]
+        self.values = [v for _, v in items]
+
+        self._short = {}
+        for key, value in items:
+            for n in range(1, min(SHORT_PREFIX_LEN, len(key)) + 1):
+                self._short.setdefault(key[:n], []).append(value)
+        for prefix, values in self._short.items():
+            values.sort(key=lambda v: -v[2])
+            del values[limit:]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def complete(self, prefix: str, limit: int = None, max_scan: int = 512) -> list:
+        """
+        Entries starting with `prefix`, best-weighted first.
+
+        Returns:
+            list: (display text, kind) tuples
+        """
+        limit = limit or self.limit
+        prefix = prefix.lower()
+        if not prefix:
+            return []
+        if len(prefix) <= SHORT_PREFIX_LEN:
+            return [(d, k) for d, k, _ in self._short.get(prefix, [])[:limit]]
+
+        lo = bisect.bisect_left(self.keys, prefix)
+        hi = bisect.bisect_left(self.keys, prefix + "\uffff", lo, min(len(self.keys), lo + max_scan))
+        candidates = sorted(self.values[lo:hi], key=lambda v: -v[2])
+        return [(d, k) for d, k, _ in candidates[:limit]]
+
+    def suggest(self, query: str, limit: int = None) -> list:
+        """
+        Type-ahead for a partially typed query.
+
+        Whole-query matches against entity names come first; then the last
+        word is completed from the vocabulary and re-attached to the rest.
+
+        Returns:
+            list: Suggested full query strings
+        """
+        limit = limit or self.limit
+        query = " ".join(query.split())
+        if not query:
+            return []
+
+        suggestions = []
+        for display, kind in self.complete(query, limit):
+            if kind != "term":
+                suggestions.append(display)
+
+        head, _, last = query.rpartition(" ")
+        if last:
+            for display, kind in self.complete(last, limit):
+                if kind == "term":
+                    suggestions.append(f"{head} {display}".strip())
+
+        seen, unique = set(), []
+        for s in suggestions:
+            if s.lower() != query.lower() and s.lower() not in seen:
+                seen.add(s.lower())
+                unique.append(s)
+        return unique[:limit]
+
+
+def build_prefix_index(docs: list, min_term_len: int = 3) -> PrefixIndex:
+    """
+    Build the autocomplete dictionary from Oracle documents.
+
+    Vocabulary terms are weighted by document frequency; companies, contact
+    names and asset titles are added as entities.
+    """
+    df = {}
+    entries = []
+    for doc in docs:
+        for term in set(tokenize(doc["content"])):
+            if len(term) >= min_term_len and not term.isdigit():
+                df[term] = df.get(term, 0) + 1
+
+        metadata = doc.get("metadata") or {}
+        if doc.get("type") == "Deal":
+            entries.append((metadata.get("company") or "", "company", 1))
+        elif doc.get("type") == "Contact":
+            entries.append((metadata.get("name") or "", "contact", 1))
+            if metadata.get("company"):
+                entries.append((metadata["company"], "company", 1))
+        else:
+            title = os.path.splitext(doc["source"])[0].replace("_", " ")
+            entries.append((title, "asset", 1))
+
+    entries.extend((term, "term", count) for term, count in df.items())
+    return PrefixIndex([e for e in entries if e[0].strip()])
@@ -0,0 +1,276 @@
+"""
+BASIN::NEXUS // ORACLE EVALUATION HARNESS
+Offline relevance and latency benchmark for search_nexus().
+
+A fixture corpus (oracle_eval_fixtures.json) carries judged queries with
+graded relevance per source. It is padded with deterministic synthetic
+distractor documents to several corpus sizes, and at each size we report:
+- nDCG@k, MRR and recall@k (mean over queries, plus per-query values)
+- p50 / p95 / p99 query latency
+
+The JSON report is stable (sorted keys, rounded values, fixed seed) so two
+commits can be compared with `--compare`:
+
+    python -m logic.oracle_eval --sizes 0 1000 10000 --out oracle_eval.json
+    python -m logic.oracle_eval --compare oracle_eval.json
+"""
+
+import os
+import json
+import math
+import time
+import random
+import tempfile
+
+from logic.oracle_index import OracleIndex
+from logic.oracle_search import search_nexus, HYBRID_ALPHA
+
+
+# ═══════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ═══════════════════════════════════════════════════════════════
+
+FIXTURES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "oracle_eval_fixtures.json")
+DEFAULT_SIZES = (0, 1000, 5000)
+DEFAULT_K = 10
+LATENCY_REPEATS = 3
+
+# Distractor vocabulary deliberately overlaps the judged queries
+_SYNTH_WORDS = (
+    "pipeline revenue churn onboarding python dashboard pricing renewal quota forecast "
+    "customer success sales engineer lakehouse analytics playbook outbound pilot expansion "
+    "hiring interview offer recruiter platform security cloud data model api integration "
+    "roadmap launch partner migration support ticket account executive demo discovery"
+).split()
+_SYNTH_COMPANIES = (
+    "Acme Nimbus Vertex Quanta Lumen Orbit Helix Cobalt Zephyr Pioneer Summit Atlas "
+    "Beacon Cascade Ember Falcon Granite Harbor Ion Juniper Keystone Lattice Meridian"
+).split()
+_SYNTH_STAGES = ["Applied", "Interview", "Offer", "Rejected"]
+_SYNTH_SIGNALS = ["Hot", "Warm", "Cold"]
+
+
+# ═══════════════════════════════════════════════════════════════
+# CORPUS
+# ═══════════════════════════════════════════════════════════════
+
+def load_fixtures(path: str = FIXTURES_PATH) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def synthetic_documents(n: int, seed: int = 0) -> list:
+    """
+    Deterministic distractors: one third markdown notes, the rest deals and contacts.
+
+    Returns:
+        list: Documents in the fixture format ('key', 'source', 'type', 'content', ...)
+    """
+    rng = random.Random(seed)
+    docs = []
+    for i in range(n):
+        company = f"{rng.choice(_SYNTH_COMPANIES)} {rng.choice(_SYNTH_COMPANIES)} {i}"
+        words = lambda count: " ".join(rng.choice(_SYNTH_WORDS) for _ in range(count))
+        created = f"2023-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} 12:00:00"
+        kind = i % 3
+        if kind == 0:
+            sections = "\n\n".join(f"## {words(2).title()}\n{words(60)}." for _ in range(rng.randint(1, 4)))
+            docs.append({
+                "key": f"file:SYNTH_{i}.md", "source": f"SYNTH_{i}.md", "type": "Doctum",
+                "modified": created[:10], "content": f"# {words(3).title()}\n\n{sections}",
+            })
+        elif kind == 1:
+            row = {"id": 100000 + i, "company": company, "role": words(2).title(),
+                   "stage": rng.choice(_SYNTH_STAGES), "signal": rng.choice(_SYNTH_SIGNALS),
+                   "created_at": created}
+            docs.append({
+                "key": f"crm_deals:{row['id']}", "source": f"Deal - {company}", "type": "Deal",
+                "content": f"Company: {company}\nRole: {row['role']}\nStage: {row['stage']}\n"
+                           f"Signal: {row['signal']}\nNotes: {words(12)}",
+                "metadata": row,
+            })
+        else:
+            name = f"Person {i}"
+            row = {"id": 100000 + i, "name": name, "company": company, "role": words(2).title(),
+                   "contact_type": rng.choice(["Recruiter", "Hiring Manager", "Peer"]), "created_at": created}
+            docs.append({
+                "key": f"crm_contacts:{row['id']}", "source": f"Contact - {name}", "type": "Contact",
+                "content": f"Name: {name}\nCompany: {company}\nRole: {row['role']}\n"
+                           f"Type: {row['contact_type']}\nNotes: {words(12)}",
+                "metadata": row,
+            })
+    return docs
+
+
+def build_index(documents: list, path: str) -> OracleIndex:
+    """In-memory OracleIndex over the given documents (no database, no assets/ scan)."""
+    index = OracleIndex(path)
+    for doc in documents:
+        doc = dict(doc)
+        key = doc.pop("key")
+        index._upsert(key, doc)
+        if doc["type"] == "Deal":
+            index.clusters.upsert_deal(doc["metadata"])
+        elif doc["type"] == "Contact":
+            index.clusters.upsert_contact(doc["metadata"])
+    if hasattr(index.vectors, "retrain"):
+        index.vectors.retrain()
+    return index
+
+
+# ═══════════════════════════════════════════════════════════════
+# METRICS
+# ═══════════════════════════════════════════════════════════════
+
+def ranked_sources(results: list) -> list:
+    """Result sources in rank order, each listed once (passages of one doc collapse)."""
+    seen, ranked = set(), []
+    for result in results:
+        if result["source"] not in seen:
+            seen.add(result["source"])
+            ranked.append(result["source"])
+    return ranked
+
+
+def ndcg_at_k(ranked: list, relevant: dict, k: int) -> float:
+    """Graded nDCG with gain 2^rel - 1."""
+    dcg = sum((2 ** relevant.get(source, 0) - 1) / math.log2(rank + 2)
+              for rank, source in enumerate(ranked[:k]))
+    ideal = sorted(relevant.values(), reverse=True)[:k]
+    idcg = sum((2 ** rel - 1) / math.log2(rank + 2) for rank, rel in enumerate(ideal))
+    return dcg / idcg if idcg else 0.0
+
+
+def reciprocal_rank(ranked: list, relevant: dict) -> float:
+    for rank, source in enumerate(ranked):
+        if relevant.get(source, 0) > 0:
+            return 1.0 / (rank + 1)
+    return 0.0
+
+
+def recall_at_k(ranked: list, relevant: dict, k: int) -> float:
+    wanted = {s for s, rel in relevant.items() if rel > 0}
+    return len(wanted.intersection(ranked[:k])) / len(wanted) if wanted else 0.0
+
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+# ═══════════════════════════════════════════════════════════════
+# EVALUATION
+# ═══════════════════════════════════════════════════════════════
+
+def evaluate_index(index: OracleIndex, queries: list, k: int = DEFAULT_K,
+                   alpha: float = HYBRID_ALPHA, repeats: int = LATENCY_REPEATS) -> dict:
+    """
+    Run every judged query against one index.
+
+    Returns:
+        dict: 'n_docs', mean 'ndcg', 'mrr', 'recall', 'latency_ms' percentiles and 'per_query'
+    """
+    docs = index.documents()
+    per_query, latencies = [], []
+    for judged in queries:
+        timings = []
+        for _ in range(max(1, repeats)):
+            t0 = time.perf_counter()
+            results = search_nexus(judged["query"], docs, vectors=index.vectors, alpha=alpha,
+                                   clusters=index.clusters, postings=index.postings)
+            timings.append((time.perf_counter() - t0) * 1000)
+        latencies.extend(timings)
+
+        ranked = ranked_sources(results)
+        relevant = judged["relevant"]
+        per_query.append({
+            "query": judged["query"],
+            "ndcg": round(ndcg_at_k(ranked, relevant, k), 4),
+            "mrr": round(reciprocal_rank(ranked, relevant), 4),
+            "recall": round(recall_at_k(ranked, relevant, k), 4),
+            "top": ranked[:3],
+        })
+
+    n = len(per_query) or 1
+    return {
+        "n_docs": len(docs),
+        "ndcg": round(sum(q["ndcg"] for q in per_query) / n, 4),
+        "mrr": round(sum(q["mrr"] for q in per_query) / n, 4),
+        "recall": round(sum(q["recall"] for q in per_query) / n, 4),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 3),
+            "p95": round(percentile(latencies, 95), 3),
+            "p99": round(percentile(latencies, 99), 3),
+            "mean": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+        },
+        "per_query": per_query,
+    }
+
+
+def run_evaluation(sizes: tuple = DEFAULT_SIZES, k: int = DEFAULT_K, alpha: float = HYBRID_ALPHA,
+                   fixtures_path: str = FIXTURES_PATH, seed: int = 0) -> dict:
+    """
+    Evaluate at each synthetic corpus size (number of distractors added to the fixtures).
+
+    Returns:
+        dict: Report with 'config' and one entry per size under 'runs'
+    """
+    fixtures = load_fixtures(fixtures_path)
+    report = {
+        "config": {"k": k, "alpha": alpha, "seed": seed, "queries": len(fixtures["queries"]),
+                   "fixture_docs": len(fixtures["documents"])},
+        "runs": [],
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            documents = fixtures["documents"] + synthetic_documents(size, seed)
+            index = build_index(documents, os.path.join(tmp, f"eval_{size}.json"))
+            run = evaluate_index(index, fixtures["queries"], k, alpha)
+            run["distractors"] = size
+            report["runs"].append(run)
+    return report
+
+
+def compare_reports(old: dict, new: dict) -> list:
+    """Per-size metric deltas (new - old) for runs present in both reports."""
+    old_runs = {run["distractors"]: run for run in old.get("runs", [])}
+    deltas = []
+    for run in new.get("runs", []):
+        before = old_runs.get(run["distractors"])
+        if before is None:
+            continue
+        deltas.append({
+            "distractors": run["distractors"],
+            **{m: round(run[m] - before[m], 4) for m in ("ndcg", "mrr", "recall")},
+            **{f"{p}_ms": round(run["latency_ms"][p] - before["latency_ms"][p], 3) for p in ("p50", "p95", "p99")},
+        })
+    return deltas
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Oracle search relevance and latency evaluation")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="Synthetic distractor counts to evaluate at")
+    parser.add_argument("--k", type=int, default=DEFAULT_K)
+    parser.add_argument("--alpha", type=float, default=HYBRID_ALPHA)
+    parser.add_argument("--fixtures", default=FIXTURES_PATH)
+    parser.add_argument("--out", help="Write the JSON report here")
+    parser.add_argument("--compare", help="Previous report to diff against")
+    args = parser.parse_args()
+
+    report = run_evaluation(tuple(args.sizes), args.k, args.alpha, args.fixtures)
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            print(json.dumps(compare_reports(json.load(f), report), indent=2))
+    elif not args.out:
+        print(text)
@@ -0,0 +1,555 @@
+"""
+BASIN::NEXUS // ORACLE INDEX (PERSISTENT STORE)
+Disk-backed document store behind the Oracle search engine.
+
+The index lives next to the SQLite database and is refreshed incrementally:
+- Markdown assets are tracked by mtime/size, with a content hash to confirm changes.
+- CRM deals and contacts are tracked by their `updated_at` column.
+Cold loads read the persisted state; refresh() only re-reads what changed.
+Chunk embeddings are kept in a VectorStore saved alongside the index, and
+deal/contact rows feed a ClusterEngine kept current on the same deltas.
+Facet bitmaps (type, stage, signal, company, ...) are maintained per document,
+along with positional term postings.
+
+Documents and postings are persisted in a memory-mapped binary segment
+(see logic/index_segment.py) and the embedding matrix in a .npy opened with
+mmap_mode="r", so workers share pages through the OS cache. A cold load
+reads document keys and vector row labels only: document metadata is parsed
+when a document is first touched, and facet bitmaps and company clusters
+are built from it on first use. The JSON file holds the refresh bookkeeping.
+save() still rewrites the whole segment and vector files after a change.
+
+Changed asset files are read, chunked, embedded and tokenized in a process
+pool when there are enough of them; the parent merges the partial results.
+Prebuild offline with:
+
+    python -m logic.oracle_index --workers 8
+"""
+
+import os
+import glob
+import json
+import hashlib
+import sys
+import time
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+from logic.database import DB_PATH, get_connection
+from logic.chunker import chunk_markdown
+from logic.embeddings import EMBEDDING_DIM, MATRIX_SUFFIX, VectorStore, embed_text
+from logic.ann_index import AnnVectorStore, IVF_SUFFIX
+from logic.cluster_engine import ClusterEngine
+from logic.facets import FacetIndex
+from logic.postings import PostingsIndex, term_positions
+from logic.index_segment import IndexSegment, SegmentDocuments, write_segment
+
+
+# ═══════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ═══════════════════════════════════════════════════════════════
+
+INDEX_FILENAME = "basin_oracle_index.json"
+INDEX_VERSION = 6
+
+# Vector search backend: "exact" (brute force) or "ivf" (approximate, for large corpora)
+VECTOR_BACKEND = os.environ.get("ORACLE_VECTOR_BACKEND", "exact")
+VECTOR_STORES = {"exact": VectorStore, "ivf": AnnVectorStore}
+
+# Changed files are processed in a pool once there are at least this many
+PARALLEL_MIN_FILES = 32
+INDEX_WORKERS = int(os.environ.get("ORACLE_INDEX_WORKERS", "0")) or os.cpu_count() or 1
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ASSETS_DIR = os.path.join(BASE_DIR, "assets")
+EXTRA_FILES = [os.path.join(BASE_DIR, "GITHUB_PROFILE_README.md")]
+
+# CRM tables indexed by the Oracle: table -> (doc type, source label builder, text builder)
+DB_SOURCES = {
+    "crm_deals": (
+        "Deal",
+        lambda r: f"Deal - {r['company']}",
+        lambda r: f"Company: {r['company']}\nRole: {r['role']}\nStage: {r['stage']}\nSignal: {r['signal']}\nNotes: {r.get('notes') or ''}",
+    ),
+    "crm_contacts": (
+        "Contact",
+        lambda r: f"Contact - {r['name']}",
+        lambda r: f"Name: {r['name']}\nCompany: {r.get('company') or ''}\nRole: {r.get('role') or ''}\nType: {r.get('contact_type') or ''}\nNotes: {r.get('notes') or ''}",
+    ),
+}
+
+
+def get_index_path() -> str:
+    """Index file sits in the same directory as the SQLite database."""
+    return os.path.join(os.path.dirname(os.path.abspath(DB_PATH)), INDEX_FILENAME)
+
+
+def list_asset_files() -> list:
+    """All markdown files the Oracle should index."""
+    files = glob.glob(os.path.join(ASSETS_DIR, "*.md"))
+    files.extend(p for p in EXTRA_FILES if os.path.exists(p))
+    return files
+
+
+def _hash_text(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _chunks_for(doc_type: str, content: str) -> list:
+    if doc_type == "Doctum":
+        return chunk_markdown(content)
+    return [{"start": 0, "end": len(content), "heading": None}]
+
+
+def _embed_chunks(content: str, chunks: list, dim: int = EMBEDDING_DIM):
+    vectors = [embed_text(content[c["start"]:c["end"]], dim) for c in chunks]
+    return np.stack(vectors) if vectors else None
+
+
+def _index_file(file_path: str):
+    """
+    Read, hash, chunk, embed and tokenize one asset file.
+
+    Runs in worker processes, so it only touches its arguments and returns
+    plain picklable data.
+
+    Returns:
+        dict or None: 'path', 'mtime', 'size', 'hash', 'content', 'modified',
+                      'chunks', 'vectors', 'positions'; None if unreadable
+    """
+    try:
+        stat = os.stat(file_path)
+        with open(file_path, "r", encoding="utf-8") as f:
+            content = f.read()
+    except Exception as e:
+        print(f"Error indexing {file_path}: {e}")
+        return None
+    chunks = _chunks_for("Doctum", content)
+    return {
+        "path": file_path,
+        "mtime": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "hash": _hash_text(content),
+        "content": content,
+        "modified": datetime.fromtimestamp(stat.st_mtime).strftime("%Y-%m-%d"),
+        "chunks": chunks,
+        "vectors": _embed_chunks(content, chunks),
+        "positions": term_positions(content),
+    }
+
+
+def _map_files(paths: list, workers: int, progress=None):
+    """Yield _index_file() results, sharded over a process pool when worthwhile."""
+    total = len(paths)
+    if workers > 1 and total >= PARALLEL_MIN_FILES:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunksize = max(1, total // (workers * 4))
+            for done, result in enumerate(pool.map(_index_file, paths, chunksize=chunksize), 1):
+                if progress:
+                    progress(done, total, result["path"] if result else None)
+                yield result
+    else:
+        for done, file_path in enumerate(paths, 1):
+            result = _index_file(file_path)
+            if progress:
+                progress(done, total, file_path)
+            yield result
+
+
+# ═══════════════════════════════════════════════════════════════
+# ORACLE INDEX
+# ═══════════════════════════════════════════════════════════════
+
+class OracleIndex:
+    """
+    Persistent document store for the Oracle.
+
+    Documents are keyed by a stable string ("file:<name>", "crm_deals:<id>", ...)
+    and carry a dense integer `id` assigned on first insert, plus the passage
+    offsets produced by the chunker. `generation` is bumped whenever a refresh
+    changes anything, so downstream caches can invalidate themselves.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or get_index_path()
+        self.docs = {}              # key -> document dict
+        self.file_state = {}        # path -> {"mtime", "size", "hash"}
+        self.row_state = {}         # table -> {row id (str) -> updated_at}
+        self.next_id = 0
+        self.generation = 0
+        self.vector_cls = VECTOR_STORES.get(VECTOR_BACKEND, VectorStore)
+        self.vectors = self.vector_cls()
+        self._clusters = ClusterEngine()    # None after load() until first use
+        self._facets = FacetIndex()         # None after load() until first use
+        self.postings = PostingsIndex()
+        self.segment = None         # IndexSegment backing docs/postings after load/save
+        self._keys_by_id = {}       # doc id -> key
+        self._lock = threading.RLock()
+
+    @property
+    def vectors_path(self) -> str:
+        return os.path.splitext(self.path)[0] + ".vectors.npz"
+
+    @property
+    def segment_path(self) -> str:
+        return os.path.splitext(self.path)[0] + ".segment"
+
+    @property
+    def facets(self) -> FacetIndex:
+        """Facet bitmaps, built from the document metadata on first use after a load."""
+        with self._lock:
+            if self._facets is None:
+                facets = FacetIndex()
+                for key in self.docs:
+                    facets.add(self.docs[key])
+                self._facets = facets
+            return self._facets
+
+    @property
+    def clusters(self) -> ClusterEngine:
+        """Deal/contact company index, built from the CRM documents on first use after a load."""
+        with self._lock:
+            if self._clusters is None:
+                rows = {table: [self.docs[k]["metadata"] for k in self.docs if k.startswith(table + ":")]
+                        for table in DB_SOURCES}
+                clusters = ClusterEngine()
+                clusters.build(rows["crm_deals"], rows["crm_contacts"])
+                self._clusters = clusters
+            return self._clusters
+
+    # --- Persistence ---
+
+    def load(self) -> bool:
+        """Load persisted state. Returns False if there is nothing usable on disk."""
+        if not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Oracle index unreadable, rebuilding: {e}")
+            return False
+        if state.get("version") != INDEX_VERSION:
+            return False
+
+        try:
+            segment = IndexSegment(self.segment_path)
+        except (OSError, ValueError) as e:
+            print(f"Oracle index segment unreadable, rebuilding: {e}")
+            return False
+        if segment.generation != state["generation"]:
+            return False
+
+        with self._lock:
+            self.file_state = state["file_state"]
+            self.row_state = state["row_state"]
+            self.next_id = state["next_id"]
+            self.generation = state["generation"]
+            self._attach(segment)
+
+            try:
+                self.vectors = self.vector_cls.load(self.vectors_path)
+            except (OSError, ValueError, KeyError):
+                self.vectors = self.vector_cls()
+            if set(self.vectors.doc_rows) != set(self.docs):
+                self._reembed_all()
+
+            self._clusters = None
+            self._facets = None
+        return True
+
+    def _attach(self, segment: IndexSegment):
+        """
+        Point docs and postings at a segment. Content, postings and document
+        metadata stay in the mapped file until they are read.
+        """
+        self.docs = SegmentDocuments(segment)
+        self._keys_by_id = self.docs.ids()
+        self.postings = PostingsIndex(base=segment)
+        self.segment = segment
+
+    def save(self):
+        """
+        Atomically write the index next to the database: documents and postings
+        to the binary segment, bookkeeping to the JSON state file.
+        """
+        with self._lock:
+            docs = sorted(self.docs.values(), key=lambda d: d["id"])
+            write_segment(self.segment_path, docs, self.postings, self.generation)
+            state = {
+                "version": INDEX_VERSION,
+                "file_state": self.file_state,
+                "row_state": self.row_state,
+                "next_id": self.next_id,
+                "generation": self.generation,
+            }
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.path)
+
+            tmp_vectors = self.vectors_path + ".tmp.npz"
+            self.vectors.save(tmp_vectors)
+            # Sidecars are written next to the temp file: move them with the labels
+            os.replace(tmp_vectors + MATRIX_SUFFIX, self.vectors_path + MATRIX_SUFFIX)
+            if os.path.exists(tmp_vectors + IVF_SUFFIX):
+                os.replace(tmp_vectors + IVF_SUFFIX, self.vectors_path + IVF_SUFFIX)
+            elif os.path.exists(self.vectors_path + IVF_SUFFIX):
+                os.remove(self.vectors_path + IVF_SUFFIX)
+            os.replace(tmp_vectors, self.vectors_path)
+
+            # Swap in-memory documents and vectors for views of the files just written
+            self._attach(IndexSegment(self.segment_path))
+            try:
+                self.vectors = self.vector_cls.load(self.vectors_path, self.vectors.dim)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Oracle vectors could not be reopened, keeping them in memory: {e}")
+
+    # --- Mutation ---
+
+    def _upsert(self, key: str, doc: dict, vectors: np.ndarray = None, positions: dict = None) -> bool:
+        """
+        Insert or replace a document, keeping its integer id. Returns True if content changed.
+
+        `doc['chunks']`, `vectors` and `positions` may be precomputed (by a pool
+        worker); anything missing is computed here.
+        """
+        existing = self.docs.get(key)
+        if existing is not None:
+            if existing["content"] == doc["content"] and existing.get("metadata") == doc.get("metadata"):
+                return False
+            doc["id"] = existing["id"]
+        else:
+            doc["id"] = self.next_id
+            self.next_id += 1
+        doc["key"] = key
+        if "chunks" not in doc:
+            doc["chunks"] = _chunks_for(doc["type"], doc["content"])
+        self.docs[key] = doc
+        self._keys_by_id[doc["id"]] = key
+        self._embed(doc, vectors)
+        self.facets.add(doc)
+        self.postings.add(doc["id"], positions if positions is not None else term_positions(doc["content"]))
+        return True
+
+    def _remove(self, key: str) -> bool:
+        self.vectors.remove(key)
+        doc = self.docs.pop(key, None)
+        if doc is None:
+            return False
+        self._keys_by_id.pop(doc["id"], None)
+        self.facets.remove(doc["id"])
+        self.postings.remove(doc["id"])
+        return True
+
+    def _embed(self, doc: dict, vectors: np.ndarray = None):
+        if vectors is None or vectors.shape[1] != self.vectors.dim:
+            vectors = _embed_chunks(doc["content"], doc["chunks"], self.vectors.dim)
+        if vectors is not None:
+            self.vectors.add(doc["key"], vectors)
+        else:
+            self.vectors.remove(doc["key"])
+
+    def _reembed_all(self):
+        self.vectors = self.vector_cls(self.vectors.dim)
+        for doc in self.docs.values():
+            self._embed(doc)
+
+    # --- Refresh ---
+
+    def refresh(self, workers: int = None, progress=None) -> dict:
+        """
+        Bring the index up to date with assets/ and the CRM tables.
+
+        Unchanged files cost one stat() call; unchanged rows cost one row of
+        a narrow (id, updated_at) scan. Only changed records are re-read.
+
+        Args:
+            workers: Processes for changed asset files (default INDEX_WORKERS)
+            progress: Optional callback(done, total, path) per processed file
+
+        Returns:
+            dict: Keys of documents that were 'added', 'updated' and 'removed'
+        """
+        delta = {"added": [], "updated": [], "removed": []}
+        with self._lock:
+            self._refresh_files(delta, workers or INDEX_WORKERS, progress)
+            for table in DB_SOURCES:
+                self._refresh_table(table, delta)
+
+            if any(delta.values()):
+                self.generation += 1
+                self.save()
+        return delta
+
+    def _record(self, delta: dict, key: str, existed: bool, changed: bool):
+        if changed:
+            delta["updated" if existed else "added"].append(key)
+
+    def _refresh_files(self, delta: dict, workers: int = 1, progress=None):
+        seen = set()
+        changed_paths = []
+        for file_path in list_asset_files():
+            seen.add(file_path)
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+
+            known = self.file_state.get(file_path)
+            if known and known["mtime"] == stat.st_mtime_ns and known["size"] == stat.st_size:
+                continue
+            changed_paths.append(file_path)
+
+        for result in _map_files(changed_paths, workers, progress):
+            if result is None:
+                continue
+            file_path = result["path"]
+            known = self.file_state.get(file_path)
+            self.file_state[file_path] = {"mtime": result["mtime"], "size": result["size"], "hash": result["hash"]}
+            if known and known["hash"] == result["hash"]:
+                continue  # touched but not modified
+
+            key = f"file:{os.path.basename(file_path)}"
+            existed = key in self.docs
+            changed = self._upsert(key, {
+                "source": os.path.basename(file_path),
+                "content": result["content"],
+                "type": "Doctum",
+                "modified": result["modified"],
+                "chunks": result["chunks"],
+            }, vectors=result["vectors"], positions=result["positions"])
+            self._record(delta, key, existed, changed)
+
+        for file_path in [p for p in self.file_state if p not in seen]:
+            del self.file_state[file_path]
+            key = f"file:{os.path.basename(file_path)}"
+            if self._remove(key):
+                delta["removed"].append(key)
+
+    def _refresh_table(self, table: str, delta: dict):
+        doc_type, source_of, text_of = DB_SOURCES[table]
+        known = self.row_state.setdefault(table, {})
+
+        conn = get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT id, updated_at FROM {table}")
+            current = {str(row["id"]): row["updated_at"] for row in cursor.fetchall()}
+
+            # updated_at has one-second resolution: rows stamped in the same second as
+            # the newest row we've seen may have changed again, so re-check those too.
+            watermark = max(known.values(), default=None) if known else None
+            dirty = [
+                row_id for row_id, stamp in current.items()
+                if known.get(row_id) != stamp or (watermark is not None and stamp == watermark)
+            ]
+
+            rows = []
+            for start in range(0, len(dirty), 500):
+                batch = dirty[start:start + 500]
+                placeholders = ", ".join("?" for _ in batch)
+                cursor.execute(f"SELECT * FROM {table} WHERE id IN ({placeholders})", [int(i) for i in batch])
+                rows.extend(dict(row) for row in cursor.fetchall())
+        finally:
+            conn.close()
+
+        # Looked up per call: self.clusters is only built when a row actually changes
+        upsert_cluster, remove_cluster = {
+            "crm_deals": ("upsert_deal", "remove_deal"),
+            "crm_contacts": ("upsert_contact", "remove_contact"),
+        }[table]
+
+        for row in rows:
+            key = f"{table}:{row['id']}"
+            existed = key in self.docs
+            changed = self._upsert(key, {
+                "source": source_of(row),
+                "content": text_of(row),
+                "type": doc_type,
+                "metadata": row,
+            })
+            if changed:
+                # An unchanged row (re-checked at the watermark) leaves the cluster index alone
+                getattr(self.clusters, upsert_cluster)(row)
+            self._record(delta, key, existed, changed)
+
+        for row_id in [r for r in known if r not in current]:
+            getattr(self.clusters, remove_cluster)(int(row_id))
+            key = f"{table}:{row_id}"
+            if self._remove(key):
+                delta["removed"].append(key)
+
+        self.row_state[table] = current
+
+    # --- Access ---
+
+    def documents(self) -> list:
+        """Documents in the flat list format consumed by search_nexus()."""
+        with self._lock:
+            return list(self.docs.values())
+
+    def documents_for(self, doc_ids) -> list:
+        """Documents for an iterable of integer ids (e.g. a facet Bitmap)."""
+        with self._lock:
+            return [self.docs[self._keys_by_id[i]] for i in doc_ids if i in self._keys_by_id]
+
+
+# ═══════════════════════════════════════════════════════════════
+# SHARED INSTANCE
+# ═══════════════════════════════════════════════════════════════
+
+_INDEX = None
+_INDEX_LOCK = threading.Lock()
+
+
+def get_oracle_index(refresh: bool = True) -> OracleIndex:
+    """
+    Process-wide Oracle index. Loaded from disk on first use, then refreshed
+    incrementally on each call.
+    """
+    global _INDEX
+    with _INDEX_LOCK:
+        if _INDEX is None:
+            _INDEX = OracleIndex()
+            _INDEX.load()
+    if refresh:
+        _INDEX.refresh()
+    return _INDEX
+
+
+def _print_progress(done: int, total: int, path: str):
+    if done == total or done % max(1, total // 20) == 0:
+        sys.stderr.write(f"\r[oracle-index] {done}/{total} files")
+        if done == total:
+            sys.stderr.write("\n")
+        sys.stderr.flush()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build or refresh the Oracle index offline")
+    parser.add_argument("--workers", type=int, default=INDEX_WORKERS, help="Worker processes for asset files")
+    parser.add_argument("--rebuild", action="store_true", help="Ignore the existing index and build from scratch")
+    parser.add_argument("--path", help="Index file (default: next to the database)")
+    args = parser.parse_args()
+
+    index = OracleIndex(args.path)
+    if not args.rebuild:
+        index.load()
+    t0 = time.perf_counter()
+    delta = index.refresh(workers=args.workers, progress=_print_progress)
+    print(json.dumps({
+        "path": index.path,
+        "documents": len(index.docs),
+        "terms": len(index.postings),
+        "added": len(delta["added"]),
+        "updated": len(delta["updated"]),
+        "removed": len(delta["removed"]),
+        "workers": args.workers,
+        "seconds": round(time.perf_counter() - t0, 2),
+    }, indent=2))
@@ -5,127 +5,252 @@ Uses RAG (Retrieval Augmented Generation) to answer questions based on your Resu
 """
 
 import streamlit as st
-import os
-import glob
 from logic.generator import generate_plain_text as run_groq_inference
 
 
-from logic.database import get_all_deals, get_all_contacts
+from logic.oracle_index import get_oracle_index
+from logic.chunker import merge_adjacent
+from logic.oracle_cache import QueryCache, build_prefix_index
+from logic.bitmap import Bitmap
+from logic.context_packer import context_budget, pack_context, summarize_dropped
+from logic.embeddings import tokenize
+from logic.snippets import build_snippet, highlight_html, match_offsets
+import bisect
+import threading
+
+# Model that answers Oracle queries; its context window sets the retrieval budget
+ORACLE_MODEL = "llama-3.3-70b-versatile"
+
+def _chunks_of(doc):
+    return doc.get("chunks") or [{"start": 0, "end": len(doc["content"]), "heading": None}]
+
+def _chunk_term_counts(chunks, offsets, term):
+    """Occurrences of `term` per chunk, bisecting its sorted postings offsets into each chunk's range."""
+    counts = []
+    for chunk in chunks:
+        lo = bisect.bisect_left(offsets, chunk["start"])
+        counts.append(bisect.bisect_left(offsets, chunk["end"] - len(term) + 1, lo) - lo)
+    return counts
+
+class SearchResult(dict):
+    """
+    Result dict whose 'passage', 'full_content' and plain 'preview' are read from the document on access.
+
+    Scoring never needs the text, so only passages someone looks at (snippets,
+    packed context, the source panel) are decoded from the index segment.
+    """
+
+    __slots__ = ("_doc",)
+    LAZY = ("passage", "full_content", "preview")
+
+    def __init__(self, fields: dict, doc):
+        super().__init__(fields)
+        self._doc = doc
+
+    def __missing__(self, key):
+        if key == "passage":
+            return self._doc["content"][self["start"]:self["end"]]
+        if key == "full_content":
+            return self._doc["content"]
+        if key == "preview":
+            passage = self["passage"]
+            return passage[:200] + "..." if len(passage) > 200 else passage
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self.LAZY or dict.__contains__(self, key)
+
+    def get(self, key, default=None):
+        if key in self.LAZY and not dict.__contains__(self, key):
+            return self[key]
+        return dict.get(self, key, default)
 
 def get_search_index():
-    """Build a simple in-memory index of all markdown files AND database records."""
-    index = []
-    
-    # 1. MARKDOWN FILES (Assets)
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    assets_dir = os.path.join(base_dir, "assets")
-    search_files = glob.glob(os.path.join(assets_dir, "*.md"))
-    
-    # Add manual files
-    readme_path = os.path.join(base_dir, "GITHUB_PROFILE_README.md")
-    if os.path.exists(readme_path): search_files.append(readme_path)
-    
-    for file_path in search_files:
-        try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                content = f.read()
-                filename = os.path.basename(file_path)
-                index.append({
-                    "source": filename,
-                    "content": content,
-                    "type": "Doctum"
-                })
-        except Exception as e:
-            print(f"Error indexing {file_path}: {e}")
-            
-    # 2. CRM DEALS (Database)
-    deals = get_all_deals()
-    for deal in deals:
-        # Convert record to searchable text blob
-        content = f"Company: {deal['company']}\nRole: {deal['role']}\nStage: {deal['stage']}\nSignal: {deal['signal']}\nNotes: {deal.get('notes', '')}"
-        index.append({
-            "source": f"Deal - {deal['company']}",
-            "content": content,
-            "type": "Deal",
-            "metadata": deal
-        })
-        
-    # 3. CRM CONTACTS (Database)
-    contacts = get_all_contacts()
-    for contact in contacts:
-        content = f"Name: {contact['name']}\nCompany: {contact.get('company', '')}\nRole: {contact.get('role', '')}\nType: {contact.get('contact_type', '')}\nNotes: {contact.get('notes', '')}"
-        index.append({
-            "source": f"Contact - {contact['name']}",
-            "content": content,
-            "type": "Contact",
-            "metadata": contact
-        })
-            
-    return index
+    """
+    Return all indexed documents (markdown assets AND database records).
+    Backed by the persistent OracleIndex, so only changed files/rows are re-read.
+    """
+    return get_oracle_index().documents()
 
-def search_nexus(query, index):
+# Hybrid retrieval: weight of vector similarity vs normalised keyword score
+HYBRID_ALPHA = 0.5
+VECTOR_CANDIDATES = 50
+VECTOR_MIN_SIMILARITY = 0.05
+# Only the top results get a query-aware snippet; the rest keep the plain preview
+SNIPPET_RESULTS = 20
+
+def search_nexus(query, index, vectors=None, alpha=HYBRID_ALPHA, clusters=None, vector_keys=None, postings=None):
     """
-    Perform a semantic search (simulated via keyword density for now) 
-    and return relevant chunks.
+    Perform a hybrid search and return relevant passages.
+
+    Keyword density is scored per chunk. With `postings` (a PostingsIndex)
+    term counts come from each term's document offsets, bisected into the
+    chunk ranges, so no document text is read while scoring; without it the
+    chunk text is scanned. When a VectorStore is supplied, the
+    top chunks by local-embedding cosine similarity are fused in:
+    score = 100 * ((1 - alpha) * keyword / max_keyword + alpha * cosine).
+    Without vectors the raw keyword score is used. Hits from neighbouring
+    chunks of the same document are merged into a single passage.
+    With a ClusterEngine, "cluster" queries boost Deals whose company has contacts.
+    `vector_keys` restricts vector scoring to those documents (facet candidates).
+    `preview` is the densest window of query terms in the passage, located via
+    `postings` when given; `highlights` are its match spans. Results are
+    SearchResult dicts: 'passage' and 'full_content' are only read when used.
     """
-    results = []
+    docs_by_key = {}
+    chunk_scores = {}       # (doc key, chunk no) -> [keyword score, cosine]
     query_terms = query.lower().split()
-    
+    cluster_query = "cluster" in query.lower()
+    # term -> {doc id: offsets}; repeated query terms weigh once per repeat, as in the text scan
+    term_docs = [(term, postings.docs_for(term)) for term in tokenize(query)] if postings is not None else None
+
     for doc in index:
-        score = 0
-        content_lower = doc["content"].lower()
-        
-        # Simple frequency scoring
-        for term in query_terms:
-            count = content_lower.count(term)
-            score += count * 10
-            
-            # Boost for exact matches in source title (Company name match)
-            if term in doc['source'].lower():
-                score += 50
-        
+        key = doc.get("key", doc["source"])
+        docs_by_key[key] = doc
+        source_lower = doc['source'].lower()
+        # Boost for exact matches in source title (Company name match)
+        title_boost = sum(50 for term in query_terms if term in source_lower)
+
         # Semantic Boosts for Special Queries
-        if "cluster" in query.lower() and doc.get("type") == "Deal":
+        if cluster_query and doc.get("type") == "Deal":
              # Boost Deals that have linked contacts
-             if "Linked Contacts" in doc.get("metadata", {}).get("notes", ""): 
-                 score += 100
-             # Or if we can infer it (requires more complex join logic not present in single doc)
-             
-        if score > 0:
-            results.append({
-                "source": doc["source"],
-                "score": score,
-                "preview": doc["content"][:200] + "..." if len(doc["content"]) > 200 else doc["content"],
-                "full_content": doc["content"],
-                "type": doc.get("type", "Doc")
-            })
-            
+             metadata = doc.get("metadata", {})
+             if clusters is not None and clusters.has_contacts(metadata.get("company")):
+                 title_boost += 100
+             elif "Linked Contacts" in (metadata.get("notes") or ""):
+                 title_boost += 100
+
+        chunks = _chunks_of(doc)
+        doc_id = doc.get("id")
+        if term_docs is not None and doc_id is not None:
+            # Simple frequency scoring, counted from the postings
+            scores = [0] * len(chunks)
+            for term, docs in term_docs:
+                offsets = docs.get(doc_id)
+                if offsets:
+                    for chunk_no, count in enumerate(_chunk_term_counts(chunks, offsets, term)):
+                        scores[chunk_no] += count * 10
+        else:
+            content = doc["content"]
+            scores = [sum(content[c["start"]:c["end"]].lower().count(term) * 10 for term in query_terms)
+                      for c in chunks]
+        for chunk_no, score in enumerate(scores):
+            # A title match alone only surfaces single-passage records, not every chunk of a file
+            if score == 0 and (title_boost == 0 or len(chunks) > 1):
+                continue
+            chunk_scores[(key, chunk_no)] = [score + title_boost, 0.0]
+
+    if vectors is not None and alpha > 0:
+        for key, chunk_no, similarity in vectors.search(vectors.embed_query(query), VECTOR_CANDIDATES, keys=vector_keys):
+            if key in docs_by_key and similarity >= VECTOR_MIN_SIMILARITY:
+                chunk_scores.setdefault((key, chunk_no), [0, 0.0])[1] = similarity
+
+    max_keyword = max((kw for kw, _ in chunk_scores.values()), default=0) or 1
+    hits = []
+    for (key, chunk_no), (keyword, similarity) in chunk_scores.items():
+        doc = docs_by_key[key]
+        chunks = _chunks_of(doc)
+        if chunk_no >= len(chunks):
+            continue
+        chunk = chunks[chunk_no]
+        if vectors is not None:
+            score = round(100 * ((1 - alpha) * keyword / max_keyword + alpha * similarity))
+        else:
+            score = keyword
+        hits.append({
+            "key": key,
+            "doc": doc,
+            "start": chunk["start"],
+            "end": chunk["end"],
+            "heading": chunk.get("heading"),
+            "score": score,
+        })
+
+    results = []
+    for hit in merge_adjacent(hits):
+        doc = hit["doc"]
+        results.append(SearchResult({
+            "source": doc["source"],
+            "score": hit["score"],
+            "highlights": [],
+            "heading": hit["heading"],
+            "start": hit["start"],
+            "end": hit["end"],
+            "type": doc.get("type", "Doc"),
+            "doc_id": doc.get("id"),
+        }, doc))
+
     # Sort by score
     results.sort(key=lambda x: x["score"], reverse=True)
+
+    # Query-aware previews for the results anyone will actually see; only these read their text
+    snippet_terms = tokenize(query)
+    for result in results[:SNIPPET_RESULTS]:
+        result["passage"] = passage = result["passage"]
+        matches = None
+        if postings is not None and result["doc_id"] is not None:
+            matches = match_offsets(postings, result["doc_id"], snippet_terms, result["start"], result["end"])
+        result["preview"], result["highlights"] = build_snippet(passage, result["start"], matches, snippet_terms)
     return results
 
+def get_cluster_engine():
+    """Deal/Contact company index, kept current by the Oracle index refresh."""
+    return get_oracle_index().clusters
+
 def get_high_value_clusters():
-    """Returns a list of companies that have BOTH a Deal and at least one Contact."""
-    deals = get_all_deals()
-    contacts = get_all_contacts()
-    
-    clusters = {}
-    for d in deals:
-        c_name = d['company']
-        clusters[c_name] = {"deal": d, "contacts": []}
-        
-    for c in contacts:
-        # Check against existing deal keys (case insensitive)
-        c_company = c.get('company')
-        if not c_company: continue
-        
-        # Find matching key
-        match = next((k for k in clusters.keys() if k.lower() == c_company.lower()), None)
-        if match:
-            clusters[match]["contacts"].append(c)
-            
-    # Filter only those with contacts
-    return {k:v for k,v in clusters.items() if v["contacts"]}
+    """Returns companies that have BOTH a Deal and at least one Contact (every deal per company)."""
+    return get_cluster_engine().clusters()
+
+# Result cache and autocomplete dictionary, both invalidated by index generation
+_RESULT_CACHE = QueryCache(maxsize=256)
+_SUGGESTER = {"generation": None, "index": None}
+_SUGGESTER_LOCK = threading.Lock()
+
+def _filters_key(filters):
+    if not filters:
+        return ""
+    return "|".join(f"{k}={','.join(sorted(map(str, v))) if isinstance(v, (list, tuple)) else v}"
+                    for k, v in sorted(filters.items()) if v)
+
+def cached_search(query, oracle, filters=None):
+    """
+    Faceted search_nexus() behind an LRU keyed by (normalised query + filters, index generation).
+
+    Filters are resolved to a candidate bitmap first, so only matching
+    documents are scored.
+
+    Returns:
+        tuple: (results, facet counts over the result set)
+    """
+    cache_key = f"{query}\x00{_filters_key(filters)}"
+    cached = _RESULT_CACHE.get(cache_key, oracle.generation)
+    if cached is not None:
+        return cached
+
+    candidates = oracle.facets.candidates(filters)
+    if candidates is None:
+        docs, vector_keys = oracle.documents(), None
+    else:
+        docs = oracle.documents_for(candidates)
+        vector_keys = [d["key"] for d in docs]
+    results = search_nexus(query, docs, vectors=oracle.vectors, clusters=oracle.clusters,
+                           vector_keys=vector_keys, postings=oracle.postings)
+    facet_counts = oracle.facets.counts(Bitmap(r["doc_id"] for r in results if r["doc_id"] is not None))
+
+    _RESULT_CACHE.put(cache_key, oracle.generation, (results, facet_counts))
+    return results, facet_counts
+
+def get_suggestions(query, oracle, limit=6):
+    """Type-ahead completions for a partial query (terms, companies, contacts, asset titles)."""
+    with _SUGGESTER_LOCK:
+        if _SUGGESTER["generation"] != oracle.generation:
+            _SUGGESTER["index"] = build_prefix_index(oracle.documents())
+            _SUGGESTER["generation"] = oracle.generation
+        prefix_index = _SUGGESTER["index"]
+    return prefix_index.suggest(query, limit)
+
+def _use_suggestion(suggestion):
+    st.session_state["oracle_query"] = suggestion
 
 def render_oracle_search():
     """Render the main search interface."""
@@ -137,21 +262,52 @@ def render_oracle_search():
     """, unsafe_allow_html=True)
     
     # Search Bar
-    query = st.text_input("Ask the Oracle...", placeholder="e.g. 'What was my churn reduction at Sense?' or 'List my top python projects'")
+    query = st.text_input("Ask the Oracle...", key="oracle_query", placeholder="e.g. 'What was my churn reduction at Sense?' or 'List my top python projects'")
+    oracle = get_oracle_index()
+    
+    # Type-ahead suggestions
+    suggestions = get_suggestions(query, oracle) if query else []
+    if suggestions:
+        suggestion_cols = st.columns(len(suggestions))
+        for col, suggestion in zip(suggestion_cols, suggestions):
+            col.button(suggestion, key=f"oracle_suggest_{suggestion}", on_click=_use_suggestion, args=(suggestion,))
+    
+    # Facet Filters (resolved to a candidate bitmap before scoring)
+    with st.expander("🎛️ Filters", expanded=False):
+        f1, f2, f3 = st.columns(3)
+        filters = {
+            "type": f1.multiselect("Type", oracle.facets.values("type"), key="oracle_f_type"),
+            "stage": f2.multiselect("Deal Stage", oracle.facets.values("stage"), key="oracle_f_stage"),
+            "signal": f3.multiselect("Signal", oracle.facets.values("signal"), key="oracle_f_signal"),
+        }
+        f4, f5, f6 = st.columns(3)
+        filters["contact_type"] = f4.multiselect("Contact Type", oracle.facets.values("contact_type"), key="oracle_f_ctype")
+        filters["company"] = f5.multiselect("Company", oracle.facets.values("company"), key="oracle_f_company")
+        date_range = f6.date_input("Date Range", value=(), key="oracle_f_dates")
+        if len(date_range) == 2:
+            filters["date_from"], filters["date_to"] = (d.isoformat() for d in date_range)
+        filters = {k: v for k, v in filters.items() if v}
     
     if query:
         with st.spinner("Oracle is thinking..."):
             # 1. Retrieve Context
-            index = get_search_index()
-            results = search_nexus(query, index)
+            results, facet_counts = cached_search(query, oracle, filters)
+            
+            if facet_counts.get("type"):
+                st.caption(" · ".join(f"{value}: {count}" for value, count in facet_counts["type"].items()))
             
             if not results:
                 st.warning("No direct matches found in the archives.")
                 return
 
-            # 2. Build Context for LLM
-            top_docs = results[:3]
-            context_text = "\n\n---\n\n".join([f"Source: {doc['source']}\nContent: {doc['full_content']}" for doc in top_docs])
+            # 2. Build Context for LLM (deduplicated passages packed to the model's token budget)
+            packed = pack_context(results, context_budget(ORACLE_MODEL), model=ORACLE_MODEL)
+            context_text = packed["text"]
+            top_docs = packed["passages"][:3] or results[:3]
+            context_note = f"Context: {packed['tokens']}/{packed['budget']} tokens from {len(packed['passages'])} passages"
+            if packed["dropped"]:
+                context_note += f" · dropped {summarize_dropped(packed['dropped'])}"
+            st.caption(context_note)
             
             # 3. Generate Answer
             system_prompt = f"""
@@ -172,7 +328,8 @@ def render_oracle_search():
             TONE: Executive, Cybernetic, Efficient.
             """
             
-            response = run_groq_inference(system_prompt, "Answer brief and accurate.")
+            # Someone is waiting on the answer: hedge a slow first token with the next provider
+            response = run_groq_inference(system_prompt, ORACLE_MODEL, hedge=True)
             
             # 4. Display Result
             st.markdown(f"""
@@ -191,7 +348,7 @@ def render_oracle_search():
                      st.markdown("### 🧬 DETECTED CLUSTERS (Deal + Contact Overlap)")
                      for comp, data in clusters.items():
                          with st.expander(f"🔵 {comp} ({len(data['contacts'])} Contacts)", expanded=True):
-                             st.caption(f"🎯 Role: {data['deal']['role']}")
+                             st.caption(f"🎯 Role: {', '.join(d['role'] or '?' for d in data['deals'])}")
                              for c in data['contacts']:
                                  st.markdown(f"- **{c['name']}**: {c['role']}")
 
@@ -204,8 +361,9 @@ def render_oracle_search():
                     <div style="background: #111; border: 1px solid #333; border-radius: 8px; padding: 15px;">
                         <div style="color: #FFD700; font-size: 0.8rem; font-weight: bold;">{res['source']}</div>
                         <div style="color: #666; font-size: 0.7rem; margin-top: 5px;">Relevance: {res['score']}</div>
+                        <div style="color: #aaa; font-size: 0.75rem; margin-top: 8px;">{highlight_html(res['preview'], res.get('highlights', []))}</div>
                     </div>
                     """, unsafe_allow_html=True)
                     with st.expander("View Content"):
-                        st.text(res['full_content'])
+                        st.text(res['passage'])
 
@@ -0,0 +1,119 @@
+"""
+BASIN::NEXUS // ORACLE POSTINGS
+Positional inverted index: term -> doc id -> character offsets.
+
+Offsets point at the start of each token in the original document text, so
+callers can locate matches (snippets, highlighting) without rescanning it.
+Workers build partial postings for a shard of documents with
+term_positions(); the parent merges them with PostingsIndex.add(). A
+PostingsIndex can sit on top of a memory-mapped IndexSegment, so only
+changes since the segment was written are held in memory.
+"""
+
+import re
+import threading
+
+from logic.index_segment import encode_postings
+
+
+# Same token definition as logic.embeddings.tokenize, matched on the original
+# text so offsets stay valid after lowercasing
+TOKEN_RE = re.compile(r"[A-Za-z0-9]+")
+
+
+def term_positions(text: str) -> dict:
+    """
+    Positional postings for one document.
+
+    Returns:
+        dict: lowercase term -> sorted list of character offsets
+    """
+    positions = {}
+    for match in TOKEN_RE.finditer(text):
+        positions.setdefault(match.group().lower(), []).append(match.start())
+    return positions
+
+
+class PostingsIndex:
+    """
+    Positional postings with per-document add/remove.
+
+    Optionally layered over a read-only IndexSegment: the segment answers for
+    documents it holds, while documents added or removed since it was written
+    live in (or are masked by) the in-memory overlay.
+    """
+
+    def __init__(self, base=None):
+        self.base = base            # IndexSegment or None
+        self.postings = {}          # overlay: term -> {doc id: [offsets]}
+        self.doc_terms = {}         # overlay: doc id -> [terms] (for removal)
+        self.masked = set()         # base doc ids that were removed or replaced
+        self.dirty = set()          # base terms whose postings lost a masked doc
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.terms())
+
+    def _in_base(self, doc_id: int) -> bool:
+        return self.base is not None and doc_id not in self.masked and self.base.position_of(doc_id) >= 0
+
+    def add(self, doc_id: int, positions: dict):
+        """Add (or replace) one document's postings, as produced by term_positions()."""
+        with self._lock:
+            self.remove(doc_id)
+            for term, offsets in positions.items():
+                self.postings.setdefault(term, {})[doc_id] = offsets
+            self.doc_terms[doc_id] = list(positions)
+
+    def remove(self, doc_id: int):
+        with self._lock:
+            if self._in_base(doc_id):
+                self.masked.add(doc_id)
+                self.dirty.update(term_positions(self.base.content(self.base.position_of(doc_id))))
+            for term in self.doc_terms.pop(doc_id, ()):
+                docs = self.postings.get(term)
+                if docs is not None:
+                    docs.pop(doc_id, None)
+                    if not docs:
+                        del self.postings[term]
+
+    def docs_for(self, term: str) -> dict:
+        """doc id -> offsets for a term (empty if unknown)."""
+        term = term.lower()
+        overlay = self.postings.get(term, {})
+        if self.base is None:
+            return overlay
+        docs = {d: o for d, o in self.base.postings(term).items() if d not in self.masked}
+        docs.update(overlay)
+        return docs
+
+    def positions(self, term: str, doc_id: int) -> list:
+        term = term.lower()
+        if doc_id in self.doc_terms or self.base is None or doc_id in self.masked:
+            return self.postings.get(term, {}).get(doc_id, [])
+        return self.base.postings(term).get(doc_id, [])
+
+    def doc_frequency(self, term: str) -> int:
+        return len(self.docs_for(term))
+
+    def terms(self) -> list:
+        """All terms with at least one live document, sorted."""
+        with self._lock:
+            terms = set(self.postings)
+            if self.base is not None:
+                terms.update(self.base.terms())
+                terms.difference_update(t for t in self.dirty if not self.docs_for(t))
+            return sorted(terms)
+
+    def encoded(self, term: str) -> bytes:
+        """
+        Varint-encoded postings for a term, as stored in a segment.
+
+        Terms untouched since the base segment was written are copied as raw
+        bytes, so re-saving a large index only re-encodes what changed.
+        """
+        if self.base is not None and term not in self.postings and term not in self.dirty:
+            raw = self.base.raw_postings(term)
+            if raw is not None:
+                return raw
+        return encode_postings(self.docs_for(term))
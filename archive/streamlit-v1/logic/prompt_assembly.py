@@ -0,0 +1,186 @@
+"""
+BASIN::NEXUS // PROMPT ASSEMBLY
+Stable-prefix prompt layout and prompt-cache telemetry.
+
+Providers cache the longest previously seen prompt prefix (OpenAI and Groq
+automatically, Anthropic and Gemini with their own cache controls), but
+only if the prefix is byte-identical. Prompts are therefore laid out from
+most to least stable:
+
+1. system prefix     - persona and rules, identical for every call
+2. context blocks    - resume, master profile, JD: stable within a session
+3. volatile question - the per-request instruction
+
+Rendered blocks are memoized by content hash so the same resume is not
+re-formatted on every rerun. Cumulative block-prefix hashes are tracked
+locally to measure how much of each prompt repeats an earlier one; where
+providers report cached prompt tokens, those are recorded as well.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+# ═══════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ═══════════════════════════════════════════════════════════════
+
+DIVIDER = "═" * 63
+
+RENDER_CACHE_SIZE = 512
+PREFIX_HISTORY_SIZE = 2048
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+# ═══════════════════════════════════════════════════════════════
+# BLOCKS
+# ═══════════════════════════════════════════════════════════════
+
+_RENDERED = OrderedDict()   # (title, body hash) -> rendered text
+_PREFIXES = OrderedDict()   # cumulative block-prefix hash -> times seen
+_STATS = {"render_hits": 0, "render_misses": 0, "prompts": 0, "prompt_chars": 0, "reused_prefix_chars": 0}
+_PROVIDER_STATS = {}
+_LOCK = threading.Lock()
+
+
+def render_block(title: str, body: str) -> str:
+    """
+    A titled section in the house format (divider, title, divider, body).
+
+    Renderings are memoized by (title, body hash), so identical blocks are
+    byte-identical across calls.
+    """
+    key = (title, content_hash(body))
+    with _LOCK:
+        rendered = _RENDERED.get(key)
+        if rendered is not None:
+            _RENDERED.move_to_end(key)
+            _STATS["render_hits"] += 1
+            return rendered
+    rendered = f"{DIVIDER}\n{title}\n{DIVIDER}\n\n{body.strip()}\n"
+    with _LOCK:
+        _STATS["render_misses"] += 1
+        _RENDERED[key] = rendered
+        while len(_RENDERED) > RENDER_CACHE_SIZE:
+            _RENDERED.popitem(last=False)
+    return rendered
+
+
+def _render_context(context_blocks: list) -> list:
+    """Rendered (title, body) pairs in the given order; empty bodies are skipped."""
+    return [render_block(title, body) for title, body in context_blocks if body and body.strip()]
+
+
+def _track_prefix(parts: list, volatile: str):
+    """
+    Record how much of this prompt repeats an earlier prompt's leading blocks,
+    i.e. what a provider prefix cache could have served.
+    """
+    digest = hashlib.sha1()
+    reused = 0
+    length = 0
+    with _LOCK:
+        for part in parts:
+            digest.update(part.encode("utf-8"))
+            length += len(part)
+            key = digest.hexdigest()
+            seen = _PREFIXES.get(key, 0)
+            if seen and reused == length - len(part):
+                reused = length
+            _PREFIXES[key] = seen + 1
+            _PREFIXES.move_to_end(key)
+        while len(_PREFIXES) > PREFIX_HISTORY_SIZE:
+            _PREFIXES.popitem(last=False)
+        _STATS["prompts"] += 1
+        _STATS["prompt_chars"] += length + len(volatile)
+        _STATS["reused_prefix_chars"] += reused
+
+
+def assemble_messages(system: str, context_blocks: list, volatile: str) -> list:
+    """
+    Chat messages in stable-prefix order.
+
+    Args:
+        system: Static system prompt (no per-request values)
+        context_blocks: [(title, body)] from most to least stable
+        volatile: Per-request instruction, always last
+
+    Returns:
+        list: [system message, user message]
+    """
+    blocks = _render_context(context_blocks)
+    _track_prefix([system] + blocks, volatile)
+    context = "\n".join(blocks)
+    user = f"{context}\n{volatile.strip()}\n" if context else volatile.strip() + "\n"
+    return [
+        {"role": "system", "content": system.strip() + "\n"},
+        {"role": "user", "content": user},
+    ]
+
+
+def assemble_prompt(preamble: str, context_blocks: list, volatile: str) -> str:
+    """Single-string variant of assemble_messages() for generate_plain_text()."""
+    blocks = _render_context(context_blocks)
+    _track_prefix([preamble] + blocks, volatile)
+    prefix = preamble.strip() + "\n\n" + "\n".join(blocks) if blocks else preamble.strip() + "\n"
+    return f"{prefix}\n{volatile.strip()}\n"
+
+
+# ═══════════════════════════════════════════════════════════════
+# PROVIDER TELEMETRY
+# ═══════════════════════════════════════════════════════════════
+
+def cached_prompt_tokens(response) -> tuple:
+    """
+    (prompt tokens, cached prompt tokens) from an SDK response, or (None, None)
+    when the provider does not report them.
+    """
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        # Anthropic: input_tokens excludes cache reads
+        read = getattr(usage, "cache_read_input_tokens", None)
+        if read is not None:
+            total = (usage.input_tokens or 0) + (read or 0) + (getattr(usage, "cache_creation_input_tokens", 0) or 0)
+            return total, read or 0
+        # OpenAI / Groq
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = getattr(details, "cached_tokens", None) if details is not None else None
+        return getattr(usage, "prompt_tokens", None), cached or 0
+    metadata = getattr(response, "usage_metadata", None)
+    if metadata is not None:
+        # Gemini
+        return (getattr(metadata, "prompt_token_count", None),
+                getattr(metadata, "cached_content_token_count", 0) or 0)
+    return None, None
+
+
+def record_provider_cache(provider: str, response):
+    """Accumulate the provider's reported prompt-cache usage for one response."""
+    prompt, cached = cached_prompt_tokens(response)
+    if prompt is None:
+        return
+    with _LOCK:
+        stats = _PROVIDER_STATS.setdefault(provider, {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0})
+        stats["calls"] += 1
+        stats["prompt_tokens"] += prompt
+        stats["cached_tokens"] += cached
+
+
+def prompt_cache_stats() -> dict:
+    """Local render/prefix counters plus per-provider cached-token rates."""
+    with _LOCK:
+        report = dict(_STATS)
+        providers = {p: dict(s) for p, s in _PROVIDER_STATS.items()}
+    renders = report["render_hits"] + report["render_misses"]
+    report["render_hit_rate"] = round(report["render_hits"] / renders, 3) if renders else 0.0
+    # Share of prompt text that repeated an earlier prompt's leading blocks
+    report["prefix_reuse_rate"] = (round(report["reused_prefix_chars"] / report["prompt_chars"], 3)
+                                   if report["prompt_chars"] else 0.0)
+    for stats in providers.values():
+        stats["cached_rate"] = round(stats["cached_tokens"] / stats["prompt_tokens"], 3) if stats["prompt_tokens"] else 0.0
+    report["providers"] = providers
+    return report
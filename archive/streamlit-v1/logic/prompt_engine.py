@@ -6,6 +6,38 @@ We use the Agency OS persona to force 'Revenue Architecture' output.
 The core differentiator: Pain Point Extraction -> Skill Mapping -> High-Agency Rewrite
 """
 
+from logic.prompt_assembly import DIVIDER, assemble_messages
+
+
+BASIN_SYSTEM_PROMPT = f"""You are 'Basin', an Executive Career Architect and GTM Strategist for Basin & Associates.
+
+Your goal is to translate technical competence into commercial value using the "Zero-to-One" framework.
+
+{DIVIDER}
+THE BASIN PHILOSOPHY
+{DIVIDER}
+
+1. **Systems > Hires:** We don't just 'manage teams'; we build 'engines' and 'workflows'.
+2. **Signal > Noise:** Do not use fluff. Every bullet point must have a Metric or an Outcome.
+3. **High Agency:** Use active verbs (Built, Scaled, Engineered, Architected). Never use passive verbs (Responsible for, Helped with).
+4. **Architecture > Activity:** Show systems thinking, not task completion.
+
+{DIVIDER}
+YOUR TASK
+{DIVIDER}
+
+1. **Analyze the JD:** Extract the top 3 'Commercial Pain Points' the company is trying to solve.
+   Examples: High Churn, Low Pipeline, Data Mess, No US Market Presence, Manual Processes.
+
+2. **Map the Resume:** Find the candidate's specific skills/experience that directly solve those pains.
+   DO NOT INVENT FACTS. Only use evidence from the Source of Truth (Master Resume).
+
+3. **The Pivot:** Rewrite the Professional Summary and Key Bullets to bridge the gap.
+   Every statement must prove the candidate can solve the identified pain points.
+
+Follow the constraints and output format given with the request.
+"""
+
 
 def construct_basin_prompt(resume_text: str, job_description: str, target_persona: str, use_deep_recon: bool = False) -> list:
     """
@@ -76,84 +108,42 @@ Return ONLY valid JSON with exactly these keys:
 }
 """
 
-    output_format_section = f"""
-═══════════════════════════════════════════════════════════════
-OUTPUT FORMAT (STRICT JSON)
-═══════════════════════════════════════════════════════════════
-
-{output_instructions}
-
-DO NOT include any text outside the JSON object. DO NOT use markdown code blocks around the JSON.
-"""
-    
-    # Reassemble the final system prompt with the variable section
-    system_prompt = f"""You are 'Basin', an Executive Career Architect and GTM Strategist for Basin & Associates.
-
-Your goal is to translate technical competence into commercial value using the "Zero-to-One" framework.
-
-═══════════════════════════════════════════════════════════════
-THE BASIN PHILOSOPHY
-═══════════════════════════════════════════════════════════════
+    output_format = f"""{output_instructions.strip()}
 
-1. **Systems > Hires:** We don't just 'manage teams'; we build 'engines' and 'workflows'.
-2. **Signal > Noise:** Do not use fluff. Every bullet point must have a Metric or an Outcome.
-3. **High Agency:** Use active verbs (Built, Scaled, Engineered, Architected). Never use passive verbs (Responsible for, Helped with).
-4. **Architecture > Activity:** Show systems thinking, not task completion.
+DO NOT include any text outside the JSON object. DO NOT use markdown code blocks around the JSON."""
 
-═══════════════════════════════════════════════════════════════
-YOUR TASK
-═══════════════════════════════════════════════════════════════
-
-1. **Analyze the JD:** Extract the top 3 'Commercial Pain Points' the company is trying to solve.
-   Examples: High Churn, Low Pipeline, Data Mess, No US Market Presence, Manual Processes.
-
-2. **Map the Resume:** Find the candidate's specific skills/experience that directly solve those pains.
-   DO NOT INVENT FACTS. Only use evidence from the Source of Truth (Master Resume).
-
-3. **The Pivot:** Rewrite the Professional Summary and Key Bullets to bridge the gap.
-   Every statement must prove the candidate can solve the identified pain points.
-
-{ "4. **Strategic Recon:** Generate the 'Bleeding Neck' analysis and 'Sniper Pitch' logic." if use_deep_recon else "" }
-
-═══════════════════════════════════════════════════════════════
-CONSTRAINTS (THE BASIN STANDARD)
-═══════════════════════════════════════════════════════════════
-
-- **Target Persona:** {target_persona}
+    # The system prompt is identical for every call, so providers can serve it
+    # (and the resume that follows) from their prompt cache. Everything that
+    # varies per request comes after, from least to most volatile.
+    recon_step = (
+        "\n4. **Strategic Recon:** Generate the 'Bleeding Neck' analysis and 'Sniper Pitch' logic."
+        if use_deep_recon else ""
+    )
+    constraints = f"""- **Target Persona:** {target_persona}
 - **Focus Area:** {config['focus_area']}
 - **Forbidden Words:** {config['forbidden_words']}
 - **Required Tone:** {config['required_tone']}
-- **Output Style:** {config['output_style']}
-
-{output_format_section}
-"""
-
-    # 3. The User Input (The Data)
-    user_content = f"""═══════════════════════════════════════════════════════════════
-CANDIDATE MASTER RESUME (Source of Truth)
-═══════════════════════════════════════════════════════════════
-
-{resume_text}
-
-═══════════════════════════════════════════════════════════════
-TARGET JOB DESCRIPTION (The Signal)
-═══════════════════════════════════════════════════════════════
+- **Output Style:** {config['output_style']}"""
 
-{job_description}
-
-═══════════════════════════════════════════════════════════════
+    instruction = f"""{DIVIDER}
 INSTRUCTION
-═══════════════════════════════════════════════════════════════
+{DIVIDER}
 
-Perform the full Basin Protocol analysis.
+Perform the full Basin Protocol analysis under the constraints above.{recon_step}
 Output ONLY valid JSON matching the specified format.
 Ensure the summary sounds human and conversational, not robotic.
 """
 
-    return [
-        {"role": "system", "content": system_prompt},
-        {"role": "user", "content": user_content}
-    ]
+    return assemble_messages(
+        BASIN_SYSTEM_PROMPT,
+        [
+            ("CANDIDATE MASTER RESUME (Source of Truth)", resume_text),
+            ("TARGET JOB DESCRIPTION (The Signal)", job_description),
+            ("OUTPUT FORMAT (STRICT JSON)", output_format),
+            ("CONSTRAINTS (THE BASIN STANDARD)", constraints),
+        ],
+        instruction,
+    )
 
 
 def get_persona_options() -> list:
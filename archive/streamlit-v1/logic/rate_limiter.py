@@ -0,0 +1,339 @@
+"""
+BASIN::NEXUS // PROVIDER RATE LIMITER
+Client-side request and token budgets per provider and model.
+
+Every LLM call first reserves one request from a requests-per-minute bucket
+and its estimated tokens from a tokens-per-minute bucket, sleeping if either
+is in debt. Buckets hold one minute of budget, like the provider's own
+window, so a burst that fits the per-minute limit goes straight through and
+only sustained overload is smoothed. The reservation is made once per call
+and reconciled against billed usage afterwards. Calls that still fail with
+a rate-limit or overload error are retried with full-jitter exponential
+backoff, honoring Retry-After when the provider sends it, and the whole
+(provider, model) bucket is paused for that long.
+
+Calls from background scheduler jobs (logic.scheduler) only reserve once
+the bucket would keep BACKGROUND_HEADROOM of its capacity afterwards, so
+they never put interactive calls into debt.
+
+Per-provider counters separate time spent queued (waiting for budget or
+backoff) from time spent executing.
+"""
+
+import os
+import json
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+
+from logic.tokenizer import count_tokens
+from logic.scheduler import current_lane, BACKGROUND
+
+
+# ═══════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ═══════════════════════════════════════════════════════════════
+
+# provider -> model (or 'default') -> (requests/min, tokens/min); None = unlimited
+RATE_LIMITS = {
+    "groq": {
+        "default": (30, 6000),
+        "llama-3.3-70b-versatile": (30, 12000),
+        "openai/gpt-oss-120b": (30, 8000),
+        "openai/gpt-oss-20b": (30, 8000),
+        "moonshotai/kimi-k2-instruct": (60, 10000),
+        "meta-llama/llama-4-scout-17b-16e-instruct": (30, 30000),
+        "meta-llama/llama-4-maverick-17b-128e-instruct": (30, 6000),
+        "qwen/qwen3-32b": (60, 6000),
+    },
+    "openai": {"default": (500, 30000)},
+    "anthropic": {"default": (50, 40000)},
+    "google": {"default": (15, 1000000)},
+    "ollama": {"default": None},
+}
+
+# JSON with the same shape as RATE_LIMITS, merged over it (e.g. paid tiers)
+RATE_LIMITS_ENV = "BASIN_RATE_LIMITS"
+
+# A bucket holds this many seconds of its per-minute budget (the provider's window)
+BURST_SECONDS = 60
+
+# Share of each bucket background calls must leave untouched for interactive ones
+BACKGROUND_HEADROOM = 0.25
+BACKGROUND_POLL_SECONDS = 1.0
+
+# Output tokens reserved per call on top of the prompt estimate
+EXPECTED_OUTPUT_TOKENS = 1024
+
+MAX_RETRIES = 4
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 30.0
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+
+
+def load_rate_limits() -> dict:
+    limits = {provider: dict(models) for provider, models in RATE_LIMITS.items()}
+    override = os.environ.get(RATE_LIMITS_ENV)
+    if override:
+        for provider, models in json.loads(override).items():
+            limits.setdefault(provider, {}).update(
+                {model: tuple(value) if value else None for model, value in models.items()}
+            )
+    return limits
+
+
+# ═══════════════════════════════════════════════════════════════
+# TOKEN BUCKET
+# ═══════════════════════════════════════════════════════════════
+
+class TokenBucket:
+    """
+    Thread-safe token bucket that reserves by going into debt.
+
+    reserve() always succeeds immediately and returns what it took and how
+    long the caller must sleep before using it, so waiters are served in
+    arrival order without a condition variable.
+    """
+
+    def __init__(self, per_minute: float, burst_seconds: float = BURST_SECONDS):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.balance = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.balance = min(self.capacity, self.balance + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float) -> tuple:
+        """
+        Take `amount`, clamped to capacity.
+
+        Returns:
+            tuple: (amount actually taken, seconds to wait before using it)
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            taken = min(amount, self.capacity)
+            self.balance -= taken
+            return taken, max(0.0, -self.balance / self.rate)
+
+    def headroom_wait(self, amount: float, reserve_fraction: float) -> float:
+        """Seconds until taking `amount` would leave `reserve_fraction` of capacity (0 if it already would)."""
+        with self._lock:
+            self._refill(time.monotonic())
+            floor = reserve_fraction * self.capacity
+            needed = min(amount, self.capacity - floor) + floor
+            return max(0.0, (needed - self.balance) / self.rate)
+
+    def adjust(self, amount: float):
+        """Return (positive) or charge (negative) tokens after the real cost is known."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.balance = min(self.capacity, self.balance + amount)
+
+    def pause(self, seconds: float):
+        """Make the next reservation of one unit wait at least `seconds` (provider asked us to back off)."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.balance = min(self.balance, 1 - seconds * self.rate)
+
+
+# ═══════════════════════════════════════════════════════════════
+# ERRORS
+# ═══════════════════════════════════════════════════════════════
+
+def _status_code(error: Exception):
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_retryable(error: Exception) -> bool:
+    """Rate-limit, overload, timeout and connection errors from any provider SDK."""
+    status = _status_code(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    name = type(error).__name__
+    message = str(error).lower()
+    return (name in ("RateLimitError", "APITimeoutError", "APIConnectionError", "ResourceExhausted",
+                     "ServiceUnavailable", "DeadlineExceeded", "InternalServerError")
+            or "rate limit" in message or "429" in message or "overloaded" in message)
+
+
+def retry_after(error: Exception):
+    """Seconds from the Retry-After (or retry-after-ms) header, if the provider sent one."""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000.0
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE, cap: float = BACKOFF_CAP) -> float:
+    """Full-jitter exponential backoff."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def _actual_tokens(result):
+    """Billed tokens from an SDK response's usage block, if it has one."""
+    usage = getattr(result, "usage", None)
+    if usage is None:
+        return None
+    total = getattr(usage, "total_tokens", None)
+    if total is None and getattr(usage, "input_tokens", None) is not None:
+        total = usage.input_tokens + (getattr(usage, "output_tokens", 0) or 0)
+    return total
+
+
+# ═══════════════════════════════════════════════════════════════
+# LIMITER
+# ═══════════════════════════════════════════════════════════════
+
+class RateLimiter:
+    """Shared per-(provider, model) buckets plus retry policy and timing stats."""
+
+    def __init__(self, limits: dict = None, max_retries: int = MAX_RETRIES, sleep=time.sleep):
+        self.limits = limits if limits is not None else load_rate_limits()
+        self.max_retries = max_retries
+        self.sleep = sleep
+        self._buckets = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def buckets(self, provider: str, model: str):
+        """(requests bucket, tokens bucket) for a model, or None when unlimited."""
+        key = (provider, model)
+        with self._lock:
+            if key not in self._buckets:
+                models = self.limits.get(provider, {})
+                limit = models.get(model, models.get("default"))
+                self._buckets[key] = (TokenBucket(limit[0]), TokenBucket(limit[1])) if limit else None
+            return self._buckets[key]
+
+    def _record(self, provider: str, **deltas):
+        with self._lock:
+            stats = self._stats.setdefault(provider, {
+                "calls": 0, "retries": 0, "rate_limited": 0, "failures": 0,
+                "queued_s": 0.0, "executing_s": 0.0,
+            })
+            for name, value in deltas.items():
+                stats[name] += value
+
+    def _acquire(self, buckets, tokens: int) -> tuple:
+        """Reserve one request and `tokens`, sleeping off any debt. Returns (tokens taken, seconds waited)."""
+        if buckets is None:
+            return 0, 0.0
+        requests, token_bucket = buckets
+        waited = 0.0
+        if current_lane() == BACKGROUND:
+            # Stay out of the interactive share: wait (without reserving) until there is headroom
+            while True:
+                wait = max(requests.headroom_wait(1, BACKGROUND_HEADROOM),
+                           token_bucket.headroom_wait(tokens, BACKGROUND_HEADROOM))
+                if not wait:
+                    break
+                wait = min(wait, BACKGROUND_POLL_SECONDS)
+                self.sleep(wait)
+                waited += wait
+        _, request_wait = requests.reserve(1)
+        taken, token_wait = token_bucket.reserve(tokens)
+        delay = max(request_wait, token_wait)
+        if delay:
+            self.sleep(delay)
+        return taken, waited + delay
+
+    def call(self, provider: str, model: str, fn, prompt_tokens: int = 0):
+        """
+        Run fn() within the model's budget, retrying retryable failures.
+
+        Args:
+            provider: Provider name as returned by get_provider()
+            model: Model id (selects the bucket)
+            fn: Zero-argument function making the SDK call
+            prompt_tokens: Estimated prompt tokens (EXPECTED_OUTPUT_TOKENS is added)
+
+        Returns:
+            Whatever fn() returns; the last exception is re-raised when retries run out
+        """
+        buckets = self.buckets(provider, model)
+        queued = executing = 0.0
+        attempt = 0
+        try:
+            # One reservation per call: refused attempts did not consume the budget
+            taken, queued = self._acquire(buckets, prompt_tokens + EXPECTED_OUTPUT_TOKENS)
+            while True:
+                t0 = time.perf_counter()
+                try:
+                    result = fn()
+                except Exception as e:
+                    executing += time.perf_counter() - t0
+                    if attempt >= self.max_retries or not is_retryable(e):
+                        self._record(provider, failures=1)
+                        if buckets is not None:
+                            buckets[1].adjust(taken)
+                        raise
+                    hint = retry_after(e)
+                    if _status_code(e) == 429 or hint is not None:
+                        self._record(provider, rate_limited=1)
+                    self._record(provider, retries=1)
+                    attempt += 1
+                    if buckets is not None and hint is not None:
+                        # Everyone else on this model waits it out too
+                        buckets[0].pause(hint)
+                    delay = hint if hint is not None else backoff_delay(attempt - 1)
+                    self.sleep(delay)
+                    queued += delay
+                    continue
+                executing += time.perf_counter() - t0
+                actual = _actual_tokens(result)
+                if buckets is not None and actual is not None:
+                    buckets[1].adjust(taken - actual)
+                return result
+        finally:
+            self._record(provider, calls=1, queued_s=queued, executing_s=executing)
+
+    def stats(self) -> dict:
+        """Per-provider counters with mean queued / executing seconds per call."""
+        with self._lock:
+            report = {provider: dict(stats) for provider, stats in self._stats.items()}
+        for stats in report.values():
+            calls = stats["calls"] or 1
+            stats["mean_queued_s"] = round(stats["queued_s"] / calls, 3)
+            stats["mean_executing_s"] = round(stats["executing_s"] / calls, 3)
+        return report
+
+
+_LIMITER = None
+_LIMITER_LOCK = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Process-wide limiter, shared by every session and thread."""
+    global _LIMITER
+    with _LIMITER_LOCK:
+        if _LIMITER is None:
+            _LIMITER = RateLimiter()
+        return _LIMITER
+
+
+def limited_call(provider: str, model: str, fn, prompt: str = ""):
+    """get_rate_limiter().call() with the prompt's tokens counted for `model`."""
+    return get_rate_limiter().call(provider, model, fn, count_tokens(prompt, model))
@@ -0,0 +1,201 @@
+"""
+BASIN::NEXUS // LLM RESPONSE CACHE
+Content-addressed, disk-backed cache of LLM completions.
+
+A response is keyed by a SHA-256 of (provider, model, messages, temperature,
+response_format), so the same resume + JD + persona prompt maps to the same
+entry no matter which Streamlit rerun or session asks for it. Entries live
+in a small SQLite file next to the main database, expire after a TTL, and
+the least recently used are evicted once the cache exceeds its size bound.
+
+Only deterministic calls (temperature 0) are cached by default; sampled
+calls are cached only when the caller opts in.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+from logic.database import DB_PATH
+
+
+# ═══════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ═══════════════════════════════════════════════════════════════
+
+CACHE_FILENAME = "basin_response_cache.db"
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 2000
+
+# Cache sampled (temperature > 0) completions too
+CACHE_NONDETERMINISTIC = os.environ.get("BASIN_CACHE_NONDETERMINISTIC", "0") == "1"
+
+
+def get_cache_path() -> str:
+    return os.environ.get("BASIN_RESPONSE_CACHE") or os.path.join(
+        os.path.dirname(os.path.abspath(DB_PATH)), CACHE_FILENAME
+    )
+
+
+def make_key(provider: str, model: str, messages: list, temperature=None, response_format=None) -> str:
+    """Stable hash of everything that determines a completion."""
+    payload = json.dumps(
+        {"provider": provider, "model": model, "messages": messages,
+         "temperature": temperature, "response_format": response_format},
+        sort_keys=True, ensure_ascii=False, separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def is_cacheable(temperature, cache_nondeterministic: bool = None) -> bool:
+    """Temperature-0 calls always; sampled calls only when opted in."""
+    if cache_nondeterministic is None:
+        cache_nondeterministic = CACHE_NONDETERMINISTIC
+    return temperature == 0 or bool(cache_nondeterministic)
+
+
+# ═══════════════════════════════════════════════════════════════
+# CACHE
+# ═══════════════════════════════════════════════════════════════
+
+class ResponseCache:
+    """SQLite-backed LRU + TTL cache of JSON-serialisable responses."""
+
+    def __init__(self, path: str = None, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path or get_cache_path()
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.metrics = {"hits": 0, "misses": 0, "expired": 0, "stores": 0,
+                        "evictions": 0, "bypassed": 0, "uncacheable": 0}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        conn = self._conn()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                model TEXT,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)")
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread (sqlite3 connections are not shareable by default)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, metric: str):
+        with self._lock:
+            self.metrics[metric] += 1
+
+    def get(self, key: str):
+        """Cached value, or None on a miss (expired entries count as misses and are dropped)."""
+        conn = self._conn()
+        row = conn.execute("SELECT value, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+        now = time.time()
+        if row is None:
+            self._count("misses")
+            return None
+        if self.ttl_seconds and now - row[1] > self.ttl_seconds:
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            conn.commit()
+            self._count("expired")
+            self._count("misses")
+            return None
+        conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        conn.commit()
+        self._count("hits")
+        return json.loads(row[0])
+
+    def put(self, key: str, value, model: str = None):
+        conn = self._conn()
+        now = time.time()
+        conn.execute(
+            "INSERT OR REPLACE INTO responses (key, value, model, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+            (key, json.dumps(value, ensure_ascii=False), model, now, now),
+        )
+        self._count("stores")
+        self._evict(conn, now)
+        conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        if self.ttl_seconds:
+            expired = conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,)).rowcount
+            with self._lock:
+                self.metrics["expired"] += max(expired, 0)
+        overflow = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed_at LIMIT ?)",
+                (overflow,),
+            )
+            with self._lock:
+                self.metrics["evictions"] += overflow
+
+    def clear(self):
+        conn = self._conn()
+        conn.execute("DELETE FROM responses")
+        conn.commit()
+
+    def stats(self) -> dict:
+        """Counters since process start plus the current entry count and hit rate."""
+        with self._lock:
+            metrics = dict(self.metrics)
+        lookups = metrics["hits"] + metrics["misses"]
+        metrics["hit_rate"] = round(metrics["hits"] / lookups, 3) if lookups else 0.0
+        metrics["entries"] = self._conn().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return metrics
+
+    def cached_call(self, key: str, compute, model: str = None, bypass: bool = False,
+                    cacheable: bool = True, store_if=None):
+        """
+        Return the cached value for `key`, or call compute() and store its result.
+
+        Args:
+            compute: Zero-argument function producing the response
+            bypass: Skip the cache entirely (no read, no write)
+            cacheable: False for calls that must not be cached (e.g. sampled temperature)
+            store_if: Optional predicate; results failing it (errors) are not stored
+        """
+        cached = self.lookup(key, bypass, cacheable)
+        if cached is not None:
+            return cached
+        value = compute()
+        if not bypass and cacheable and (store_if is None or store_if(value)):
+            self.put(key, value, model)
+        return value
+
+    def lookup(self, key: str, bypass: bool = False, cacheable: bool = True):
+        """get() that records bypassed/uncacheable calls, for callers that compute and put() themselves."""
+        if bypass:
+            self._count("bypassed")
+            return None
+        if not cacheable:
+            self._count("uncacheable")
+            return None
+        return self.get(key)
+
+
+_CACHE = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Process-wide cache, opened on first use."""
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = ResponseCache()
+        return _CACHE
@@ -0,0 +1,342 @@
+"""
+BASIN::NEXUS // LLM JOB SCHEDULER
+Priority lanes for LLM work: interactive before background.
+
+Jobs are submitted to a lane ("interactive" for someone waiting on the
+screen, "background" for bulk content generation) on behalf of a user
+(the Streamlit session by default) and run on a small shared worker pool.
+
+- Lanes share workers by weighted fair queuing (start-time fair queuing
+  on job cost), so interactive work gets LANE_WEIGHTS["interactive"] turns
+  for every background turn, and within a lane each user gets an equal share.
+- Background jobs may occupy at most BACKGROUND_MAX_RUNNING workers, which
+  keeps workers free for interactive jobs.
+- The lane of the running job is visible to the rate limiter (current_lane()),
+  which holds background calls back until interactive headroom is available.
+  Helper threads a job starts (e.g. stream pumps) carry it over with in_lane().
+- Queued jobs can be cancelled, individually or per user.
+- Interactive jobs carry a deadline. A job still queued past it is dropped
+  rather than answering a question nobody is waiting for any more.
+"""
+
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import Future, CancelledError
+
+
+# ═══════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ═══════════════════════════════════════════════════════════════
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+# Relative share of dispatches per lane when both have queued work
+LANE_WEIGHTS = {INTERACTIVE: 8.0, BACKGROUND: 1.0}
+
+MAX_WORKERS = 4
+BACKGROUND_MAX_RUNNING = 2
+
+# Seconds an interactive job may wait in the queue before it is dropped
+INTERACTIVE_DEADLINE_SECONDS = 30.0
+
+# Text-generation fallback for callers that pass dropped=EXPIRED_TEXT
+EXPIRED_TEXT = "Error: Request expired in the queue. Try again."
+
+
+_WORKER = threading.local()
+
+
+class JobDropped(Exception):
+    """A job was cancelled or expired before it started."""
+
+
+def current_lane() -> str:
+    """Lane of the job running on this thread; calls made outside the scheduler count as interactive."""
+    return getattr(_WORKER, "lane", None) or INTERACTIVE
+
+
+@contextmanager
+def in_lane(lane: str):
+    """Run the block as part of a `lane` job, e.g. on a helper thread started by one."""
+    previous = getattr(_WORKER, "lane", None)
+    _WORKER.lane = lane
+    try:
+        yield
+    finally:
+        _WORKER.lane = previous
+
+
+def current_user() -> str:
+    """Streamlit session id of the calling script run, else the thread name."""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+        if ctx is not None:
+            return ctx.session_id
+    except Exception:
+        pass
+    return threading.current_thread().name
+
+
+# ═══════════════════════════════════════════════════════════════
+# QUEUEING
+# ═══════════════════════════════════════════════════════════════
+
+class Job:
+    """A submitted unit of work; wait on it with result() or drop it with cancel()."""
+
+    def __init__(self, fn, lane: str, user: str, cost: float, deadline: float = None):
+        self.fn = fn
+        self.lane = lane
+        self.user = user
+        self.cost = cost
+        self.deadline = deadline        # time.monotonic() value, or None
+        self.submitted_at = time.monotonic()
+        self.future = Future()
+
+    def cancel(self) -> bool:
+        """Cancel if not yet started; returns False once the job is running or done."""
+        return self.future.cancel()
+
+    def result(self, timeout: float = None):
+        return self.future.result(timeout=timeout)
+
+    def done(self) -> bool:
+        return self.future.done()
+
+
+class _Flow:
+    """One queue with a virtual clock, for fair queuing."""
+
+    def __init__(self, weight: float):
+        self.weight = weight
+        self.vtime = 0.0
+        self.items = deque()
+
+
+class _FairQueue:
+    """Start-time fair queuing over keyed flows: the backlogged flow with the lowest virtual time goes next."""
+
+    def __init__(self):
+        self.flows = {}
+        self.vclock = 0.0
+
+    def __len__(self) -> int:
+        return sum(len(f.items) for f in self.flows.values())
+
+    def push(self, key: str, item, weight: float = 1.0):
+        flow = self.flows.get(key)
+        if flow is None:
+            flow = self.flows[key] = _Flow(weight)
+        if not flow.items:
+            # A flow returning from idle does not get credit for the time it was away
+            flow.vtime = max(flow.vtime, self.vclock)
+        flow.items.append(item)
+
+    def pop(self):
+        """Next item; its flow's virtual time advances by item.cost / weight."""
+        key = min((k for k, f in self.flows.items() if f.items), key=lambda k: self.flows[k].vtime)
+        flow = self.flows[key]
+        item = flow.items.popleft()
+        self.vclock = flow.vtime
+        flow.vtime += item.cost / flow.weight
+        if not flow.items:
+            # push() restarts a returning flow at vclock, so idle flows carry no state worth keeping
+            del self.flows[key]
+        return item
+
+    def remove_if(self, predicate) -> list:
+        removed = []
+        for flow in self.flows.values():
+            keep = deque()
+            for item in flow.items:
+                (removed if predicate(item) else keep).append(item)
+            flow.items = keep
+        for key in [k for k, f in self.flows.items() if not f.items]:
+            del self.flows[key]
+        return removed
+
+
+# ═══════════════════════════════════════════════════════════════
+# SCHEDULER
+# ═══════════════════════════════════════════════════════════════
+
+class Scheduler:
+    """Weighted fair scheduler over lanes (and users within a lane) on a fixed worker pool."""
+
+    def __init__(self, workers: int = MAX_WORKERS, lane_weights: dict = None,
+                 background_max_running: int = BACKGROUND_MAX_RUNNING):
+        self.workers = workers
+        self.lane_weights = dict(lane_weights or LANE_WEIGHTS)
+        self.background_max_running = background_max_running
+        self._lanes = {lane: _FairQueue() for lane in self.lane_weights}
+        self._lane_vtime = {lane: 0.0 for lane in self.lane_weights}
+        self._vclock = 0.0
+        self._running = {lane: 0 for lane in self.lane_weights}
+        self._threads = []
+        self._cond = threading.Condition()
+        self.metrics = {lane: {"submitted": 0, "completed": 0, "failed": 0, "cancelled": 0,
+                               "expired": 0, "queued_s": 0.0}
+                        for lane in self.lane_weights}
+
+    def _start_workers(self):
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._work, daemon=True, name=f"llm-worker-{len(self._threads)}")
+            self._threads.append(thread)
+            thread.start()
+
+    def submit(self, fn, lane: str = INTERACTIVE, user: str = None, cost: float = 1.0,
+               deadline_s: float = None) -> Job:
+        """
+        Queue fn() for execution.
+
+        Args:
+            fn: Zero-argument callable
+            lane: INTERACTIVE or BACKGROUND
+            user: Fairness key within the lane (default: current_user())
+            cost: Relative size of the job (e.g. expected tokens), charged to its lane and user
+            deadline_s: Seconds the job may stay queued; None uses
+                        INTERACTIVE_DEADLINE_SECONDS for interactive jobs, no limit otherwise
+
+        Returns:
+            Job: call .result() to wait, .cancel() to drop it while queued
+        """
+        if lane not in self._lanes:
+            raise ValueError(f"Unknown lane: {lane}")
+        if deadline_s is None and lane == INTERACTIVE:
+            deadline_s = INTERACTIVE_DEADLINE_SECONDS
+        job = Job(fn, lane, user or current_user(), max(cost, 1e-6),
+                  time.monotonic() + deadline_s if deadline_s is not None else None)
+        with self._cond:
+            self._start_workers()
+            if not len(self._lanes[lane]):
+                self._lane_vtime[lane] = max(self._lane_vtime[lane], self._vclock)
+            self._lanes[lane].push(job.user, job)
+            self.metrics[lane]["submitted"] += 1
+            self._cond.notify()
+        return job
+
+    def cancel_user(self, user: str, lane: str = None) -> int:
+        """Cancel every queued job of a user (optionally in one lane); returns how many."""
+        with self._cond:
+            lanes = [lane] if lane else list(self._lanes)
+            removed = []
+            for name in lanes:
+                removed += self._lanes[name].remove_if(lambda job: job.user == user)
+        cancelled = 0
+        for job in removed:
+            if job.cancel():
+                cancelled += 1
+        with self._cond:
+            for job in removed:
+                self.metrics[job.lane]["cancelled"] += 1
+        return cancelled
+
+    def _eligible(self, lane: str) -> bool:
+        if not len(self._lanes[lane]):
+            return False
+        return lane != BACKGROUND or self._running[lane] < self.background_max_running
+
+    def _next_job(self):
+        """Pop the next runnable job, dropping cancelled and expired ones. Caller holds the lock."""
+        while True:
+            lanes = [lane for lane in self._lanes if self._eligible(lane)]
+            if not lanes:
+                return None
+            lane = min(lanes, key=lambda name: self._lane_vtime[name])
+            job = self._lanes[lane].pop()
+            self._vclock = self._lane_vtime[lane]
+            if job.future.cancelled():
+                self.metrics[lane]["cancelled"] += 1
+                continue
+            if job.deadline is not None and time.monotonic() > job.deadline:
+                self.metrics[lane]["expired"] += 1
+                if job.future.set_running_or_notify_cancel():
+                    job.future.set_exception(JobDropped(
+                        f"{lane} job expired after {time.monotonic() - job.submitted_at:.1f}s in queue"))
+                continue
+            if not job.future.set_running_or_notify_cancel():
+                self.metrics[lane]["cancelled"] += 1
+                continue
+            self._lane_vtime[lane] += job.cost / self.lane_weights[lane]
+            self._running[lane] += 1
+            self.metrics[lane]["queued_s"] += time.monotonic() - job.submitted_at
+            return job
+
+    def _work(self):
+        _WORKER.active = True
+        while True:
+            with self._cond:
+                job = self._next_job()
+                while job is None:
+                    self._cond.wait()
+                    job = self._next_job()
+            _WORKER.lane = job.lane
+            try:
+                result = job.fn()
+            except BaseException as e:
+                job.future.set_exception(e)
+                outcome = "failed"
+            else:
+                job.future.set_result(result)
+                outcome = "completed"
+            with self._cond:
+                self._running[job.lane] -= 1
+                self.metrics[job.lane][outcome] += 1
+                # A background slot may have opened up
+                self._cond.notify_all()
+
+    def stats(self) -> dict:
+        """Per-lane queue depth, running jobs and outcome counts."""
+        with self._cond:
+            report = {}
+            for lane, metrics in self.metrics.items():
+                started = metrics["completed"] + metrics["failed"] + self._running[lane]
+                report[lane] = dict(metrics, queued=len(self._lanes[lane]), running=self._running[lane],
+                                    avg_queue_s=round(metrics["queued_s"] / started, 3) if started else 0.0)
+                report[lane]["queued_s"] = round(metrics["queued_s"], 3)
+            return report
+
+
+_SCHEDULER = None
+_SCHEDULER_LOCK = threading.Lock()
+
+
+def get_scheduler() -> Scheduler:
+    """Process-wide scheduler shared by every session."""
+    global _SCHEDULER
+    with _SCHEDULER_LOCK:
+        if _SCHEDULER is None:
+            _SCHEDULER = Scheduler()
+        return _SCHEDULER
+
+
+def run_job(fn, lane: str = INTERACTIVE, user: str = None, cost: float = 1.0,
+            deadline_s: float = None, dropped=JobDropped):
+    """
+    Submit fn() and block until it finishes (called from a job, fn() runs inline).
+
+    Args:
+        dropped: Returned instead of raising JobDropped if the job is
+                 cancelled or expires in the queue
+
+    Returns:
+        fn()'s result (its exceptions propagate)
+    """
+    if getattr(_WORKER, "active", False):
+        # Already on a worker: queueing behind ourselves could deadlock the pool
+        return fn()
+    job = get_scheduler().submit(fn, lane=lane, user=user, cost=cost, deadline_s=deadline_s)
+    try:
+        return job.result()
+    except (JobDropped, CancelledError):
+        if dropped is JobDropped:
+            raise
+        return dropped
+    except BaseException:
+        # The waiting script was interrupted (rerun/stop): don't run work nobody will read
+        job.cancel()
+        raise
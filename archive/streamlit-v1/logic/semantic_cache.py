@@ -0,0 +1,214 @@
+"""
+BASIN::NEXUS // SEMANTIC RESPONSE CACHE
+Near-duplicate lookup for LLM answers, opt-in per call.
+
+The exact-match response cache only helps when a prompt is byte-identical.
+Here the caller supplies a short semantic key (the free-text part of the
+request that may be phrased differently, e.g. "Director GTM Systems") and a
+feature name. Anything that must match exactly, such as the company, goes
+into the feature: with hashed embeddings an entity is a single token and
+would barely move the similarity. Keys are embedded locally
+(logic.embeddings), and a new request whose key is within
+SEMANTIC_THRESHOLD cosine similarity of a cached one, for the same feature
+and model, is served the cached answer.
+
+Entries persist in the response-cache SQLite file, are held in memory as
+one float32 matrix per (feature, model) namespace, and are bounded by a
+TTL and a global LRU size limit.
+"""
+
+import os
+import time
+import sqlite3
+import threading
+
+import numpy as np
+
+from logic.embeddings import embed_text, EMBEDDING_DIM
+from logic.response_cache import get_cache_path
+
+
+# ═══════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ═══════════════════════════════════════════════════════════════
+
+SEMANTIC_THRESHOLD = float(os.environ.get("BASIN_SEMANTIC_THRESHOLD", "0.85"))
+SEMANTIC_MAX_ENTRIES = 1000
+SEMANTIC_TTL_SECONDS = 3 * 24 * 3600
+
+# Prepended to answers served from the semantic cache
+SEMANTIC_MARKER = "⚡ *Cached answer for a similar request ({key}).*\n\n"
+
+
+# ═══════════════════════════════════════════════════════════════
+# CACHE
+# ═══════════════════════════════════════════════════════════════
+
+class SemanticCache:
+    """SQLite-backed store of (namespace, key vector, answer) with in-memory matrices."""
+
+    def __init__(self, path: str = None, threshold: float = SEMANTIC_THRESHOLD,
+                 max_entries: int = SEMANTIC_MAX_ENTRIES, ttl_seconds: float = SEMANTIC_TTL_SECONDS,
+                 dim: int = EMBEDDING_DIM):
+        self.path = path or get_cache_path()
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.dim = dim
+        self.metrics = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self._namespaces = {}       # namespace -> {'ids': [int], 'keys': [str], 'matrix': ndarray}
+        self._local = threading.local()
+        self._lock = threading.RLock()
+        conn = self._conn()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS semantic_responses (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                namespace TEXT NOT NULL,
+                key_text TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_semantic_namespace ON semantic_responses(namespace)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_semantic_accessed ON semantic_responses(accessed_at)")
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def namespace(feature: str, model: str) -> str:
+        """Exact-match scope: feature (case and whitespace folded) plus model."""
+        return f"{' '.join(feature.lower().split())}\x00{model}"
+
+    def embed(self, key_text: str) -> np.ndarray:
+        return embed_text(key_text, self.dim)
+
+    def _load(self, namespace: str) -> dict:
+        """In-memory view of one namespace, read from SQLite on first use."""
+        entry = self._namespaces.get(namespace)
+        if entry is not None:
+            return entry
+        cutoff = time.time() - self.ttl_seconds if self.ttl_seconds else 0
+        rows = self._conn().execute(
+            "SELECT id, key_text, vector FROM semantic_responses WHERE namespace = ? AND created_at >= ?",
+            (namespace, cutoff),
+        ).fetchall()
+        matrix = (np.vstack([np.frombuffer(r[2], dtype=np.float32) for r in rows])
+                  if rows else np.zeros((0, self.dim), dtype=np.float32))
+        entry = {"ids": [r[0] for r in rows], "keys": [r[1] for r in rows], "matrix": matrix}
+        self._namespaces[namespace] = entry
+        return entry
+
+    def lookup(self, feature: str, model: str, key_text: str):
+        """
+        Closest cached answer above the threshold.
+
+        Returns:
+            tuple: (answer, similarity, cached key text), or None on a miss
+        """
+        vec = self.embed(key_text)
+        with self._lock:
+            entry = self._load(self.namespace(feature, model))
+            if not len(entry["ids"]) or not vec.any():
+                self.metrics["misses"] += 1
+                return None
+            scores = entry["matrix"] @ vec
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                self.metrics["misses"] += 1
+                return None
+            row_id, matched = entry["ids"][best], entry["keys"][best]
+        conn = self._conn()
+        row = conn.execute("SELECT value FROM semantic_responses WHERE id = ?", (row_id,)).fetchone()
+        if row is None:
+            # Evicted by another process since we loaded the namespace
+            with self._lock:
+                self._namespaces.pop(self.namespace(feature, model), None)
+                self.metrics["misses"] += 1
+            return None
+        conn.execute("UPDATE semantic_responses SET accessed_at = ? WHERE id = ?", (time.time(), row_id))
+        conn.commit()
+        with self._lock:
+            self.metrics["hits"] += 1
+        return row[0], float(scores[best]), matched
+
+    def put(self, feature: str, model: str, key_text: str, value: str):
+        vec = self.embed(key_text)
+        if not vec.any():
+            return
+        namespace = self.namespace(feature, model)
+        now = time.time()
+        conn = self._conn()
+        with self._lock:
+            cursor = conn.execute(
+                "INSERT INTO semantic_responses (namespace, key_text, vector, value, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (namespace, key_text, vec.astype(np.float32).tobytes(), value, now, now),
+            )
+            entry = self._load(namespace)
+            if cursor.lastrowid not in entry["ids"]:
+                entry["ids"].append(cursor.lastrowid)
+                entry["keys"].append(key_text)
+                entry["matrix"] = np.vstack([entry["matrix"], vec[None, :]])
+            self.metrics["stores"] += 1
+            self._evict(conn, now)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        """Drop expired rows, then least recently used rows beyond max_entries."""
+        doomed = []
+        if self.ttl_seconds:
+            doomed += [r[0] for r in conn.execute(
+                "SELECT id FROM semantic_responses WHERE created_at < ?", (now - self.ttl_seconds,))]
+        overflow = conn.execute("SELECT COUNT(*) FROM semantic_responses").fetchone()[0] - len(doomed) - self.max_entries
+        if overflow > 0:
+            doomed += [r[0] for r in conn.execute(
+                "SELECT id FROM semantic_responses WHERE created_at >= ? ORDER BY accessed_at LIMIT ?",
+                (now - self.ttl_seconds if self.ttl_seconds else 0, overflow))]
+        if not doomed:
+            return
+        conn.executemany("DELETE FROM semantic_responses WHERE id = ?", [(i,) for i in doomed])
+        self.metrics["evictions"] += len(doomed)
+        dead = set(doomed)
+        for entry in self._namespaces.values():
+            keep = [i for i, row_id in enumerate(entry["ids"]) if row_id not in dead]
+            if len(keep) != len(entry["ids"]):
+                entry["ids"] = [entry["ids"][i] for i in keep]
+                entry["keys"] = [entry["keys"][i] for i in keep]
+                entry["matrix"] = entry["matrix"][keep]
+
+    def clear(self):
+        conn = self._conn()
+        with self._lock:
+            conn.execute("DELETE FROM semantic_responses")
+            conn.commit()
+            self._namespaces.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            metrics = dict(self.metrics)
+        lookups = metrics["hits"] + metrics["misses"]
+        metrics["hit_rate"] = round(metrics["hits"] / lookups, 3) if lookups else 0.0
+        metrics["entries"] = self._conn().execute("SELECT COUNT(*) FROM semantic_responses").fetchone()[0]
+        return metrics
+
+
+_CACHE = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_semantic_cache() -> SemanticCache:
+    """Process-wide semantic cache, opened on first use."""
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = SemanticCache()
+        return _CACHE
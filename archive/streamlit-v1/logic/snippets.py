@@ -0,0 +1,123 @@
+"""
+BASIN::NEXUS // ORACLE SNIPPETS
+Query-aware previews from positional postings.
+
+For each result passage the query terms' offsets are pulled from the
+postings (bisected to the passage range), the window of SNIPPET_CHARS with
+the most distinct query terms is chosen with a two-pointer sweep, and the
+matched tokens are returned as highlight spans. Cost is O(matches) per
+result; the document text is only sliced, never rescanned.
+"""
+
+import bisect
+import html
+import heapq
+
+from logic.postings import term_positions
+
+
+SNIPPET_CHARS = 200
+# Characters of lead-in before the first match in the window
+SNIPPET_LEAD = 40
+
+
+def match_offsets(postings, doc_id, terms: list, start: int, end: int) -> list:
+    """
+    Query term occurrences inside [start, end) of a document.
+
+    Returns:
+        list: (offset, length, term) sorted by offset
+    """
+    runs = []
+    for term in set(terms):
+        offsets = postings.positions(term, doc_id)
+        lo = bisect.bisect_left(offsets, start)
+        hi = bisect.bisect_left(offsets, end - len(term) + 1, lo)
+        if hi > lo:
+            runs.append([(offset, len(term), term) for offset in offsets[lo:hi]])
+    return list(heapq.merge(*runs))
+
+
+def _text_offsets(text: str, terms: list, base: int) -> list:
+    """Fallback without postings: tokenize just the passage."""
+    positions = term_positions(text)
+    return sorted((base + offset, len(term), term)
+                  for term in set(terms) for offset in positions.get(term, ()))
+
+
+def best_window(matches: list, width: int = SNIPPET_CHARS) -> tuple:
+    """
+    Indices [i, j) of the match run covering the most distinct terms (then most
+    matches) within `width` characters.
+    """
+    best, best_key = (0, 0), (0, 0)
+    counts = {}
+    i = 0
+    for j, (offset, length, term) in enumerate(matches):
+        counts[term] = counts.get(term, 0) + 1
+        while offset + length - matches[i][0] > width:
+            left = matches[i][2]
+            counts[left] -= 1
+            if not counts[left]:
+                del counts[left]
+            i += 1
+        key = (len(counts), j + 1 - i)
+        if key > best_key:
+            best, best_key = (i, j + 1), key
+    return best
+
+
+def build_snippet(passage: str, passage_start: int, matches: list = None, terms: list = None,
+                  width: int = SNIPPET_CHARS) -> tuple:
+    """
+    Snippet text and highlight spans for one passage.
+
+    Args:
+        passage: Passage text
+        passage_start: Offset of the passage within its document
+        matches: match_offsets() output (document offsets); computed from the
+                 passage text when None
+        terms: Query terms (only needed when matches is None)
+        width: Snippet length in characters
+
+    Returns:
+        tuple: (snippet text, [(start, end)] highlight spans relative to the snippet)
+    """
+    if matches is None:
+        matches = _text_offsets(passage, terms or [], passage_start)
+    if not matches:
+        return (passage[:width] + "..." if len(passage) > width else passage), []
+
+    i, j = best_window(matches, width)
+    first = matches[i][0] - passage_start
+    start = max(0, min(first - SNIPPET_LEAD, len(passage) - width))
+    # Start on a word boundary
+    if start > 0:
+        space = passage.rfind(" ", max(0, start - 15), start)
+        start = space + 1 if space >= 0 else start
+    end = min(len(passage), start + width)
+
+    prefix = "..." if start > 0 else ""
+    suffix = "..." if end < len(passage) else ""
+    snippet = prefix + passage[start:end] + suffix
+    highlights = []
+    for offset, length, _ in matches:
+        rel = offset - passage_start
+        if rel >= start and rel + length <= end:
+            s = rel - start + len(prefix)
+            highlights.append((s, s + length))
+    return snippet, highlights
+
+
+def highlight_html(snippet: str, highlights: list, tag: str = "mark") -> str:
+    """HTML-escaped snippet with highlight spans wrapped in <mark>."""
+    parts = []
+    cursor = 0
+    for start, end in highlights:
+        if start < cursor:
+            continue
+        parts.append(html.escape(snippet[cursor:start]))
+        parts.append(f"<{tag}>{html.escape(snippet[start:end])}</{tag}>")
+        cursor = end
+    parts.append(html.escape(snippet[cursor:]))
+    return "".join(parts)
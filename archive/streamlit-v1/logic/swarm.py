@@ -0,0 +1,146 @@
+"""
+BASIN::NEXUS // GTM SWARM ENGINE
+Concurrent fan-out for the "Deploy GTM Swarm" agents.
+
+Every selected agent gets its own prompt and all of them are launched at
+once on a thread pool (the provider SDKs are blocking). Calls to the same
+provider share a semaphore so a five-agent swarm cannot trip a provider's
+concurrency limit, and each agent has a deadline so one slow model cannot
+hold the rest of the swarm hostage. Results are yielded in completion
+order: swarm wall time is roughly the slowest agent, not the sum.
+"""
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from logic.generator import generate_plain_text, get_provider
+from logic.prompt_assembly import assemble_prompt
+
+
+# ═══════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ═══════════════════════════════════════════════════════════════
+
+# Max in-flight swarm calls per provider (shared by all sessions)
+PROVIDER_CONCURRENCY = {"groq": 4, "openai": 4, "anthropic": 2, "google": 2, "ollama": 1}
+DEFAULT_CONCURRENCY = 2
+
+# Seconds from launch before an agent is reported as timed out
+AGENT_TIMEOUT = 45
+
+# Agent key -> what that agent writes
+AGENT_BRIEFS = {
+    "Sniper": "a cold email to the hiring manager: subject line plus under 150 words, one specific hook from the JD, one quantified proof point, a low-friction ask.",
+    "Closer": "a 30-second live cold-call opener and a 20-second voicemail drop, each naming the specific problem from the JD.",
+    "Networker": "a LinkedIn connection request (under 300 characters) and a follow-up DM that offers something of value.",
+    "Devil": "the three most likely objections a hiring manager will raise against this candidate for this role, each with a scripted rebuttal.",
+    "Architect": "a 30-60-90 day micro-plan: three bullets per phase (Audit, Build, Scale) tied to the JD's priorities, ending with one Day-90 KPI.",
+}
+
+# Shared by every agent, ahead of the assets and JD
+SWARM_PREAMBLE = """You are one specialist in a GTM outreach swarm working for a Director-level candidate.
+Use only facts from the candidate assets. Output clean markdown, no preamble."""
+
+
+def agent_key(agent: str) -> str:
+    """AGENT_BRIEFS key for a UI label such as '📧 The Sniper (Cold Email)'."""
+    for key in AGENT_BRIEFS:
+        if key in agent:
+            return key
+    return agent
+
+
+def build_agent_prompt(agent: str, jd_text: str, resume_text: str, strategic_angle: str, tone: str) -> str:
+    """
+    Prompt for one swarm agent, tailored to the JD and candidate assets.
+
+    Assets and JD come first and are identical for every agent in a swarm,
+    so the agents share one cacheable prefix; only the mission differs.
+    """
+    brief = AGENT_BRIEFS.get(agent_key(agent), f"the deliverable for {agent}.")
+    return assemble_prompt(
+        SWARM_PREAMBLE,
+        [
+            ("CANDIDATE ASSETS", resume_text[:4000]),
+            ("JOB DESCRIPTION", jd_text[:4000]),
+        ],
+        f"""ACT AS: {agent}
+STRATEGIC ANGLE: {strategic_angle}
+TONE: {tone}
+
+MISSION: Write {brief}""",
+    )
+
+
+# ═══════════════════════════════════════════════════════════════
+# EXECUTION
+# ═══════════════════════════════════════════════════════════════
+
+_SEMAPHORES = {}
+_SEMAPHORE_LOCK = threading.Lock()
+
+
+def provider_semaphore(provider: str) -> threading.BoundedSemaphore:
+    with _SEMAPHORE_LOCK:
+        sem = _SEMAPHORES.get(provider)
+        if sem is None:
+            sem = threading.BoundedSemaphore(PROVIDER_CONCURRENCY.get(provider, DEFAULT_CONCURRENCY))
+            _SEMAPHORES[provider] = sem
+        return sem
+
+
+def _run_agent(agent: str, prompt: str, model_name: str, generate) -> dict:
+    t0 = time.perf_counter()
+    with provider_semaphore(get_provider(model_name)):
+        text = generate(prompt, model_name=model_name)
+    ok = bool(text) and not text.startswith("Error")
+    return {"agent": agent, "text": text, "ok": ok, "error": None if ok else text,
+            "elapsed": time.perf_counter() - t0}
+
+
+def run_swarm(tasks: list, model_name: str = "llama-3.3-70b-versatile", timeout: float = AGENT_TIMEOUT,
+              generate=generate_plain_text):
+    """
+    Run agents concurrently and yield each result as soon as it completes.
+
+    Args:
+        tasks: [{'agent': label, 'prompt': str, 'timeout': optional seconds}]
+        model_name: Model every agent uses
+        timeout: Default per-agent deadline, measured from launch (time spent
+                 waiting on the provider semaphore counts)
+        generate: Completion function (prompt, model_name=...) -> str
+
+    Yields:
+        dict: 'agent', 'text', 'ok', 'error' and 'elapsed' seconds. Agents past
+              their deadline yield ok=False with error 'timeout'; their threads
+              are abandoned, not waited on.
+    """
+    if not tasks:
+        return
+    pool = ThreadPoolExecutor(max_workers=len(tasks), thread_name_prefix="swarm")
+    start = time.perf_counter()
+    pending = {}
+    for task in tasks:
+        future = pool.submit(_run_agent, task["agent"], task["prompt"], model_name, generate)
+        pending[future] = (task["agent"], start + task.get("timeout", timeout))
+    try:
+        while pending:
+            next_deadline = min(deadline for _, deadline in pending.values())
+            done, _ = wait(pending, timeout=max(0.0, next_deadline - time.perf_counter()),
+                           return_when=FIRST_COMPLETED)
+            for future in done:
+                agent, _ = pending.pop(future)
+                try:
+                    yield future.result()
+                except Exception as e:
+                    yield {"agent": agent, "text": "", "ok": False, "error": str(e),
+                           "elapsed": time.perf_counter() - start}
+            now = time.perf_counter()
+            for future in [f for f, (_, deadline) in pending.items() if deadline <= now and not f.done()]:
+                agent, _ = pending.pop(future)
+                future.cancel()
+                yield {"agent": agent, "text": "", "ok": False, "error": "timeout", "elapsed": now - start}
+    finally:
+        # Stragglers finish in the background; nothing waits on them
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,425 @@
+"""
+BASIN::NEXUS // TOKENIZER
+Per-model token counting and context windows.
+
+Counts come from byte-level BPE vocabularies in the tiktoken file format
+(one "base64-token rank" pair per line). Models map to an encoding family:
+- o200k_base: GPT-4o, gpt-oss
+- cl100k_base: GPT-4 / 3.5, and the closest public vocabulary for Llama 3,
+  Qwen, Kimi, Claude and Gemini (whose own tokenizers are not published in
+  this format)
+
+Vocabularies are read from logic/tokenizers/ or BASIN_TOKENIZER_DIR and
+are never downloaded on the request path. Fetch them once at install or
+deploy time (below). With tiktoken installed (see requirements.txt) they
+are run through its Rust BPE; otherwise through the pure-Python BPE here,
+whose pre-tokenizer needs the `regex` package to match tiktoken exactly
+(the stdlib pattern is close but not identical). Setting
+BASIN_TOKENIZER_DOWNLOAD=1 also lets tiktoken load a missing vocabulary
+from its own cache, downloading it on first use.
+
+With no vocabulary at all, a pre-tokenizer heuristic stands in: far closer
+than characters / 4 for code, JSON and non-English text, but only an
+estimate (tokenizer.exact is False) and count-only.
+
+Counts of large stable segments (resume, master profile, persona blocks)
+are cached by content hash, so re-counting a prompt that embeds them only
+pays for the parts that changed.
+
+Fetch the vocabularies (checksum-verified) with:
+
+    python -m logic.tokenizer --fetch
+"""
+
+import os
+import re
+import base64
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+
+# ═══════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ═══════════════════════════════════════════════════════════════
+
+TOKENIZER_DIR = os.environ.get("BASIN_TOKENIZER_DIR") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "tokenizers"
+)
+
+# Opt-in: let tiktoken download a vocabulary missing from TOKENIZER_DIR
+DOWNLOAD_ENV = "BASIN_TOKENIZER_DOWNLOAD"
+
+ENCODING_URLS = {
+    "cl100k_base": "https://openaipublic.blob.core.windows.net/encodings/cl100k_base.tiktoken",
+    "o200k_base": "https://openaipublic.blob.core.windows.net/encodings/o200k_base.tiktoken",
+}
+ENCODING_SHA256 = {
+    "cl100k_base": "223921b76ee99bde995b7ff738513eef100fb51d18c93597a113bcf3a2e7ecd1",
+    "o200k_base": "446a9538cb6c348e3516120d7c08b09f57c36495e2acfffe59a5bf8b0cfb1a2d",
+}
+
+# Model-name prefix -> encoding; first match wins
+MODEL_ENCODINGS = [
+    ("gpt-4o", "o200k_base"),
+    ("openai/gpt-oss", "o200k_base"),
+    ("gpt-4", "cl100k_base"),
+    ("gpt-3.5", "cl100k_base"),
+]
+DEFAULT_ENCODING = "cl100k_base"
+
+# Context windows (tokens) by model-name prefix; first match wins
+MODEL_CONTEXT_WINDOWS = [
+    ("llama-3.3-70b", 128000),
+    ("llama-3.1", 128000),
+    ("meta-llama/llama-4", 128000),
+    ("openai/gpt-oss", 128000),
+    ("moonshotai/kimi-k2", 128000),
+    ("qwen/qwen3", 32768),
+    ("gpt-4o", 128000),
+    ("gpt-4", 8192),
+    ("gpt-3.5", 16385),
+    ("gemini", 1000000),
+    ("models/gemini", 1000000),
+    ("claude", 200000),
+    ("ollama:", 8192),
+]
+DEFAULT_CONTEXT_WINDOW = 8192
+
+# Chat framing overhead (OpenAI-style): per message, and once for the reply
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_REPLY = 3
+
+# Segments at least this long have their counts cached by hash
+SEGMENT_CACHE_MIN_CHARS = 256
+SEGMENT_CACHE_SIZE = 4096
+
+# Pre-tokenizer patterns. The exact ones need the `regex` module (\p classes);
+# the stdlib fallback approximates letters with [^\W\d_] and numbers with \d.
+_CL100K_PATTERN = (
+    r"""(?i:'s|'t|'re|'ve|'m|'ll|'d)|[^\r\n\p{L}\p{N}]?\p{L}+|\p{N}{1,3}| ?[^\s\p{L}\p{N}]+[\r\n]*"""
+    r"""|\s*[\r\n]+|\s+(?!\S)|\s+"""
+)
+_O200K_PATTERN = "|".join([
+    r"""[^\r\n\p{L}\p{N}]?[\p{Lu}\p{Lt}\p{Lm}\p{Lo}\p{M}]*[\p{Ll}\p{Lm}\p{Lo}\p{M}]+(?i:'s|'t|'re|'ve|'m|'ll|'d)?""",
+    r"""[^\r\n\p{L}\p{N}]?[\p{Lu}\p{Lt}\p{Lm}\p{Lo}\p{M}]+[\p{Ll}\p{Lm}\p{Lo}\p{M}]*(?i:'s|'t|'re|'ve|'m|'ll|'d)?""",
+    r"""\p{N}{1,3}""",
+    r""" ?[^\s\p{L}\p{N}]+[\r\n/]*""",
+    r"""\s*[\r\n]+""",
+    r"""\s+(?!\S)""",
+    r"""\s+""",
+])
+_STDLIB_PATTERN = (
+    r"""(?i:'s|'t|'re|'ve|'m|'ll|'d)|(?:[^\r\n\w]|_)?[^\W\d_]+|\d{1,3}| ?(?:[^\s\w]|_)+[\r\n]*"""
+    r"""|\s*[\r\n]+|\s+(?!\S)|\s+"""
+)
+
+
+def _compile(pattern: str):
+    try:
+        import regex
+        return regex.compile(pattern)
+    except ImportError:
+        return re.compile(_STDLIB_PATTERN)
+
+
+# ═══════════════════════════════════════════════════════════════
+# BPE
+# ═══════════════════════════════════════════════════════════════
+
+def load_tiktoken_bpe(path: str) -> dict:
+    """Read a .tiktoken vocabulary: token bytes -> merge rank."""
+    ranks = {}
+    with open(path, "rb") as f:
+        for line in f:
+            if line.strip():
+                token, rank = line.split()
+                ranks[base64.b64decode(token)] = int(rank)
+    return ranks
+
+
+def byte_pair_merge(piece: bytes, ranks: dict) -> list:
+    """
+    Split one pre-token into vocabulary tokens by repeatedly merging the
+    adjacent pair with the lowest rank (same algorithm as tiktoken).
+
+    Returns:
+        list: Token byte strings
+    """
+    parts = [piece[i:i + 1] for i in range(len(piece))]
+    while len(parts) > 1:
+        best, best_rank = -1, None
+        for i in range(len(parts) - 1):
+            rank = ranks.get(parts[i] + parts[i + 1])
+            if rank is not None and (best_rank is None or rank < best_rank):
+                best, best_rank = i, rank
+        if best < 0:
+            break
+        parts[best:best + 2] = [parts[best] + parts[best + 1]]
+    return parts
+
+
+class BPETokenizer:
+    """Pure-Python byte-level BPE over a tiktoken vocabulary."""
+
+    exact = True
+
+    def __init__(self, name: str, ranks: dict, pattern: str):
+        self.name = name
+        self.ranks = ranks
+        self.decoder = {rank: token for token, rank in ranks.items()}
+        self.pattern = _compile(pattern)
+        # Pre-tokens repeat heavily (words, indentation), so memoize them
+        self._piece_tokens = lru_cache(maxsize=65536)(self._encode_piece)
+
+    def _encode_piece(self, piece: bytes) -> tuple:
+        rank = self.ranks.get(piece)
+        if rank is not None:
+            return (rank,)
+        return tuple(self.ranks[part] for part in byte_pair_merge(piece, self.ranks))
+
+    def encode(self, text: str) -> list:
+        tokens = []
+        for match in self.pattern.finditer(text):
+            tokens.extend(self._piece_tokens(match.group().encode("utf-8")))
+        return tokens
+
+    def decode(self, tokens: list) -> str:
+        return b"".join(self.decoder[t] for t in tokens).decode("utf-8", errors="replace")
+
+    def count(self, text: str) -> int:
+        return sum(len(self._piece_tokens(m.group().encode("utf-8"))) for m in self.pattern.finditer(text))
+
+
+class TiktokenTokenizer:
+    """Adapter for the tiktoken package (Rust BPE) when it is installed."""
+
+    exact = True
+
+    def __init__(self, encoding):
+        self.name = encoding.name
+        self.encoding = encoding
+
+    def encode(self, text: str) -> list:
+        return self.encoding.encode(text, disallowed_special=())
+
+    def decode(self, tokens: list) -> str:
+        return self.encoding.decode(tokens)
+
+    def count(self, text: str) -> int:
+        return len(self.encode(text))
+
+
+class HeuristicTokenizer:
+    """
+    Vocabulary-free estimate: pre-tokenize like cl100k, then charge each
+    piece by shape (common-length ASCII words are one token, long words and
+    symbol runs are split, non-ASCII text is charged per UTF-8 byte).
+    Counts only: there are no token ids without a vocabulary.
+    """
+
+    exact = False
+
+    def __init__(self, name: str = "heuristic"):
+        self.name = name
+        self.pattern = re.compile(_STDLIB_PATTERN)
+
+    @staticmethod
+    def _piece_cost(piece: str) -> int:
+        if piece.isspace():
+            return 1
+        if not piece.isascii():
+            return max(1, -(-len(piece.encode("utf-8")) // 3))
+        core = piece.strip()
+        if core.isalpha():
+            return 1 if len(core) <= 10 else -(-len(core) // 6)
+        if core.isdigit():
+            return 1
+        return max(1, -(-len(core) // 3))
+
+    def count(self, text: str) -> int:
+        return sum(self._piece_cost(m.group()) for m in self.pattern.finditer(text))
+
+
+# ═══════════════════════════════════════════════════════════════
+# REGISTRY
+# ═══════════════════════════════════════════════════════════════
+
+_TOKENIZERS = {}
+_LOCK = threading.Lock()
+# Held while a vocabulary is loaded, so concurrent first calls build it once.
+# Re-entrant: a missing encoding falls back to building DEFAULT_ENCODING.
+_BUILD_LOCK = threading.RLock()
+
+
+def _build_tokenizer(encoding: str):
+    path = os.path.join(TOKENIZER_DIR, f"{encoding}.tiktoken")
+    try:
+        import tiktoken
+        if os.path.exists(path):
+            ranks = tiktoken.load.load_tiktoken_bpe(path)
+            return TiktokenTokenizer(tiktoken.Encoding(
+                name=encoding,
+                pat_str=_O200K_PATTERN if encoding == "o200k_base" else _CL100K_PATTERN,
+                mergeable_ranks=ranks,
+                special_tokens={},
+            ))
+        if os.environ.get(DOWNLOAD_ENV) == "1":
+            try:
+                # tiktoken's own cache (TIKTOKEN_CACHE_DIR), downloaded on first use
+                return TiktokenTokenizer(tiktoken.get_encoding(encoding))
+            except Exception as e:
+                print(f"tiktoken could not load {encoding}, estimating token counts: {e}")
+    except ImportError:
+        pass
+    if os.path.exists(path):
+        pattern = _O200K_PATTERN if encoding == "o200k_base" else _CL100K_PATTERN
+        return BPETokenizer(encoding, load_tiktoken_bpe(path), pattern)
+    if encoding != DEFAULT_ENCODING:
+        # Closest available vocabulary beats a heuristic
+        fallback = get_tokenizer_for_encoding(DEFAULT_ENCODING)
+        if fallback.exact:
+            return fallback
+    return HeuristicTokenizer(encoding)
+
+
+def get_tokenizer_for_encoding(encoding: str):
+    with _LOCK:
+        tokenizer = _TOKENIZERS.get(encoding)
+    if tokenizer is not None:
+        return tokenizer
+    with _BUILD_LOCK:
+        with _LOCK:
+            tokenizer = _TOKENIZERS.get(encoding)
+        if tokenizer is None:
+            tokenizer = _build_tokenizer(encoding)
+            with _LOCK:
+                _TOKENIZERS[encoding] = tokenizer
+    return tokenizer
+
+
+def _prefix_lookup(table: list, model: str, default):
+    model = (model or "").lower().replace("groq:", "")
+    for prefix, value in table:
+        if model.startswith(prefix):
+            return value
+    return default
+
+
+def encoding_for_model(model: str) -> str:
+    return _prefix_lookup(MODEL_ENCODINGS, model, DEFAULT_ENCODING)
+
+
+def get_tokenizer(model: str = None):
+    """Tokenizer for a model id (the default family when model is None)."""
+    return get_tokenizer_for_encoding(encoding_for_model(model))
+
+
+def context_window(model: str) -> int:
+    """Context window of a model, by name prefix (DEFAULT_CONTEXT_WINDOW if unknown)."""
+    return _prefix_lookup(MODEL_CONTEXT_WINDOWS, model, DEFAULT_CONTEXT_WINDOW)
+
+
+# ═══════════════════════════════════════════════════════════════
+# COUNTING
+# ═══════════════════════════════════════════════════════════════
+
+_SEGMENT_COUNTS = OrderedDict()     # (encoding, sha1) -> token count
+_SEGMENT_STATS = {"hits": 0, "misses": 0}
+
+
+def count_tokens(text: str, model: str = None) -> int:
+    """
+    Tokens in `text` for `model`. Long segments are counted once per content
+    hash and served from an LRU afterwards.
+    """
+    if not text:
+        return 0
+    tokenizer = get_tokenizer(model)
+    if len(text) < SEGMENT_CACHE_MIN_CHARS:
+        return tokenizer.count(text)
+    key = (tokenizer.name, hashlib.sha1(text.encode("utf-8")).hexdigest())
+    with _LOCK:
+        count = _SEGMENT_COUNTS.get(key)
+        if count is not None:
+            _SEGMENT_COUNTS.move_to_end(key)
+            _SEGMENT_STATS["hits"] += 1
+            return count
+    count = tokenizer.count(text)
+    with _LOCK:
+        _SEGMENT_STATS["misses"] += 1
+        _SEGMENT_COUNTS[key] = count
+        while len(_SEGMENT_COUNTS) > SEGMENT_CACHE_SIZE:
+            _SEGMENT_COUNTS.popitem(last=False)
+    return count
+
+
+def count_messages(messages: list, model: str = None) -> int:
+    """
+    Prompt tokens for a chat messages array, including per-message framing.
+
+    Args:
+        messages: [{'role': ..., 'content': ...}] (content may be a list of
+                  text parts)
+        model: Model id (selects the vocabulary)
+    """
+    total = TOKENS_PER_REPLY
+    for message in messages:
+        content = message.get("content", "")
+        if isinstance(content, list):
+            content = "".join(part.get("text", "") for part in content if isinstance(part, dict))
+        total += TOKENS_PER_MESSAGE + count_tokens(content, model) + count_tokens(message.get("role", ""), model)
+        if message.get("name"):
+            total += 1 + count_tokens(message["name"], model)
+    return total
+
+
+def segment_cache_stats() -> dict:
+    with _LOCK:
+        stats = dict(_SEGMENT_STATS)
+        stats["entries"] = len(_SEGMENT_COUNTS)
+    return stats
+
+
+def fetch_vocabularies(encodings: list = None, directory: str = TOKENIZER_DIR) -> list:
+    """Download and verify .tiktoken vocabularies into `directory`."""
+    import requests
+
+    os.makedirs(directory, exist_ok=True)
+    written = []
+    for encoding in encodings or list(ENCODING_URLS):
+        data = requests.get(ENCODING_URLS[encoding], timeout=60).content
+        digest = hashlib.sha256(data).hexdigest()
+        if digest != ENCODING_SHA256[encoding]:
+            raise ValueError(f"{encoding}: checksum mismatch ({digest})")
+        path = os.path.join(directory, f"{encoding}.tiktoken")
+        with open(path, "wb") as f:
+            f.write(data)
+        written.append(path)
+    with _LOCK:
+        _TOKENIZERS.clear()
+        _SEGMENT_COUNTS.clear()
+    return written
+
+
+if __name__ == "__main__":
+    import sys
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Token counting for BASIN::NEXUS prompts")
+    parser.add_argument("--fetch", action="store_true", help="Download BPE vocabularies into logic/tokenizers/")
+    parser.add_argument("--model", default="llama-3.3-70b-versatile")
+    parser.add_argument("files", nargs="*", help="Files to count (stdin when none)")
+    args = parser.parse_args()
+
+    if args.fetch:
+        for path in fetch_vocabularies():
+            print(f"wrote {path}")
+    else:
+        tokenizer = get_tokenizer(args.model)
+        kind = "exact" if tokenizer.exact else "estimate"
+        texts = [(p, open(p, encoding="utf-8").read()) for p in args.files] or [("<stdin>", sys.stdin.read())]
+        for name, text in texts:
+            print(f"{name}: {count_tokens(text, args.model)} tokens ({tokenizer.name}, {kind}; "
+                  f"window {context_window(args.model)})")
@@ -26,13 +26,13 @@ def analyze_video_pitch(video_bytes: bytes, context: str = "") -> dict:
     Returns:
         dict: Analysis results with feedback on delivery, content, presence
     """
-    import google.generativeai as genai
+    from logic.llm_clients import configure_gemini, get_gemini_model
     
     api_key = os.environ.get("GOOGLE_API_KEY") or os.environ.get("GEMINI_API_KEY")
     if not api_key:
         raise ValueError("Google API Key required for video analysis.")
     
-    genai.configure(api_key=api_key)
+    genai = configure_gemini(api_key)
     
     # Save video to temp file
     with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as temp_file:
@@ -98,7 +98,7 @@ Be direct and actionable. This is coaching, not encouragement.
 """
         
         # Use Gemini 2.0 Flash for video analysis
-        model = genai.GenerativeModel("gemini-2.0-flash-exp")
+        model = get_gemini_model("gemini-2.0-flash-exp", api_key)
         response = model.generate_content([video_file, analysis_prompt])
         
         # Clean up the uploaded file
@@ -37,13 +37,13 @@ def _transcribe_with_api(audio_bytes: bytes) -> str:
     Transcribe using OpenAI Whisper API (requires API key).
     Fast, accurate, costs ~$0.006/min.
     """
-    from openai import OpenAI
+    from logic.llm_clients import get_client
     
     api_key = os.environ.get("OPENAI_API_KEY")
     if not api_key:
         raise ValueError("OpenAI API key required for transcription.")
     
-    client = OpenAI(api_key=api_key)
+    client = get_client("openai", api_key)
     
     # Save audio to temp file (API requires file-like object)
     with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
@@ -101,13 +101,13 @@ def generate_speech(text: str, voice: str = "onyx") -> bytes:
     Returns:
         bytes: Audio data (mp3 format)
     """
-    from openai import OpenAI
+    from logic.llm_clients import get_client
     
     api_key = os.environ.get("OPENAI_API_KEY")
     if not api_key:
         raise ValueError("OpenAI API key required for TTS.")
     
-    client = OpenAI(api_key=api_key)
+    client = get_client("openai", api_key)
     
     # Generate speech
     response = client.audio.speech.create(
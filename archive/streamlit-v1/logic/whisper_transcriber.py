@@ -7,6 +7,8 @@ import os
 import tempfile
 from typing import Optional, Dict, Any
 
+from logic.llm_clients import get_client
+
 # Try to import Whisper dependencies
 WHISPER_AVAILABLE = False
 try:
@@ -39,7 +41,7 @@ class WhisperTranscriber:
         # Prefer Groq API (faster)
         if self.api_key and GROQ_WHISPER_AVAILABLE:
             self.backend = "groq"
-            self.client = Groq(api_key=self.api_key)
+            self.client = get_client("groq", self.api_key)
         elif WHISPER_AVAILABLE:
             self.backend = "local"
             # Load smallest model for speed